@@ -0,0 +1,8 @@
+"""
+Benchmarks for the reference solutions' hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks --records 20000 --output results.json
+    python -m benchmarks --baseline results.json
+"""
@@ -0,0 +1,74 @@
+"""Command-line entry point: python -m benchmarks --help"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from benchmarks.generators import PRODUCT_SHAPES
+from benchmarks.runner import BENCHMARKS, DEFAULT_TOLERANCE, compare, load_report, run, save_report
+
+def _shape_mix(value: str) -> dict:
+    """Parse 'nested=2,flat=1' into shape weights."""
+    mix = {}
+    for item in value.split(','):
+        shape, _, weight = item.partition('=')
+        if shape not in PRODUCT_SHAPES:
+            raise argparse.ArgumentTypeError(f"unknown shape '{shape}' (choose from {', '.join(PRODUCT_SHAPES)})")
+        try:
+            mix[shape] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for '{shape}': {weight}")
+    return mix
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('names', nargs='*', metavar='benchmark',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('-n', '--records', type=int, default=10000, help='records per benchmark')
+    parser.add_argument('--depth', type=int, default=2, help='nesting depth of generated records')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='fraction of records with an invalid value')
+    parser.add_argument('--shape-mix', type=_shape_mix, help='product shape weights, e.g. nested=2,flat=1,details=1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='throughput runs per benchmark (best is kept)')
+    parser.add_argument('-o', '--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='compare against a saved JSON report')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed fractional regression against the baseline')
+    args = parser.parse_args(argv)
+    
+    try:
+        report = run(args.names, args.records, args.depth, args.error_rate, args.seed, args.repeat, args.shape_mix)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.output:
+        save_report(report, args.output)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    
+    for name, result in report['results'].items():
+        latency = result['latency_us']
+        print(
+            f"{name}: {result['records_per_sec']:,.0f} records/s, "
+            f"p50 {latency['p50']:.1f}us, p99 {latency['p99']:.1f}us, "
+            f"peak {result['peak_memory_bytes'] / 1024:,.0f} KiB",
+            file=sys.stderr,
+        )
+    
+    if not args.baseline:
+        return 0
+    regressed = False
+    for comparison in compare(report, load_report(args.baseline), args.tolerance):
+        ratios = comparison['ratios']
+        status = 'REGRESSION (' + ', '.join(comparison['regressions']) + ')' if comparison['regressions'] else 'ok'
+        print(
+            f"{comparison['name']}: throughput x{ratios['records_per_sec']:.2f}, "
+            f"p50 x{ratios['latency_p50']:.2f}, memory x{ratios['peak_memory_bytes']:.2f} - {status}",
+            file=sys.stderr,
+        )
+        regressed = regressed or bool(comparison['regressions'])
+    return 1 if regressed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
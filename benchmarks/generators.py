@@ -0,0 +1,202 @@
+"""
+Synthetic scraped-data generators for the benchmarks.
+
+Every generator is deterministic for a given seed and takes:
+    count: Number of records to generate
+    depth: Nesting depth of the generated structures
+    error_rate: Fraction of records (0.0 - 1.0) given one invalid value
+    seed: Random seed
+"""
+import json
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+# Product source shapes understood by normalize_product_data
+PRODUCT_SHAPES = ('nested', 'flat', 'details')
+
+def _nested_value(depth: int, leaf: Any) -> Any:
+    """Wrap leaf in depth levels of {'level': n, 'child': ...}."""
+    value = leaf
+    for level in range(depth, 0, -1):
+        value = {'level': str(level), 'child': value}
+    return value
+
+def nested_schema(depth: int, leaf: Any) -> Any:
+    """Schema matching _nested_value for the same depth."""
+    schema = leaf
+    for _ in range(depth):
+        schema = {'level': int, 'child': schema}
+    return schema
+
+def schema_for_records(depth: int = 2) -> Dict[str, Any]:
+    """Schema for records produced by generate_schema_records."""
+    schema = {
+        'id': int,
+        'active': bool,
+        'score': float,
+        'title': str,
+        'tags': list,
+        'items': List[{'sku': str, 'price': float, 'qty': int}],
+        'discount': Optional[float],
+        'seller': {'name': str, 'rating': float},
+    }
+    if depth:
+        schema['meta'] = nested_schema(depth, {'source': str, 'rank': int})
+    return schema
+
+def flat_schema_for_records() -> Dict[str, Any]:
+    """Schema of only the scalar top-level fields of generate_schema_records records."""
+    return {
+        'id': int,
+        'active': bool,
+        'score': float,
+        'title': str,
+        'tags': list,
+    }
+
+def generate_schema_records(
+    count: int,
+    depth: int = 2,
+    error_rate: float = 0.0,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """Records of scraped listings, with most values as strings to coerce."""
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        record = {
+            'id': str(index),
+            'active': rng.choice(('true', 'false', 'yes', 'no')),
+            'score': f"{rng.uniform(0, 5):.2f}",
+            'title': f"Listing {index}",
+            'tags': rng.choice(('new,sale', 'used', 'refurbished,warranty,sale')),
+            'items': [
+                {'sku': f"SKU-{index}-{n}", 'price': f"{rng.uniform(1, 500):.2f}", 'qty': str(rng.randint(0, 20))}
+                for n in range(rng.randint(1, 4))
+            ],
+            'discount': rng.choice((None, '0.1', '0.25')),
+            'seller': {'name': rng.choice(('Acme', 'Globex')), 'rating': f"{rng.uniform(1, 5):.1f}"},
+        }
+        if depth:
+            record['meta'] = _nested_value(depth, {'source': 'crawler', 'rank': str(rng.randint(1, 100))})
+        if rng.random() < error_rate:
+            record[rng.choice(('id', 'score', 'active'))] = 'n/a'
+        records.append(record)
+    return records
+
+def _product(rng: random.Random, index: int, shape: str, depth: int) -> Dict[str, Any]:
+    price = f"{rng.uniform(1, 2000):.2f}"
+    stock = str(rng.randint(0, 100))
+    tags = rng.choice((['electronics', 'computers'], ['home'], []))
+    if shape == 'nested':
+        product = {'product': {'name': f"Product {index}", 'details': {'price': price, 'stock': stock}, 'tags': tags}}
+    elif shape == 'flat':
+        product = {
+            'name': f"Product {index}",
+            'pricing': {'amount': price, 'currency': 'USD'},
+            'inventory': stock,
+            'categories': ','.join(tags),
+        }
+    else:
+        product = {'name': f"Product {index}", 'details': {'price': price, 'stock': stock}, 'tags': tags}
+    if depth:
+        # Unrelated nested payload that the normalizer has to skip over
+        product['raw'] = _nested_value(depth, {'html': '<div>...</div>'})
+    return product
+
+def generate_products(
+    count: int,
+    depth: int = 2,
+    error_rate: float = 0.0,
+    seed: int = 0,
+    shape_mix: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Products from several scraped sources, in normalize_product_data's input shapes.
+    
+    Args:
+        shape_mix: Relative weight of each shape in PRODUCT_SHAPES; equal
+            weights by default
+    """
+    rng = random.Random(seed)
+    shape_mix = shape_mix or {shape: 1.0 for shape in PRODUCT_SHAPES}
+    unknown = set(shape_mix) - set(PRODUCT_SHAPES)
+    if unknown:
+        raise ValueError(f"Unknown product shapes: {sorted(unknown)}")
+    shapes, weights = zip(*shape_mix.items())
+    products = []
+    for index, shape in enumerate(rng.choices(shapes, weights, k=count)):
+        product = _product(rng, index, shape, depth)
+        if rng.random() < error_rate:
+            details = product.get('product', product).get('details') or product['pricing']
+            details['price' if 'price' in details else 'amount'] = 'invalid'
+        products.append(product)
+    return products
+
+def extraction_mapping(depth: int = 2) -> Dict[str, Tuple[str, Any]]:
+    """Field mapping for records produced by generate_extraction_records."""
+    mapping = {
+        'name': ('user.name', str),
+        'city': ('user.location.city', str),
+        'state': ('user.location.state', str),
+        'visits': ('metrics.visits', int),
+        'likes': ('metrics.engagement.likes', int),
+        'first_order': ('orders[0].total', float),
+        'skus': ('orders[*].sku', list),
+    }
+    if depth:
+        mapping['deep'] = ('.'.join(['meta'] + ['child'] * depth + ['source']), str)
+    return mapping
+
+def generate_extraction_records(
+    count: int,
+    depth: int = 2,
+    error_rate: float = 0.0,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """User profile records with nested location, metrics and order lists."""
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        record = {
+            'user': {
+                'name': f"User {index}",
+                'location': {'city': rng.choice(('Paris', 'Austin', 'Osaka')), 'state': 'N/A'},
+            },
+            'metrics': {'visits': str(rng.randint(0, 10000)), 'engagement': {'likes': rng.randint(0, 500)}},
+            'orders': [
+                {'sku': f"SKU-{n}", 'total': f"{rng.uniform(5, 300):.2f}"}
+                for n in range(rng.randint(0, 3))
+            ],
+        }
+        if depth:
+            record['meta'] = _nested_value(depth, {'source': 'api'})
+        if rng.random() < error_rate:
+            record['metrics']['visits'] = 'many'
+        records.append(record)
+    return records
+
+def generate_extraction_documents(
+    count: int,
+    depth: int = 2,
+    error_rate: float = 0.0,
+    seed: int = 0
+) -> List[str]:
+    """
+    JSON pages wrapping generate_extraction_records records.
+    
+    Each page (about 20 KB) also carries rendered HTML, full of escaped
+    quotes, and a description with a few, which extraction mappings never
+    read.
+    """
+    rng = random.Random(seed)
+    pages = []
+    for record in generate_extraction_records(count, depth, error_rate, seed):
+        rows = ''.join(
+            f'<tr class="spec"><td title="{n}">{rng.randint(0, 99)}</td></tr>'
+            for n in range(rng.randint(250, 350))
+        )
+        description = f'Ships with a {rng.randint(10, 17)}.6" display. ' + 'Lightweight aluminium body. ' * 100
+        page = dict(record, html=f'<table id="specs">{rows}</table>', description=description)
+        pages.append(json.dumps(page))
+    return pages
@@ -0,0 +1,285 @@
+"""
+Benchmark definitions, measurement and baseline comparison.
+
+Each benchmark measures one hot path of a reference solution:
+    - throughput: records/sec over the whole batch, best of several runs
+    - latency: per-record percentiles, timed one record at a time
+    - memory: peak bytes allocated while processing the batch (tracemalloc)
+"""
+import importlib.util
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks import generators
+
+CHALLENGES_DIR = Path(__file__).resolve().parent.parent / 'challenges'
+
+# Default maximum fractional slowdown tolerated by compare()
+DEFAULT_TOLERANCE = 0.10
+
+class Benchmark(NamedTuple):
+    """
+    A benchmarked hot path.
+    
+    Attributes:
+        name: Result key, e.g. "schema_validation.validate"
+        run_one: Processes a single record
+        run_batch: Processes a list of records
+        records: The generated input records
+    """
+    name: str
+    run_one: Callable[[Any], Any]
+    run_batch: Callable[[List[Any]], Any]
+    records: List[Any]
+
+def load_solution(challenge: str) -> Any:
+    """Import challenges/<challenge>/solution.py under a unique module name."""
+    path = CHALLENGES_DIR / challenge / 'solution.py'
+    name = f"benchmarks.solutions.{challenge}"
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def _schema_validation(count: int, depth: int, error_rate: float, seed: int, **options: Any) -> Benchmark:
+    solution = load_solution('01_schema_validation')
+    validator = solution.SchemaValidator()
+    schema = generators.schema_for_records(depth)
+    
+    def run_one(record: Dict[str, Any]) -> Any:
+        try:
+            return validator.validate(record, schema)
+        except solution.ValidationError:
+            return None
+    
+    def run_batch(records: List[Dict[str, Any]]) -> List[Any]:
+        return [run_one(record) for record in records]
+    
+    records = generators.generate_schema_records(count, depth, error_rate, seed)
+    return Benchmark('schema_validation.validate', run_one, run_batch, records)
+
+def _flat_schema_validation(count: int, depth: int, error_rate: float, seed: int, **options: Any) -> Benchmark:
+    solution = load_solution('01_schema_validation')
+    compiled = solution.SchemaValidator().compile(generators.flat_schema_for_records())
+    
+    def run_one(record: Dict[str, Any]) -> Any:
+        try:
+            return compiled.validate(record)
+        except solution.ValidationError:
+            return None
+    
+    records = generators.generate_schema_records(count, depth, error_rate, seed)
+    return Benchmark('schema_validation.validate_many_flat', run_one, compiled.validate_many, records)
+
+def _data_transformation(count: int, depth: int, error_rate: float, seed: int, **options: Any) -> Benchmark:
+    solution = load_solution('02_data_transformation')
+    records = generators.generate_products(count, depth, error_rate, seed, options.get('shape_mix'))
+    return Benchmark(
+        'data_transformation.normalize_product_data',
+        solution.normalize_product,
+        solution.normalize_product_data,
+        records,
+    )
+
+def _deduplication(count: int, depth: int, error_rate: float, seed: int, **options: Any) -> Benchmark:
+    solution = load_solution('02_data_transformation')
+    products = generators.generate_products(count, depth, error_rate, seed, options.get('shape_mix'))
+    records = solution.normalize_product_data(products)
+    
+    def run_one(product: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return solution.dedupe_products([product])
+    
+    return Benchmark('data_transformation.dedupe_products', run_one, solution.dedupe_products, records)
+
+def _field_extraction(count: int, depth: int, error_rate: float, seed: int, **options: Any) -> Benchmark:
+    solution = load_solution('03_field_extraction')
+    mapping = generators.extraction_mapping(depth)
+    extract_fields = solution.extract_fields
+    
+    def run_one(record: Dict[str, Any]) -> Dict[str, Any]:
+        return extract_fields(record, mapping)
+    
+    def run_batch(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [extract_fields(record, mapping) for record in records]
+    
+    records = generators.generate_extraction_records(count, depth, error_rate, seed)
+    return Benchmark('field_extraction.extract_fields', run_one, run_batch, records)
+
+def _json_field_extraction(count: int, depth: int, error_rate: float, seed: int, **options: Any) -> Benchmark:
+    solution = load_solution('03_field_extraction')
+    mapping = generators.extraction_mapping(depth)
+    extract_fields_json = solution.extract_fields_json
+    
+    def run_one(document: str) -> Dict[str, Any]:
+        return extract_fields_json(document, mapping)
+    
+    def run_batch(documents: List[str]) -> List[Dict[str, Any]]:
+        return [extract_fields_json(document, mapping) for document in documents]
+    
+    documents = generators.generate_extraction_documents(count, depth, error_rate, seed)
+    return Benchmark('field_extraction.extract_fields_json', run_one, run_batch, documents)
+
+# Benchmark factories, by short name
+BENCHMARKS: Dict[str, Callable[..., Benchmark]] = {
+    'validate': _schema_validation,
+    'validate_flat': _flat_schema_validation,
+    'normalize': _data_transformation,
+    'dedupe': _deduplication,
+    'extract': _field_extraction,
+    'extract_json': _json_field_extraction,
+}
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def measure(benchmark: Benchmark, repeat: int = 3) -> Dict[str, Any]:
+    """Measure throughput, latency percentiles and peak memory of a benchmark."""
+    records = benchmark.records
+    run_one, run_batch = benchmark.run_one, benchmark.run_batch
+    
+    # Warm up compiled plans and caches so the first timed run is not an outlier
+    run_batch(records[:100])
+    
+    best = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        run_batch(records)
+        best = min(best, time.perf_counter() - start)
+    
+    latencies = []
+    clock = time.perf_counter_ns
+    for record in records:
+        start = clock()
+        run_one(record)
+        latencies.append((clock() - start) / 1000)
+    latencies.sort()
+    
+    tracemalloc.start()
+    try:
+        result = run_batch(records)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    
+    return {
+        'records': len(records),
+        'seconds': best,
+        'records_per_sec': len(records) / best if best else 0.0,
+        'latency_us': {
+            'p50': percentile(latencies, 0.50),
+            'p90': percentile(latencies, 0.90),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0.0,
+        },
+        'peak_memory_bytes': peak,
+    }
+
+def run(
+    names: Optional[List[str]] = None,
+    count: int = 10000,
+    depth: int = 2,
+    error_rate: float = 0.05,
+    seed: int = 0,
+    repeat: int = 3,
+    shape_mix: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Run benchmarks and return a JSON-serializable report.
+    
+    Args:
+        names: Benchmarks to run (keys of BENCHMARKS); all by default
+        count: Records generated per benchmark
+        depth: Nesting depth of generated records
+        error_rate: Fraction of records containing an invalid value
+        seed: Random seed for the generators
+        repeat: Throughput runs per benchmark; the fastest is reported
+        shape_mix: Product shape weights for the normalize benchmark
+    
+    Raises:
+        ValueError: If a benchmark name is unknown
+    """
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {unknown}")
+    
+    results = {}
+    for name in names:
+        benchmark = BENCHMARKS[name](count, depth, error_rate, seed, shape_mix=shape_mix)
+        results[benchmark.name] = measure(benchmark, repeat)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'records': count,
+            'depth': depth,
+            'error_rate': error_rate,
+            'seed': seed,
+            'shape_mix': shape_mix,
+        },
+        'results': results,
+    }
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE
+) -> List[Dict[str, Any]]:
+    """
+    Compare a report against a baseline report.
+    
+    A benchmark regresses when its throughput drops, or its p50 latency or
+    peak memory grows, by more than tolerance (a fraction, e.g. 0.1 = 10%).
+    
+    Returns:
+        One entry per benchmark present in both reports, with the ratio of
+        each metric to the baseline and the list of regressed metrics
+    """
+    comparisons = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        ratios = {
+            'records_per_sec': _ratio(current['records_per_sec'], previous['records_per_sec']),
+            'latency_p50': _ratio(current['latency_us']['p50'], previous['latency_us']['p50']),
+            'peak_memory_bytes': _ratio(current['peak_memory_bytes'], previous['peak_memory_bytes']),
+        }
+        regressions = []
+        if ratios['records_per_sec'] < 1 - tolerance:
+            regressions.append('records_per_sec')
+        if ratios['latency_p50'] > 1 + tolerance:
+            regressions.append('latency_p50')
+        if ratios['peak_memory_bytes'] > 1 + tolerance:
+            regressions.append('peak_memory_bytes')
+        comparisons.append({'name': name, 'ratios': ratios, 'regressions': regressions})
+    return comparisons
+
+def _ratio(current: float, previous: float) -> float:
+    return current / previous if previous else 1.0
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Read a report written by save_report."""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    """Write a report as indented JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -1,6 +1,35 @@
-from typing import Any, Dict, Type, Optional, Union
+import math
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from copy import copy
+from functools import partial
+from itertools import count, islice
+from operator import attrgetter
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Tuple, Type, Optional,
+    Union, get_args, get_origin,
+)
 from dataclasses import dataclass
 
+try:
+    from types import UnionType
+except ImportError:  # Python < 3.10 has no `X | Y` union syntax
+    UnionType = Union
+
+try:
+    import core
+except ImportError:
+    # Running as a script from this directory: make the repository root importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core.cache import PlanCache
+from core.instrumentation import Instrumentation
+from core.transformers import map_batches
+from core.validators import FALSE_STRINGS, INVALID, TRUE_STRINGS, default_registry, parse_bool
+
+
 @dataclass
 class ValidationError(Exception):
     """Represents a validation error with contextual information.
@@ -18,6 +47,747 @@ class ValidationError(Exception):
         return f"{self.path}: {self.message}"
 
 
+# Sentinel returned by coercers when a value cannot be converted. Coercers
+# signal failure by value rather than by raising, so batch validation can
+# record bad rows without paying for exception unwinding.
+_INVALID = INVALID
+
+# Sentinel for fields absent from the input record
+_MISSING = object()
+
+# Supported validation modes: stop at the first error, or collect all errors
+VALIDATION_MODES = ("first", "collect")
+
+# Coerces a value to list, splitting strings on commas (used for List[T])
+_coerce_list = default_registry.coercer_for(list)
+
+
+def _get_coercer(target_type: Type) -> Callable[[Any], Any]:
+    """Returns the coercer function for a target type.
+    
+    Coercers come from the shared registry in core.validators, which
+    dispatches on (type(value), target_type) with a single dict lookup.
+    Coercers registered there later (e.g. for Decimal or an Enum) also apply
+    to schemas compiled earlier.
+    """
+    return default_registry.coercer_for(target_type)
+
+
+def _failure_message(value: Any, target_type: Type) -> str:
+    """Describes why a value could not be coerced to the target type.
+    
+    Only called once a coercer has rejected a value, so the type checks here
+    stay off the success path.
+    """
+    if value is None:
+        return "Value cannot be None"
+    if target_type == bool:
+        if isinstance(value, str):
+            value = value.lower()
+        return f"Cannot convert '{value}' to boolean"
+    if target_type == list:
+        return f"Cannot convert '{value}' to list"
+    if default_registry.lookup(type(value), target_type) is not None:
+        return f"Cannot convert '{value}' to {target_type.__name__}"
+    return f"Unsupported type conversion to {target_type.__name__}"
+
+
+# Lookup used when coercing whole columns of boolean strings
+_BOOL_STRINGS = {
+    **{spelling: True for spelling in TRUE_STRINGS},
+    **{spelling: False for spelling in FALSE_STRINGS},
+}
+
+
+def _bulk_bool(column: List[str]) -> List[bool]:
+    """Coerces a column of strings to bool in one pass."""
+    values = [_BOOL_STRINGS.get(value.lower(), _INVALID) for value in column]
+    if _INVALID in values:
+        raise ValueError("Column contains unrecognized boolean strings")
+    return values
+
+
+# Whole-column coercers for columns made up entirely of strings, keyed by
+# target type with the default registry's str coercer they stand in for.
+# Each either converts every cell or raises, in which case the column is
+# re-run value by value to locate the bad cells.
+_BULK_STRING_COERCERS: Dict[Type, Tuple[Callable[[str], Any], Callable[[List[str]], list]]] = {
+    int: (int, lambda column: list(map(int, column))),
+    float: (float, lambda column: list(map(float, column))),
+    bool: (parse_bool, _bulk_bool),
+}
+
+
+def _coerce_column(
+    coerce: Callable[[Any], Any],
+    target_type: Type,
+    column: List[Any]
+) -> Tuple[List[Any], List[Tuple[int, Optional[Exception]]]]:
+    """Coerces a whole column with the same semantics as the row path.
+    
+    Columns that already hold target_type values are copied as-is, and
+    all-string columns go through a single C-level map() where the
+    registry still holds the default string coercer for target_type.
+    Mixed columns fall back to calling the scalar coercer per value.
+    
+    Returns:
+        The converted values (None for failed cells) and a list of
+        (position, exception) pairs for the failed cells
+    """
+    column_types = set(map(type, column))
+    if column_types == {target_type}:
+        return list(column), []
+    if column_types == {str}:
+        scalar, bulk = _BULK_STRING_COERCERS.get(target_type, (None, None))
+        # A coercer registered for strings since replaces the bulk path too
+        if bulk is not None and default_registry.lookup(str, target_type) is scalar:
+            try:
+                return bulk(column), []
+            except (ValueError, TypeError):
+                pass
+    
+    values = []
+    failures = []
+    for position, value in enumerate(column):
+        if value is _MISSING:
+            values.append(None)
+            failures.append((position, None))
+            continue
+        try:
+            converted = coerce(value)
+        except Exception as e:
+            values.append(None)
+            failures.append((position, e))
+            continue
+        if converted is _INVALID:
+            values.append(None)
+            failures.append((position, None))
+        else:
+            values.append(converted)
+    return values, failures
+
+
+class RowError(NamedTuple):
+    """A compact record of a validation failure in a batch.
+    
+    Attributes:
+        index: Position of the failing record in the input batch
+        path: The path to the field that failed validation
+        message: A descriptive error message
+        value: The value that failed validation
+    """
+    index: int
+    path: str
+    message: str
+    value: Any
+    
+    def to_exception(self) -> ValidationError:
+        """Builds the equivalent ValidationError."""
+        return ValidationError(self.path, self.message, self.value)
+
+
+@dataclass
+class BatchResult:
+    """The outcome of validating a batch of records.
+    
+    Attributes:
+        rows: Validated records, in input order, excluding failed records
+        errors: RowErrors in input order; one per failed record, or several
+            per record in "collect" mode
+    """
+    rows: List[Dict[str, Any]]
+    errors: List[RowError]
+    
+    def validation_errors(self) -> List[ValidationError]:
+        """Materializes the row errors as ValidationError instances."""
+        return [error.to_exception() for error in self.errors]
+
+
+@dataclass
+class ValidationReport:
+    """The outcome of validating a single record in "collect" mode.
+    
+    Attributes:
+        data: The validated record, or None if any field failed
+        errors: Every validation error found, up to the error budget
+    """
+    data: Optional[Dict[str, Any]]
+    errors: List[ValidationError]
+    
+    @property
+    def valid(self) -> bool:
+        """Whether the record passed validation."""
+        return not self.errors
+
+
+@dataclass
+class ColumnarResult:
+    """The outcome of validating a batch of records column by column.
+    
+    Attributes:
+        columns: Coerced values per field, one entry per input record; cells
+            that failed validation hold None
+        valid: Per-row mask, True where the record passed validation
+        errors: Every RowError found, ordered by row index then field
+    """
+    columns: Dict[str, List[Any]]
+    valid: List[bool]
+    errors: List[RowError]
+    
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Pivots the valid rows back into a list of dictionaries."""
+        names = list(self.columns)
+        return [
+            dict(zip(names, values))
+            for values, valid in zip(zip(*self.columns.values()), self.valid)
+            if valid
+        ]
+
+
+# Node kinds of a compiled schema. Nodes are plain tuples whose first item is
+# the kind:
+#   (_SCALAR, coercer, target_type)
+#   (_OPTIONAL, inner_node)
+#   (_LIST, item_node)
+#   (_MAPPING, key_node, value_node)
+#   (_OBJECT, ((field_name, node), ...))
+_SCALAR = 0
+_OPTIONAL = 1
+_LIST = 2
+_MAPPING = 3
+_OBJECT = 4
+
+
+def _compile_node(spec: Any) -> tuple:
+    """Compiles a schema entry into a node tree.
+    
+    Supports nested schema dicts, plain types and the typing forms
+    List[T], Dict[K, V] and Optional[T].
+    
+    Raises:
+        TypeError: If the schema entry is not a supported type
+    """
+    if isinstance(spec, dict):
+        return (_OBJECT, tuple(
+            (field_name, _compile_node(field_spec))
+            for field_name, field_spec in spec.items()
+        ))
+    
+    origin = get_origin(spec)
+    args = get_args(spec)
+    if origin is Union or origin is UnionType:
+        members = [arg for arg in args if arg is not type(None)]
+        if len(members) == 1 and len(args) == 2:
+            return (_OPTIONAL, _compile_node(members[0]))
+        raise TypeError(f"Unsupported union in schema: {spec!r}")
+    if origin is list and args:
+        return (_LIST, _compile_node(args[0]))
+    if origin is dict and args:
+        key_node = _compile_node(args[0])
+        if key_node[0] != _SCALAR:
+            raise TypeError(f"Dictionary keys must be plain types: {spec!r}")
+        return (_MAPPING, key_node, _compile_node(args[1]))
+    if origin is not None:
+        # Unparameterized generics such as typing.List behave like the builtin
+        spec = origin
+    if not isinstance(spec, type):
+        raise TypeError(f"Unsupported schema type: {spec!r}")
+    return (_SCALAR, _get_coercer(spec), spec)
+
+
+def _instrument_node(node: tuple, name: str, instrumentation: Instrumentation) -> tuple:
+    """Copies a node tree with every scalar coercer wrapped for instrumentation.
+    
+    Fields are named by schema path: 'seller.name' for nested objects,
+    'items[]' for list items, and 'counts{key}' / 'counts{}' for mapping
+    keys and values.
+    """
+    kind = node[0]
+    if kind == _SCALAR:
+        return (_SCALAR, instrumentation.wrap(name, node[1], _INVALID), node[2])
+    if kind == _OPTIONAL:
+        return (_OPTIONAL, _instrument_node(node[1], name, instrumentation))
+    if kind == _LIST:
+        return (_LIST, _instrument_node(node[1], f"{name}[]", instrumentation))
+    if kind == _MAPPING:
+        return (
+            _MAPPING,
+            _instrument_node(node[1], f"{name}{{key}}", instrumentation),
+            _instrument_node(node[2], f"{name}{{}}", instrumentation),
+        )
+    prefix = f"{name}." if name else ""
+    return (_OBJECT, tuple(
+        (field_name, _instrument_node(field_node, prefix + field_name, instrumentation))
+        for field_name, field_node in node[1]
+    ))
+
+
+def _render_path(path: Optional[tuple]) -> str:
+    """Renders a linked (parent, segment) path as e.g. 'items[3].price'.
+    
+    Paths are kept as linked tuples while walking and only rendered to
+    strings when an error is reported.
+    """
+    if path is None:
+        return "root"
+    segments = []
+    while path is not None:
+        path, segment = path
+        segments.append(segment)
+    parts = []
+    for segment in reversed(segments):
+        if isinstance(segment, int):
+            parts.append(f"[{segment}]")
+        elif parts:
+            parts.append(f".{segment}")
+        else:
+            parts.append(str(segment))
+    return "".join(parts)
+
+
+def _reject(
+    errors: List[RowError],
+    index: int,
+    path: Optional[tuple],
+    value: Any,
+    target_type: Type,
+    exc: Optional[Exception] = None
+) -> None:
+    """Records a failed scalar coercion."""
+    if exc is not None:
+        message = f"Unexpected error during conversion: {str(exc)}"
+    else:
+        message = _failure_message(value, target_type)
+    errors.append(RowError(index, _render_path(path), message, value))
+
+
+def _not_a_dict(errors: List[RowError], index: int, path: Optional[tuple], value: Any) -> None:
+    """Records a value that should have been a dictionary."""
+    if path is None:
+        message = "Input must be a dictionary"
+    elif value is None:
+        message = "Value cannot be None"
+    else:
+        message = "Value must be a dictionary"
+    errors.append(RowError(index, _render_path(path), message, value))
+
+
+def _walk(
+    node: tuple,
+    value: Any,
+    path: Optional[tuple],
+    index: int,
+    errors: List[RowError],
+    max_errors: int
+) -> Any:
+    """Validates a value against a compiled node tree.
+    
+    The tree is walked with an explicit stack instead of recursion. Scalar
+    children of objects, lists and mappings are coerced inline, so flat
+    schemas never touch the stack. Containers are created when their node is
+    visited and filled in as their children are processed.
+    
+    Returns:
+        The converted value, or None once max_errors failures have been
+        appended to errors. Callers detect failure by the growth of errors.
+    """
+    limit = len(errors) + max_errors
+    holder = [None]
+    stack = [(node, value, path, holder, 0)]
+    pop = stack.pop
+    
+    while stack:
+        node, value, path, target, key = pop()
+        kind = node[0]
+        
+        if kind == _OBJECT:
+            if not isinstance(value, dict):
+                _not_a_dict(errors, index, path, value)
+                if len(errors) >= limit:
+                    return None
+                continue
+            out = {}
+            target[key] = out
+            pending = []
+            for field_name, child in node[1]:
+                child_value = value.get(field_name, _MISSING)
+                if child_value is _MISSING:
+                    errors.append(RowError(
+                        index,
+                        _render_path((path, field_name)),
+                        f"Required field '{field_name}' is missing",
+                        None
+                    ))
+                    if len(errors) >= limit:
+                        return None
+                elif child[0] == _SCALAR:
+                    try:
+                        converted = child[1](child_value)
+                        if converted is _INVALID:
+                            _reject(errors, index, (path, field_name), child_value, child[2])
+                    except Exception as e:
+                        converted = _INVALID
+                        _reject(errors, index, (path, field_name), child_value, child[2], e)
+                    if converted is _INVALID:
+                        if len(errors) >= limit:
+                            return None
+                    else:
+                        out[field_name] = converted
+                else:
+                    # Reserve the key so output order follows the schema
+                    out[field_name] = None
+                    pending.append((child, child_value, (path, field_name), out, field_name))
+            if pending:
+                stack.extend(reversed(pending))
+        
+        elif kind == _SCALAR:
+            try:
+                converted = node[1](value)
+                if converted is _INVALID:
+                    _reject(errors, index, path, value, node[2])
+            except Exception as e:
+                converted = _INVALID
+                _reject(errors, index, path, value, node[2], e)
+            if converted is _INVALID:
+                if len(errors) >= limit:
+                    return None
+            else:
+                target[key] = converted
+        
+        elif kind == _OPTIONAL:
+            if value is None:
+                target[key] = None
+            else:
+                stack.append((node[1], value, path, target, key))
+        
+        elif kind == _LIST:
+            items = _coerce_list(value)
+            if items is _INVALID:
+                _reject(errors, index, path, value, list)
+                if len(errors) >= limit:
+                    return None
+                continue
+            item_node = node[1]
+            if item_node[0] == _SCALAR:
+                coerce, item_type = item_node[1], item_node[2]
+                out = []
+                for position, item in enumerate(items):
+                    try:
+                        converted = coerce(item)
+                        if converted is _INVALID:
+                            _reject(errors, index, (path, position), item, item_type)
+                    except Exception as e:
+                        converted = _INVALID
+                        _reject(errors, index, (path, position), item, item_type, e)
+                    if converted is _INVALID:
+                        if len(errors) >= limit:
+                            return None
+                    else:
+                        out.append(converted)
+                target[key] = out
+            else:
+                out = [None] * len(items)
+                target[key] = out
+                for position in range(len(items) - 1, -1, -1):
+                    stack.append((item_node, items[position], (path, position), out, position))
+        
+        else:  # _MAPPING
+            if not isinstance(value, dict):
+                _not_a_dict(errors, index, path, value)
+                if len(errors) >= limit:
+                    return None
+                continue
+            _, key_node, value_node = node
+            key_coerce, key_type = key_node[1], key_node[2]
+            value_is_scalar = value_node[0] == _SCALAR
+            out = {}
+            target[key] = out
+            pending = []
+            for item_key, item in value.items():
+                try:
+                    converted_key = key_coerce(item_key)
+                    if converted_key is _INVALID:
+                        _reject(errors, index, (path, item_key), item_key, key_type)
+                except Exception as e:
+                    converted_key = _INVALID
+                    _reject(errors, index, (path, item_key), item_key, key_type, e)
+                if converted_key is _INVALID:
+                    if len(errors) >= limit:
+                        return None
+                    continue
+                if value_is_scalar:
+                    try:
+                        converted = value_node[1](item)
+                        if converted is _INVALID:
+                            _reject(errors, index, (path, item_key), item, value_node[2])
+                    except Exception as e:
+                        converted = _INVALID
+                        _reject(errors, index, (path, item_key), item, value_node[2], e)
+                    if converted is _INVALID:
+                        if len(errors) >= limit:
+                            return None
+                    else:
+                        out[converted_key] = converted
+                else:
+                    out[converted_key] = None
+                    pending.append((value_node, item, (path, item_key), out, converted_key))
+            if pending:
+                stack.extend(reversed(pending))
+    
+    return holder[0]
+
+
+def _flat_fields(fields: Tuple[Tuple[str, tuple], ...]) -> Optional[Tuple[Tuple[str, Callable[[Any], Any], Type], ...]]:
+    """Returns (field_name, coercer, target_type) per field if every field is a scalar.
+    
+    Flat schemas are validated by a straight loop over this table instead
+    of _walk, whose stack and node dispatch only pay off for nested,
+    list, mapping and optional fields.
+    """
+    if any(node[0] != _SCALAR for _, node in fields):
+        return None
+    return tuple((field_name, node[1], node[2]) for field_name, node in fields)
+
+
+class CompiledSchema:
+    """A schema resolved once into a per-field coercer table.
+    
+    Compiling hoists the type dispatch out of the per-record loop: every
+    field's coercer is looked up a single time, so validating a record is
+    one function call per field. Nested schema dicts and typing forms
+    (List[T], Dict[K, V], Optional[T]) compile into a node tree that is
+    walked iteratively, with errors reported at paths like 'items[3].price'.
+    
+    Example:
+        compiled = SchemaValidator().compile({'age': int, 'active': bool})
+        compiled.validate({'age': '25', 'active': 'true'})
+        # {'age': 25, 'active': True}
+    
+    Attributes:
+        schema: A snapshot of the schema this plan was compiled from
+        root: The compiled node tree for the whole record
+        fields: Tuple of (field_name, node) pairs in schema order
+    """
+    
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = dict(schema)
+        self.root = _compile_node(self.schema)
+        self.fields: Tuple[Tuple[str, tuple], ...] = self.root[1]
+        self._flat = _flat_fields(self.fields)
+        self._instrumented: Optional[Tuple[Instrumentation, 'CompiledSchema']] = None
+    
+    def instrumented(self, instrumentation: Instrumentation) -> 'CompiledSchema':
+        """Returns a copy of this plan that records per-field metrics.
+        
+        Every scalar coercer is wrapped to count calls, failures and time,
+        and whole records are counted under instrumentation.records. The
+        original plan is unchanged and pays no instrumentation cost. The
+        copy is reused for repeated calls with the same instrumentation.
+        """
+        cached = self._instrumented
+        if cached is not None and cached[0] is instrumentation:
+            return cached[1]
+        
+        compiled = copy(self)
+        compiled._instrumented = None
+        compiled.root = _instrument_node(self.root, "", instrumentation)
+        compiled.fields = compiled.root[1]
+        compiled._flat = _flat_fields(compiled.fields)
+        compiled._validate_record = instrumentation.wrap_records(compiled._validate_record, None)
+        self._instrumented = (instrumentation, compiled)
+        return compiled
+    
+    def _validate_record(
+        self,
+        data: Any,
+        index: int,
+        errors: List[RowError],
+        max_errors: int
+    ) -> Optional[Dict[str, Any]]:
+        """Validates one record, appending at most max_errors RowErrors.
+        
+        Returns:
+            The validated record, or None if any field failed
+        """
+        start = len(errors)
+        flat = self._flat
+        if flat is None:
+            result = _walk(self.root, data, None, index, errors, max_errors)
+            return None if len(errors) > start else result
+        
+        if not isinstance(data, dict):
+            _not_a_dict(errors, index, None, data)
+            return None
+        limit = start + max_errors
+        get = data.get
+        result = {}
+        for field_name, coerce, target_type in flat:
+            value = get(field_name, _MISSING)
+            if value is _MISSING:
+                errors.append(RowError(index, field_name, f"Required field '{field_name}' is missing", None))
+            else:
+                try:
+                    converted = coerce(value)
+                except Exception as e:
+                    _reject(errors, index, (None, field_name), value, target_type, e)
+                else:
+                    if converted is not _INVALID:
+                        result[field_name] = converted
+                        continue
+                    _reject(errors, index, (None, field_name), value, target_type)
+            if len(errors) >= limit:
+                return None
+        return None if len(errors) > start else result
+    
+    def _error_budget(self, mode: str, max_errors: Optional[int]) -> int:
+        """Resolves the per-record error budget for a validation mode."""
+        if mode not in VALIDATION_MODES:
+            raise ValueError(f"Invalid validation mode: {mode}")
+        if max_errors is not None and max_errors < 1:
+            raise ValueError("max_errors must be at least 1")
+        if mode == "first":
+            return 1
+        return max_errors or sys.maxsize
+    
+    def validate(
+        self,
+        data: Dict[str, Any],
+        mode: str = "first",
+        max_errors: Optional[int] = None
+    ) -> Union[Dict[str, Any], ValidationReport]:
+        """Validates input data against the compiled schema.
+        
+        Args:
+            data: The input dictionary to validate
+            mode: "first" to raise on the first error, or "collect" to return
+                a ValidationReport with every error found in one pass
+            max_errors: In "collect" mode, stop validating the record once
+                this many errors have been found
+            
+        Returns:
+            A new dictionary with all values converted to their expected types,
+            or a ValidationReport in "collect" mode
+            
+        Raises:
+            ValidationError: If any field fails validation in "first" mode
+        """
+        errors: List[RowError] = []
+        result = self._validate_record(data, 0, errors, self._error_budget(mode, max_errors))
+        if mode == "collect":
+            return ValidationReport(result, [error.to_exception() for error in errors])
+        if errors:
+            raise errors[0].to_exception()
+        return result
+    
+    def validate_many(
+        self,
+        records: Iterable[Dict[str, Any]],
+        mode: str = "first",
+        max_errors: Optional[int] = None
+    ) -> BatchResult:
+        """Validates a batch of records without raising.
+        
+        Failed records are reported as RowError tuples rather than exceptions;
+        call BatchResult.validation_errors() to get ValidationError objects.
+        
+        Args:
+            records: An iterable of input dictionaries
+            mode: "first" to report only the first error of each failed
+                record, or "collect" to report every error
+            max_errors: In "collect" mode, the maximum errors reported per record
+            
+        Returns:
+            A BatchResult with the validated rows and per-row errors
+        """
+        budget = self._error_budget(mode, max_errors)
+        rows = []
+        errors: List[RowError] = []
+        validate_record = self._validate_record
+        for index, data in enumerate(records):
+            result = validate_record(data, index, errors, budget)
+            if result is not None:
+                rows.append(result)
+        return BatchResult(rows, errors)
+    
+    def validate_columnar(self, records: Iterable[Dict[str, Any]]) -> ColumnarResult:
+        """Validates a batch of records as columns instead of rows.
+        
+        Records are pivoted into one column per top-level field and each
+        column is coerced in bulk (see _coerce_column). Nested fields are
+        walked per cell. Values are identical to the row path; every error
+        is reported, as in "collect" mode.
+        
+        Args:
+            records: An iterable of input dictionaries
+            
+        Returns:
+            A ColumnarResult with per-field columns, a per-row validity mask
+            and the errors found
+        """
+        records = records if isinstance(records, list) else list(records)
+        valid = [True] * len(records)
+        errors: List[RowError] = []
+        
+        not_dicts = set()
+        for index, data in enumerate(records):
+            if not isinstance(data, dict):
+                not_dicts.add(index)
+                valid[index] = False
+                errors.append(RowError(index, "root", "Input must be a dictionary", data))
+        if not_dicts:
+            records = [{} if index in not_dicts else data for index, data in enumerate(records)]
+        
+        columns = {}
+        for field_name, node in self.fields:
+            column = [data.get(field_name, _MISSING) for data in records]
+            
+            if node[0] == _SCALAR:
+                values, failures = _coerce_column(node[1], node[2], column)
+                for index, exc in failures:
+                    if index in not_dicts:
+                        continue
+                    value = column[index]
+                    if value is _MISSING:
+                        errors.append(RowError(
+                            index,
+                            field_name,
+                            f"Required field '{field_name}' is missing",
+                            None
+                        ))
+                    else:
+                        _reject(errors, index, (None, field_name), value, node[2], exc)
+                    valid[index] = False
+            else:
+                values = []
+                for index, value in enumerate(column):
+                    if value is _MISSING:
+                        if index not in not_dicts:
+                            errors.append(RowError(
+                                index,
+                                field_name,
+                                f"Required field '{field_name}' is missing",
+                                None
+                            ))
+                        values.append(None)
+                        continue
+                    start = len(errors)
+                    converted = _walk(node, value, (None, field_name), index, errors, sys.maxsize)
+                    if len(errors) > start:
+                        valid[index] = False
+                        converted = None
+                    values.append(converted)
+            
+            columns[field_name] = values
+        
+        errors.sort(key=attrgetter('index'))
+        return ColumnarResult(columns, valid, errors)
+
+
+# Compiled schemas shared by every SchemaValidator in the process; resize
+# with schema_cache.resize() and inspect with schema_cache.stats()
+schema_cache: PlanCache[CompiledSchema] = PlanCache(CompiledSchema, maxsize=256)
+
+
 class SchemaValidator:
     """A schema validator that ensures data conforms to expected types.
     
@@ -27,6 +797,11 @@ class SchemaValidator:
     3. Provide clear error messages when validation fails
     4. Handle nested data structures gracefully
     
+    Schemas are compiled into a CompiledSchema on first use and cached in
+    schema_cache, which every validator in the process shares, so repeated
+    calls with an equivalent schema skip the type dispatch, whichever
+    validator or thread made them.
+    
     Example:
         validator = SchemaValidator()
         data = {'age': '25', 'active': 'true'}
@@ -35,45 +810,139 @@ class SchemaValidator:
         # result = {'age': 25, 'active': True}
     """
     
-    def validate(self, data: Dict[str, Any], schema: Dict[str, Type]) -> Dict[str, Any]:
+    def __init__(self, instrumentation: Optional[Instrumentation] = None):
+        """Creates a validator.
+        
+        Args:
+            instrumentation: If given, schemas compile into instrumented plans
+                that record per-field calls, failures and time into it
+        """
+        self.instrumentation = instrumentation
+    
+    def compile(self, schema: Dict[str, Type]) -> CompiledSchema:
+        """Compiles a schema into a reusable validation plan.
+        
+        Plans are cached process-wide in schema_cache, keyed by the schema's
+        content (see core.cache.fingerprint), so equal schemas built by
+        different validators or threads compile once. Mutating a schema dict
+        in place triggers a recompile.
+        
+        Args:
+            schema: A dictionary mapping field names to their expected types
+            
+        Returns:
+            The compiled schema
+        """
+        compiled = schema_cache.get(schema)
+        if self.instrumentation is not None:
+            compiled = compiled.instrumented(self.instrumentation)
+        return compiled
+    
+    def validate(
+        self,
+        data: Dict[str, Any],
+        schema: Dict[str, Type],
+        mode: str = "first",
+        max_errors: Optional[int] = None
+    ) -> Union[Dict[str, Any], ValidationReport]:
         """Validates input data against a schema and returns transformed data.
         
         Args:
             data: The input dictionary to validate
             schema: A dictionary mapping field names to their expected types
+            mode: "first" to raise on the first error, or "collect" to return
+                a ValidationReport with every error found in one pass
+            max_errors: In "collect" mode, stop validating the record once
+                this many errors have been found
             
         Returns:
-            A new dictionary with all values converted to their expected types
+            A new dictionary with all values converted to their expected types,
+            or a ValidationReport in "collect" mode
             
         Raises:
-            ValidationError: If any field fails validation
+            ValidationError: If any field fails validation in "first" mode
         """
-        if not isinstance(data, dict):
-            raise ValidationError("root", "Input must be a dictionary", data)
+        return self.compile(schema).validate(data, mode, max_errors)
+    
+    def validate_many(
+        self,
+        records: Iterable[Dict[str, Any]],
+        schema: Dict[str, Type],
+        mode: str = "first",
+        max_errors: Optional[int] = None
+    ) -> BatchResult:
+        """Validates a batch of records against a schema without raising.
+        
+        Args:
+            records: An iterable of input dictionaries
+            schema: A dictionary mapping field names to their expected types
+            mode: "first" to report only the first error of each failed
+                record, or "collect" to report every error
+            max_errors: In "collect" mode, the maximum errors reported per record
             
-        result = {}
-        for field_name, expected_type in schema.items():
-            # Alternative for handling missing `field_name` in `data` is to use `data.get(field_name)`
-            # With `data.get(field_name)`, we can provide a default value if `field_name` is missing
-            # Default value can be `None` or any other value. 
-            # For example, `data.get(field_name, 'default_value')`
-            if field_name not in data:
-                raise ValidationError(
-                    field_name,
-                    f"Required field '{field_name}' is missing",
-                    None
-                )
+        Returns:
+            A BatchResult with the validated rows and a RowError
+            (index, path, message, value) for every failure
+        """
+        return self.compile(schema).validate_many(records, mode, max_errors)
+    
+    async def validate_stream(
+        self,
+        records: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]],
+        schema: Dict[str, Type],
+        mode: str = "first",
+        max_errors: Optional[int] = None,
+        batch_size: int = 500,
+        executor: Optional[Executor] = None
+    ) -> AsyncIterator[BatchResult]:
+        """Validates an async stream of records in micro-batches.
+        
+        Records are validated batch_size at a time (see
+        core.transformers.map_batches), handing control back to the event
+        loop between batches, so validation overlaps with network I/O
+        instead of blocking it. With an executor, batches are validated in
+        its threads or processes while the next batch is read; process
+        pools validate with a per-process validator, so this validator's
+        instrumentation is not used there.
+        
+        Args:
+            records: An async iterable (or plain iterable) of input dictionaries
+            schema: A dictionary mapping field names to their expected types
+            mode: As for validate_many
+            max_errors: As for validate_many
+            batch_size: Number of records validated per batch
+            executor: Optional thread or process pool to validate batches in
             
-            try:
-                result[field_name] = self._coerce_value(
-                    data[field_name], 
-                    expected_type,
-                    field_name
-                )
-            except ValidationError as e:
-                raise ValidationError(e.path, e.message, e.value)
-                
-        return result
+        Yields:
+            One BatchResult per batch, in input order. RowError indices are
+            positions in the whole stream.
+        """
+        self.compile(schema)._error_budget(mode, max_errors)
+        validator = None if isinstance(executor, ProcessPoolExecutor) else self
+        validate_batch = partial(_validate_batch, validator, schema, mode, max_errors)
+        offset = 0
+        async for seen, result in map_batches(records, validate_batch, batch_size, executor):
+            if offset:
+                result.errors = [error._replace(index=error.index + offset) for error in result.errors]
+            offset += seen
+            yield result
+    
+    def validate_columnar(
+        self,
+        records: Iterable[Dict[str, Any]],
+        schema: Dict[str, Type]
+    ) -> ColumnarResult:
+        """Validates a batch of records against a schema column by column.
+        
+        Args:
+            records: An iterable of input dictionaries
+            schema: A dictionary mapping field names to their expected types
+            
+        Returns:
+            A ColumnarResult; use .columns for a column dict or .to_rows()
+            for a list of validated dictionaries
+        """
+        return self.compile(schema).validate_columnar(records)
     
     def _coerce_value(self, value: Any, target_type: Type, path: str) -> Any:
         """Attempts to convert a value to the target type.
@@ -89,73 +958,293 @@ class SchemaValidator:
         Raises:
             ValidationError: If the value cannot be converted
         """
-        if value is None:
-            raise ValidationError(path, "Value cannot be None", value)
-            
-        if isinstance(value, target_type):
-            return value
-            
-        try:
-            # Handle boolean special case
-            if target_type == bool:
-                if isinstance(value, str):
-                    value = value.lower()
-                    # check for potential boolean values (could be more out there, WIP...)
-                    if value in ('true', '1', 'yes'):
-                        return True
-                    if value in ('false', '0', 'no'):
-                        return False
-                raise ValidationError(
-                    path,
-                    f"Cannot convert '{value}' to boolean",
-                    value
-                )
-                
-            # Handle list special case
-            if target_type == list:
-                if isinstance(value, str):
-                    # Handle empty string case
-                    if not value:
-                        return []
-                    # Assume comma-separated string (TODO: theres room to improve this)
-                    return [v.strip() for v in value.split(',')]
-                if hasattr(value, '__iter__') and not isinstance(value, str):
-                    return list(value)
-                raise ValidationError(
-                    path,
-                    f"Cannot convert '{value}' to list",
-                    value
-                )
-                
-            # Handle numeric types
-            if target_type in (int, float):
-                try:
-                    return target_type(value)
-                except (ValueError, TypeError):
-                    raise ValidationError(
-                        path,
-                        f"Cannot convert '{value}' to {target_type.__name__}",
-                        value
-                    )
-                    
-            # Handle strings
-            if target_type == str:
-                return str(value)
-                
-            raise ValidationError(
-                path,
-                f"Unsupported type conversion to {target_type.__name__}",
-                value
-            )
-            
-        except ValidationError:
-            raise
-        except Exception as e:
-            raise ValidationError(
-                path,
-                f"Unexpected error during conversion: {str(e)}",
-                value
-            )
+        errors: List[RowError] = []
+        converted = _walk(_compile_node(target_type), value, (None, path), 0, errors, 1)
+        if errors:
+            raise errors[0].to_exception()
+        return converted
+
+
+# Validator used for validate_stream batches sent to worker processes
+_worker_validator: Optional[SchemaValidator] = None
+
+
+def _validate_batch(
+    validator: Optional[SchemaValidator],
+    schema: Dict[str, Type],
+    mode: str,
+    max_errors: Optional[int],
+    records: List[Dict[str, Any]]
+) -> Tuple[int, BatchResult]:
+    """Validates one validate_stream batch, returning its size and result.
+    
+    Module-level so it can be pickled to process pools, which pass no
+    validator and reuse one cached validator per worker process.
+    """
+    global _worker_validator
+    if validator is None:
+        if _worker_validator is None:
+            _worker_validator = SchemaValidator()
+        validator = _worker_validator
+    return len(records), validator.validate_many(records, schema, mode, max_errors)
+
+
+# Defaults for infer_schema: records sampled, items sampled per list, and the
+# number of distinct keys above which sparse objects become Dict[str, V]
+INFERENCE_SAMPLE_SIZE = 1000
+INFERENCE_LIST_ITEMS = 50
+INFERENCE_MAX_FIELDS = 64
+
+
+@dataclass
+class FieldSummary:
+    """Observations behind one inferred field.
+    
+    Attributes:
+        path: Field path, named as for instrumentation ('seller.name',
+            'items[]', 'counts{}')
+        type: The type inferred for the field
+        present: Sampled values at this path (including None)
+        nulls: How many of them were None
+        distinct: Distinct non-null scalar values (0 for containers)
+        confidence: Share of non-null values that validate as type without
+            errors (for containers, that have the container's shape)
+        in_schema: False for fields left out because they were missing from
+            too many records (SchemaValidator treats every field as required)
+    """
+    path: str
+    type: Any
+    present: int
+    nulls: int
+    distinct: int
+    confidence: float
+    in_schema: bool = True
+
+
+@dataclass
+class InferredSchema:
+    """The outcome of infer_schema.
+    
+    Attributes:
+        schema: A schema dict for SchemaValidator.validate
+        fields: A FieldSummary per field path, parents before children
+        sampled: Number of records in the sample
+        seen: Number of records read from the input
+    """
+    schema: Dict[str, Any]
+    fields: List[FieldSummary]
+    sampled: int
+    seen: int
+
+
+def _reservoir_sample(records: Iterable[Any], size: int, rng: random.Random) -> Tuple[List[Any], int]:
+    """Draws a uniform sample of up to size records in one pass (Algorithm L).
+    
+    Skipped runs of records are consumed with islice without touching them
+    in Python, so the cost per record after the first size is tiny.
+    
+    Returns:
+        The sample and the number of records read
+    """
+    # zip pulls a record before its number, so once records run out the
+    # counter's next value is one past the last record read
+    counter = count(1)
+    numbered = zip(records, counter)
+    sample = [record for record, _ in islice(numbered, size)]
+    if len(sample) < size:
+        return sample, len(sample)
+    weight = math.exp(math.log(1.0 - rng.random()) / size)
+    while True:
+        skip = int(math.log(1.0 - rng.random()) / math.log(1.0 - weight))
+        chosen = next(islice(numbered, skip, None), None)
+        if chosen is None:
+            return sample, next(counter) - 1
+        sample[rng.randrange(size)] = chosen[0]
+        weight *= math.exp(math.log(1.0 - rng.random()) / size)
+
+
+def _value_kind(value: Any) -> type:
+    """Classifies a value as bool, int, float, str, dict, list or object."""
+    kind = value.__class__
+    if kind in (bool, int, float, str, dict, list):
+        return kind
+    if isinstance(value, (list, tuple)):
+        return list
+    return object
+
+
+def _string_kind(value: str) -> type:
+    """The narrowest type a scraped string reliably converts to."""
+    try:
+        int(value)
+        return int
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return float
+    except ValueError:
+        pass
+    if value.strip().lower() in TRUE_STRINGS | FALSE_STRINGS:
+        return bool
+    return str
+
+
+def _scalar_type(values: List[Any]) -> type:
+    """Picks the type every scalar value (native or string-encoded) fits."""
+    kinds = set()
+    for value in values:
+        kind = value.__class__
+        kinds.add(_string_kind(value) if kind is str else kind)
+    if kinds <= {int}:
+        return int
+    if kinds <= {int, float}:
+        return float
+    if kinds == {bool}:
+        return bool
+    return str
+
+
+def _nullable(spec: Any) -> Any:
+    """Wraps a spec in Optional, falling back to the bare container type.
+    
+    typing cannot build Optional[...] around nested schema dicts (they are
+    unhashable), so nullable nested objects and lists of objects are typed
+    as Optional[dict] / Optional[list] and lose their inner validation.
+    """
+    try:
+        return Optional[spec]
+    except TypeError:
+        return Optional[dict if isinstance(spec, dict) else list]
+
+
+def _infer_values(
+    values: List[Any],
+    path: str,
+    summaries: List[FieldSummary],
+    list_items: int,
+    max_fields: int,
+    min_presence: float
+) -> Any:
+    """Infers the spec for the values observed at one path."""
+    present = [value for value in values if value is not None]
+    summary = FieldSummary(path, None, len(values), len(values) - len(present), 0, 0.0)
+    summaries.append(summary)
+    if not present:
+        summary.type = Optional[str]
+        return summary.type
+    
+    kinds = Counter(_value_kind(value) for value in present)
+    kind, matching = kinds.most_common(1)[0]
+    if kind is dict:
+        dicts = [value for value in present if value.__class__ is dict]
+        spec = _infer_object(dicts, path, summaries, list_items, max_fields, min_presence)
+        summary.confidence = matching / len(present)
+    elif kind is list:
+        items = [item for value in present if _value_kind(value) is list for item in value[:list_items]]
+        if items:
+            spec = List[_infer_values(items, f"{path}[]", summaries, list_items, max_fields, min_presence)]
+        else:
+            spec = list
+        summary.confidence = matching / len(present)
+    else:
+        scalars = [value for value in present if _value_kind(value) not in (dict, list)]
+        spec = _scalar_type(scalars)
+        coerce = _get_coercer(spec)
+        summary.confidence = sum(coerce(value) is not _INVALID for value in present) / len(present)
+        summary.distinct = len({value for value in scalars if value.__hash__ is not None})
+    
+    summary.type = _nullable(spec) if summary.nulls else spec
+    return summary.type
+
+
+def _infer_object(
+    records: List[Dict[str, Any]],
+    path: str,
+    summaries: List[FieldSummary],
+    list_items: int,
+    max_fields: int,
+    min_presence: float
+) -> Any:
+    """Infers a nested schema dict (or Dict[str, V] for sparse keyed maps)."""
+    observed: Dict[str, List[Any]] = {}
+    for record in records:
+        for key, value in record.items():
+            observed.setdefault(key, []).append(value)
+    
+    if len(observed) > max_fields and all(len(values) < len(records) / 2 for values in observed.values()):
+        # Many keys, none common: keys are data (ids, SKUs), not fields
+        values = [value for field_values in observed.values() for value in field_values]
+        return Dict[str, _infer_values(values, f"{path}{{}}", summaries, list_items, max_fields, min_presence)]
+    
+    schema = {}
+    prefix = f"{path}." if path else ""
+    for key, values in observed.items():
+        spec = _infer_values(values, prefix + str(key), summaries, list_items, max_fields, min_presence)
+        if len(values) >= min_presence * len(records):
+            schema[key] = spec
+        else:
+            for summary in reversed(summaries):
+                if summary.path == prefix + str(key):
+                    summary.in_schema = False
+                    break
+    return schema
+
+
+def infer_schema(
+    records: Iterable[Dict[str, Any]],
+    sample_size: int = INFERENCE_SAMPLE_SIZE,
+    max_records: Optional[int] = None,
+    min_presence: float = 1.0,
+    list_items: int = INFERENCE_LIST_ITEMS,
+    max_fields: int = INFERENCE_MAX_FIELDS,
+    seed: Optional[int] = None
+) -> InferredSchema:
+    """Infers a SchemaValidator schema from sample records.
+    
+    A uniform reservoir sample of sample_size records is drawn in one pass
+    over records (any iterable, e.g. a stream), so memory is bounded by the
+    sample; max_records also bounds the time spent reading. Types are
+    inferred from the sample:
+        - strings that all parse as int, float or boolean get that type,
+          since SchemaValidator coerces them ('15' -> int)
+        - ints mixed with floats become float; any other mix becomes str
+        - nested objects become nested schema dicts, or Dict[str, V] when
+          they have more than max_fields keys and none in most records
+        - lists become List[T] from up to list_items items per list
+        - fields that were ever None become Optional[T]
+    
+    SchemaValidator requires every schema field, so fields present in fewer
+    than min_presence of their parent objects are left out of the schema
+    (but kept in fields, with in_schema False).
+    
+    Args:
+        records: Records to sample
+        sample_size: Number of records sampled
+        max_records: Stop reading after this many records
+        min_presence: Share of records a field must appear in (0 to 1)
+        list_items: Items sampled from each list
+        max_fields: Distinct-key threshold for treating objects as maps
+        seed: Seed for a reproducible sample
+        
+    Returns:
+        An InferredSchema with the schema and per-field summaries
+        
+    Raises:
+        ValueError: If sample_size is less than 1
+    """
+    if sample_size < 1:
+        raise ValueError("sample_size must be at least 1")
+    if max_records is not None:
+        records = islice(records, max_records)
+    sample, seen = _reservoir_sample(records, sample_size, random.Random(seed))
+    sample = [record for record in sample if isinstance(record, dict)]
+    summaries: List[FieldSummary] = []
+    schema = _infer_object(sample, "", summaries, list_items, max_fields, min_presence)
+    if not isinstance(schema, dict):
+        # A keyed map at the top level cannot be a SchemaValidator schema
+        schema = {}
+    return InferredSchema(schema, summaries, len(sample), seen)
 
 
 # Example usage showing more complex scenarios
@@ -1,5 +1,18 @@
+import asyncio
 import pytest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List, Optional
+import solution as solution_module
+from core.instrumentation import Instrumentation
 from challenge import SchemaValidator, ValidationError
+from solution import (
+    infer_schema,
+    SchemaValidator as SolutionValidator,
+    ValidationError as SolutionValidationError,
+)
 
 @pytest.fixture
 def validator():
@@ -109,5 +122,555 @@ class TestSchemaValidation:
         assert 'dictionary' in str(exc.value).lower()
 
 
+
+@pytest.fixture
+def solution_validator():
+    return SolutionValidator()
+
+
+class TestCompiledSchema:
+    """Test suite for compiled schema plans in the reference solution."""
+    
+    schema = {
+        'user_id': int,
+        'active': bool,
+        'score': float,
+        'tags': list
+    }
+    
+    def test_compiled_matches_validate(self, solution_validator):
+        """Test that a compiled plan produces the same output as validate."""
+        data = {
+            'user_id': '123',
+            'active': 'yes',
+            'score': '98.6',
+            'tags': 'python, data'
+        }
+        compiled = solution_validator.compile(self.schema)
+        
+        assert compiled.validate(data) == solution_validator.validate(data, self.schema)
+        assert compiled.validate(data) == {
+            'user_id': 123,
+            'active': True,
+            'score': 98.6,
+            'tags': ['python', 'data']
+        }
+    
+    def test_compiled_errors(self, solution_validator):
+        """Test that compiled plans raise the same errors as validate."""
+        compiled = solution_validator.compile({'user_id': int, 'active': bool})
+        
+        with pytest.raises(SolutionValidationError) as exc:
+            compiled.validate({'user_id': '1'})
+        assert exc.value.path == 'active'
+        assert 'missing' in str(exc.value).lower()
+        
+        with pytest.raises(SolutionValidationError) as exc:
+            compiled.validate({'user_id': None, 'active': 'true'})
+        assert 'none' in str(exc.value).lower()
+        
+        with pytest.raises(SolutionValidationError) as exc:
+            compiled.validate({'user_id': '1', 'active': 'maybe'})
+        assert 'cannot convert' in str(exc.value).lower()
+    
+    def test_flat_fast_path_matches_walk(self, solution_validator):
+        """Test that flat schemas skip the node walker with identical results."""
+        flat = solution_validator.compile(self.schema)
+        nested = solution_validator.compile({**self.schema, 'meta': Optional[int]})
+        records = [
+            {'user_id': '1', 'active': 'no', 'score': '2.5', 'tags': 'a,b', 'meta': None},
+            {'user_id': 'x', 'active': 'maybe', 'score': None, 'meta': None},
+            {'active': 'true', 'score': '1', 'tags': [], 'meta': None},
+            ['not', 'a', 'dict'],
+        ]
+    
+        assert flat._flat is not None and nested._flat is None
+        for mode in ('first', 'collect'):
+            flat_result = flat.validate_many(records, mode)
+            nested_result = nested.validate_many(records, mode)
+            assert [{**row, 'meta': None} for row in flat_result.rows] == nested_result.rows
+            assert flat_result.errors == [error for error in nested_result.errors if error.path != 'meta']
+        budgeted = flat.validate_many(records, 'collect', max_errors=2).errors
+        assert [(error.index, error.path) for error in budgeted] == [
+            (1, 'user_id'), (1, 'active'), (2, 'user_id'), (3, 'root')
+        ]
+    
+    def test_schema_cache(self, solution_validator):
+        """Test that repeated schemas reuse the compiled plan."""
+        first = solution_validator.compile(self.schema)
+        assert solution_validator.compile(self.schema) is first
+        
+        schema = {'value': int}
+        compiled = solution_validator.compile(schema)
+        schema['value'] = str
+        recompiled = solution_validator.compile(schema)
+        
+        assert recompiled is not compiled
+        assert solution_validator.validate({'value': 5}, schema) == {'value': '5'}
+    
+    def test_schema_cache_is_shared(self, solution_validator):
+        """Test that equal schemas share one plan across validators and threads."""
+        first = solution_validator.compile({'id': int, 'items': List[{'price': float}]})
+        
+        with ThreadPoolExecutor(4) as executor:
+            plans = list(executor.map(
+                lambda _: SolutionValidator().compile({'id': int, 'items': List[{'price': float}]}),
+                range(8)
+            ))
+        
+        assert all(plan is first for plan in plans)
+        assert solution_module.schema_cache.stats().hits >= 8
+        metrics = Instrumentation('schema_validation')
+        assert SolutionValidator(metrics).compile(dict(self.schema)) is SolutionValidator(metrics).compile(self.schema)
+    
+    def test_unsupported_type(self, solution_validator):
+        """Test that unsupported target types only accept matching values."""
+        schema = {'meta': dict}
+        
+        assert solution_validator.validate({'meta': {'a': 1}}, schema) == {'meta': {'a': 1}}
+        with pytest.raises(SolutionValidationError) as exc:
+            solution_validator.validate({'meta': 'a=1'}, schema)
+        assert 'unsupported' in str(exc.value).lower()
+
+
+
+class TestValidateMany:
+    """Test suite for batch validation in the reference solution."""
+    
+    schema = {'user_id': int, 'active': bool}
+    
+    def test_valid_and_invalid_rows(self, solution_validator):
+        """Test that valid rows are returned and bad rows are reported."""
+        records = [
+            {'user_id': '1', 'active': 'true'},
+            {'user_id': 'abc', 'active': 'true'},
+            {'user_id': '3'},
+            "not a dictionary",
+            {'user_id': 5, 'active': 'no'},
+        ]
+        
+        result = solution_validator.validate_many(records, self.schema)
+        
+        assert result.rows == [
+            {'user_id': 1, 'active': True},
+            {'user_id': 5, 'active': False},
+        ]
+        assert [(e.index, e.path) for e in result.errors] == [
+            (1, 'user_id'),
+            (2, 'active'),
+            (3, 'root'),
+        ]
+        assert 'cannot convert' in result.errors[0].message.lower()
+        assert 'missing' in result.errors[1].message.lower()
+    
+    def test_errors_match_validate(self, solution_validator):
+        """Test that reported errors match those raised by validate."""
+        record = {'user_id': None, 'active': 'true'}
+        
+        result = solution_validator.validate_many([record], self.schema)
+        with pytest.raises(SolutionValidationError) as exc:
+            solution_validator.validate(record, self.schema)
+        
+        assert result.rows == []
+        assert result.validation_errors() == [exc.value]
+    
+    def test_accepts_generators(self, solution_validator):
+        """Test that batches can be streamed from any iterable."""
+        records = ({'user_id': str(i), 'active': '1'} for i in range(3))
+        
+        result = solution_validator.validate_many(records, self.schema)
+        
+        assert [row['user_id'] for row in result.rows] == [0, 1, 2]
+        assert result.errors == []
+
+
+
+class TestCollectMode:
+    """Test suite for collect-all-errors validation in the reference solution."""
+    
+    schema = {'user_id': int, 'active': bool, 'score': float, 'tags': list}
+    bad_record = {'user_id': 'abc', 'score': 'high', 'tags': None}
+    
+    def test_collects_all_errors(self, solution_validator):
+        """Test that every failing field is reported in one pass."""
+        report = solution_validator.validate(self.bad_record, self.schema, mode="collect")
+        
+        assert not report.valid
+        assert report.data is None
+        assert [e.path for e in report.errors] == ['user_id', 'active', 'score', 'tags']
+        assert all(isinstance(e, SolutionValidationError) for e in report.errors)
+    
+    def test_valid_record(self, solution_validator):
+        """Test that a valid record yields its data and no errors."""
+        data = {'user_id': '7', 'active': 'yes', 'score': '1.5', 'tags': 'a'}
+        
+        report = solution_validator.validate(data, self.schema, mode="collect")
+        
+        assert report.valid
+        assert report.data == {'user_id': 7, 'active': True, 'score': 1.5, 'tags': ['a']}
+    
+    def test_error_budget(self, solution_validator):
+        """Test that validation stops once max_errors is reached."""
+        report = solution_validator.validate(
+            self.bad_record, self.schema, mode="collect", max_errors=2
+        )
+        
+        assert [e.path for e in report.errors] == ['user_id', 'active']
+    
+    def test_batch_collect(self, solution_validator):
+        """Test that batches report every error per row in collect mode."""
+        records = [self.bad_record, {'user_id': 1, 'active': True, 'score': 2, 'tags': []}]
+        
+        result = solution_validator.validate_many(
+            records, self.schema, mode="collect", max_errors=3
+        )
+        
+        assert len(result.rows) == 1
+        assert [(e.index, e.path) for e in result.errors] == [
+            (0, 'user_id'), (0, 'active'), (0, 'score')
+        ]
+    
+    def test_invalid_mode(self, solution_validator):
+        """Test that unknown modes and budgets are rejected."""
+        with pytest.raises(ValueError):
+            solution_validator.validate({}, self.schema, mode="lenient")
+        with pytest.raises(ValueError):
+            solution_validator.validate({}, self.schema, mode="collect", max_errors=0)
+
+
+
+class TestNestedSchemas:
+    """Test suite for nested and typed-container schemas in the reference solution."""
+    
+    schema = {
+        'order_id': int,
+        'customer': {'name': str, 'vip': bool},
+        'items': List[{'sku': str, 'price': float, 'qty': Optional[int]}],
+        'totals': Dict[str, float],
+        'ratings': List[int],
+    }
+    
+    @pytest.fixture
+    def order(self):
+        return {
+            'order_id': '42',
+            'customer': {'name': 'Ada', 'vip': 'yes'},
+            'items': [
+                {'sku': 'A1', 'price': '9.99', 'qty': '2'},
+                {'sku': 'B2', 'price': '5', 'qty': None},
+            ],
+            'totals': {'net': '24.98', 'tax': 2},
+            'ratings': '5,4',
+        }
+    
+    def test_nested_coercion(self, solution_validator, order):
+        """Test that nested dicts and typing forms are coerced recursively."""
+        result = solution_validator.validate(order, self.schema)
+        
+        assert result == {
+            'order_id': 42,
+            'customer': {'name': 'Ada', 'vip': True},
+            'items': [
+                {'sku': 'A1', 'price': 9.99, 'qty': 2},
+                {'sku': 'B2', 'price': 5.0, 'qty': None},
+            ],
+            'totals': {'net': 24.98, 'tax': 2.0},
+            'ratings': [5, 4],
+        }
+        assert list(result) == list(self.schema)
+    
+    def test_indexed_error_paths(self, solution_validator, order):
+        """Test that nested errors report dotted and indexed paths."""
+        order['items'][1]['price'] = 'free'
+        order['customer'].pop('vip')
+        order['totals']['tax'] = 'n/a'
+        order['ratings'] = ['5', 'x']
+        
+        report = solution_validator.validate(order, self.schema, mode="collect")
+        
+        assert sorted(e.path for e in report.errors) == [
+            'customer.vip', 'items[1].price', 'ratings[1]', 'totals.tax'
+        ]
+        with pytest.raises(SolutionValidationError) as exc:
+            solution_validator.validate(order, {'items': self.schema['items']})
+        assert exc.value.path == 'items[1].price'
+    
+    def test_nested_type_errors(self, solution_validator, order):
+        """Test that non-dict values for nested schemas are rejected."""
+        order['customer'] = 'Ada'
+        order['items'] = None
+        
+        report = solution_validator.validate(order, self.schema, mode="collect")
+        
+        messages = {e.path: e.message for e in report.errors}
+        assert 'dictionary' in messages['customer']
+        assert 'none' in messages['items'].lower()
+    
+    def test_unsupported_schema_types(self, solution_validator):
+        """Test that unsupported typing forms are rejected at compile time."""
+        from typing import Union
+        
+        with pytest.raises(TypeError):
+            solution_validator.compile({'value': Union[int, str]})
+        with pytest.raises(TypeError):
+            solution_validator.compile({'value': Dict[List[int], int]})
+
+
+
+class TestColumnarValidation:
+    """Test suite for columnar batch validation in the reference solution."""
+    
+    schema = {
+        'user_id': int,
+        'active': bool,
+        'score': float,
+        'tags': list,
+        'profile': {'age': Optional[int]},
+    }
+    
+    @pytest.fixture
+    def records(self):
+        return [
+            {'user_id': '1', 'active': 'YES', 'score': '1.5', 'tags': 'a,b', 'profile': {'age': '30'}},
+            {'user_id': 2, 'active': False, 'score': 2, 'tags': ['c'], 'profile': {'age': None}},
+            {'user_id': 'x', 'active': 'maybe', 'score': '3', 'tags': '', 'profile': {'age': 'old'}},
+            "not a dictionary",
+            {'user_id': '5', 'score': '5.5', 'tags': 'd', 'profile': {'age': 1}},
+        ]
+    
+    def test_matches_row_path(self, solution_validator, records):
+        """Test that columnar results are identical to the row path."""
+        rows = solution_validator.validate_many(records, self.schema, mode="collect")
+        columnar = solution_validator.validate_columnar(records, self.schema)
+        
+        assert columnar.to_rows() == rows.rows
+        assert columnar.errors == rows.errors
+    
+    def test_columns_and_mask(self, solution_validator, records):
+        """Test the column dict output and per-row validity mask."""
+        result = solution_validator.validate_columnar(records, self.schema)
+        
+        assert result.valid == [True, True, False, False, False]
+        assert result.columns['user_id'] == [1, 2, None, None, 5]
+        assert result.columns['active'] == [True, False, None, None, None]
+        assert result.columns['profile'] == [{'age': 30}, {'age': None}, None, None, {'age': 1}]
+        assert [(e.index, e.path) for e in result.errors] == [
+            (2, 'user_id'), (2, 'active'), (2, 'profile.age'), (3, 'root'), (4, 'active')
+        ]
+    
+    def test_bulk_string_columns(self, solution_validator):
+        """Test that all-string columns convert in bulk and report bad cells."""
+        records = [{'n': str(i), 'f': f'{i}.5', 'b': 'true'} for i in range(5)]
+        records[3]['f'] = 'bad'
+        
+        result = solution_validator.validate_columnar(records, {'n': int, 'f': float, 'b': bool})
+        
+        assert result.columns['n'] == [0, 1, 2, 3, 4]
+        assert result.columns['f'] == [0.5, 1.5, 2.5, None, 4.5]
+        assert result.columns['b'] == [True] * 5
+        assert [(e.index, e.path) for e in result.errors] == [(3, 'f')]
+    
+    def test_bulk_columns_follow_registry(self, solution_validator):
+        """Test that a coercer registered for strings replaces the bulk path."""
+        registry = solution_module.default_registry
+        records = [{'n': '1'}, {'n': '2'}]
+        registry.register(str, int, lambda value: int(value) * 10)
+        try:
+            result = solution_validator.validate_columnar(records, {'n': int})
+            rows = solution_validator.validate_many(records, {'n': int}).rows
+        finally:
+            registry.register(str, int, int)
+        
+        assert result.columns['n'] == [10, 20]
+        assert result.to_rows() == rows
+
+
+class TestSharedCoercions:
+    """Test suite for coercions provided by core.validators."""
+    
+    def test_registry_types(self, solution_validator):
+        """Test Decimal, datetime and Enum targets from the shared registry."""
+        class Status(Enum):
+            ACTIVE = 'active'
+            BANNED = 'banned'
+        
+        schema = {'balance': Decimal, 'joined': datetime, 'status': Status}
+        data = {'balance': '10.25', 'joined': '2024-01-31T12:00:00', 'status': 'ACTIVE'}
+        
+        assert solution_validator.validate(data, schema) == {
+            'balance': Decimal('10.25'),
+            'joined': datetime(2024, 1, 31, 12),
+            'status': Status.ACTIVE,
+        }
+        with pytest.raises(SolutionValidationError) as exc:
+            solution_validator.validate({**data, 'balance': 'ten'}, schema)
+        assert "cannot convert 'ten' to decimal" in str(exc.value).lower()
+    
+    def test_user_registered_coercer(self, solution_validator):
+        """Test that coercers registered later apply to compiled schemas."""
+        class Celsius(float):
+            pass
+        
+        schema = {'temp': Celsius}
+        with pytest.raises(SolutionValidationError):
+            solution_validator.validate({'temp': '21.5C'}, schema)
+        
+        registry = solution_module.default_registry
+        registry.register(str, Celsius, lambda value: Celsius(value.rstrip('Cc')))
+        
+        assert solution_validator.validate({'temp': '21.5C'}, schema) == {'temp': 21.5}
+
+
+
+class TestInstrumentation:
+    """Test suite for opt-in per-field instrumentation."""
+    
+    def test_per_field_metrics(self):
+        """Test that instrumented validators count calls, failures and time."""
+        metrics = Instrumentation('schema_validation')
+        validator = SolutionValidator(instrumentation=metrics)
+        schema = {'id': int, 'items': List[{'price': float}], 'counts': Dict[str, int]}
+        records = [
+            {'id': '1', 'items': [{'price': '9.5'}, {'price': '1'}], 'counts': {'a': '2'}},
+            {'id': 'x', 'items': [], 'counts': {}},
+        ]
+        
+        result = validator.validate_many(records, schema)
+        
+        assert result.rows == SolutionValidator().validate_many(records, schema).rows
+        assert (metrics.records.calls, metrics.records.failures) == (2, 1)
+        assert (metrics.fields['id'].calls, metrics.fields['id'].failures) == (2, 1)
+        assert metrics.fields['items[].price'].calls == 2
+        assert list(metrics.fields) == ['id', 'items[].price', 'counts{key}', 'counts{}']
+        assert metrics.fields['id'].seconds > 0
+    
+    def test_uninstrumented_plans_unchanged(self, solution_validator):
+        """Test that instrumenting a plan leaves the original untouched."""
+        compiled = solution_validator.compile({'id': int})
+        metrics = Instrumentation('schema_validation')
+        
+        instrumented = compiled.instrumented(metrics)
+        compiled.validate({'id': '1'})
+        assert metrics.records.calls == 0
+        assert instrumented.validate({'id': '1'}) == {'id': 1}
+        assert metrics.records.calls == 1
+
+
+
+class TestValidateStream:
+    """Test suite for asyncio micro-batched validation."""
+    
+    SCHEMA = {'id': int, 'price': float}
+    
+    @staticmethod
+    async def records(count):
+        for i in range(count):
+            await asyncio.sleep(0)
+            yield {'id': str(i), 'price': 'bad' if i % 10 == 7 else f'{i}.5'}
+    
+    def collect(self, validator, **kwargs):
+        async def run():
+            return [result async for result in validator.validate_stream(self.records(45), self.SCHEMA, **kwargs)]
+        return asyncio.run(run())
+    
+    def test_matches_validate_many(self, solution_validator):
+        """Test that streamed batches match one validate_many call."""
+        records = [{'id': str(i), 'price': 'bad' if i % 10 == 7 else f'{i}.5'} for i in range(45)]
+        expected = solution_validator.validate_many(records, self.SCHEMA, mode='collect')
+        
+        results = self.collect(solution_validator, mode='collect', batch_size=20)
+        
+        assert [len(result.rows) for result in results] == [18, 18, 5]
+        assert [row for result in results for row in result.rows] == expected.rows
+        assert [error for result in results for error in result.errors] == expected.errors
+        assert [error.index for result in results for error in result.errors] == [7, 17, 27, 37]
+    
+    def test_executors(self, solution_validator):
+        """Test that thread and process pools give the same batches."""
+        expected = self.collect(solution_validator, batch_size=16)
+        
+        with ThreadPoolExecutor(2) as executor:
+            assert self.collect(solution_validator, batch_size=16, executor=executor) == expected
+        with ProcessPoolExecutor(2) as executor:
+            assert self.collect(solution_validator, batch_size=16, executor=executor) == expected
+    
+    def test_invalid_arguments(self, solution_validator):
+        """Test that bad modes and batch sizes raise before any batch is validated."""
+        with pytest.raises(ValueError):
+            self.collect(solution_validator, mode='everything')
+        with pytest.raises(ValueError):
+            self.collect(solution_validator, batch_size=0)
+
+
+
+class TestInferSchema:
+    """Test suite for schema inference from sample records."""
+    
+    @staticmethod
+    def records(count):
+        for i in range(count):
+            record = {
+                'id': str(i),
+                'price': f'{i}.99' if i % 3 else i,
+                'active': 'yes' if i % 2 else 'no',
+                'seller': {'name': f'shop{i % 7}', 'rating': None if i % 5 == 0 else 4.5},
+                'variants': [{'sku': f'S{i}', 'stock': str(i % 4)}],
+                'stock_by_store': {f'store{j}': j for j in range(i % 90, i % 90 + 2)},
+                'note': None,
+            }
+            if i % 4 == 0:
+                record['promo'] = 'summer'
+            yield record
+    
+    def test_infers_validator_schema(self, solution_validator):
+        """Test that the inferred schema types fields and validates the data."""
+        inferred = infer_schema(self.records(5000), sample_size=300, seed=7)
+        
+        assert inferred.schema == {
+            'id': int,
+            'price': float,
+            'active': bool,
+            'seller': {'name': str, 'rating': Optional[float]},
+            'variants': List[{'sku': str, 'stock': int}],
+            'stock_by_store': Dict[str, int],
+            'note': Optional[str],
+        }
+        assert (inferred.sampled, inferred.seen) == (300, 5000)
+        result = solution_validator.validate_many(list(self.records(500)), inferred.schema)
+        assert len(result.rows) == 500 and not result.errors
+    
+    def test_field_summaries(self):
+        """Test the per-field presence, null, cardinality and confidence summary."""
+        inferred = infer_schema(self.records(1000), sample_size=1000)
+        fields = {summary.path: summary for summary in inferred.fields}
+        
+        assert fields['active'].distinct == 2
+        assert fields['id'].distinct == 1000
+        assert fields['seller.rating'].nulls == 200
+        assert fields['variants[].stock'].type is int
+        assert fields['stock_by_store{}'].present == 2000
+        assert not fields['promo'].in_schema and fields['promo'].present == 250
+        assert fields['note'].confidence == 0.0
+        assert list(fields).index('seller') < list(fields).index('seller.name')
+    
+    def test_mixed_values_and_limits(self):
+        """Test confidence for mixed values, min_presence and max_records."""
+        records = [{'qty': '5'}] * 9 + [{'qty': 'n/a', 'rare': 1}]
+        inferred = infer_schema(records, min_presence=0.1)
+        
+        assert inferred.schema == {'qty': str, 'rare': int}
+        assert infer_schema(records * 100, sample_size=5, max_records=20).seen == 20
+        assert infer_schema([]).schema == {}
+        with pytest.raises(ValueError):
+            infer_schema(records, sample_size=0)
+    
+    def test_sample_is_reproducible(self):
+        """Test that seeded samples repeat."""
+        first = infer_schema(({'n': i} for i in range(10000)), sample_size=100, seed=1)
+        again = infer_schema(({'n': i} for i in range(10000)), sample_size=100, seed=1)
+        
+        assert first.fields == again.fields
+        assert first.fields[0].distinct == 100
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
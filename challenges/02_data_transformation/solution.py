@@ -1,4 +1,34 @@
-from typing import List, Dict, Any
+import argparse
+import json
+import os
+import sys
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, as_completed, wait
+from contextlib import ExitStack
+from copy import copy
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache, partial
+from hashlib import blake2b
+from itertools import chain, islice
+from typing import (
+    List, Dict, Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, NamedTuple, Optional, Set, TextIO,
+    Tuple, Union,
+)
+
+try:
+    import core
+except ImportError:
+    # Running as a script from this directory: make the repository root importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core.changes import ChangeIndex
+from core.instrumentation import Instrumentation
+from core.ndjson import MappedNDJSON
+from core.similarity import DEFAULT_NUM_PERM, LSHIndex, MinHasher, jaccard, lsh_bands, tokenize
+from core.transformers import map_batches
+from core.validators import Money, default_registry
 
 def extract_value(data: Dict[str, Any], *keys: str, default: Any = None) -> Any:
     """Helper function to safely extract nested values."""
@@ -20,54 +50,981 @@ def normalize_tags(tags: Any) -> List[str]:
         return [str(tag) for tag in tags]
     return []
 
-def normalize_product_data(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+class TagCache:
     """
-    Normalize product data from various sources into a consistent format.
+    normalize_tags with a bounded LRU cache and interned tag strings.
+    
+    Catalogs repeat the same tag inputs ("home,lighting") across many
+    products. Each distinct input is normalized once, and the resulting tag
+    strings are interned so every product shares one copy of each tag.
+    String inputs and lists of strings are cached; other inputs are
+    normalized directly. Each call returns a new list.
     """
-    normalized = []
     
-    for product in products:
-        # Extract name from either top level or nested product object
-        name = extract_value(product, 'name') or extract_value(product, 'product', 'name', default='')
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.uncached = 0
+        self._normalize = lru_cache(maxsize=maxsize)(self._normalize_key)
+    
+    @staticmethod
+    def _normalize_key(key: Any) -> Tuple[str, ...]:
+        """Normalize a hashable tag input (str or tuple of str) to interned tags."""
+        tags = key if isinstance(key, str) else list(key)
+        return tuple(sys.intern(tag) for tag in normalize_tags(tags))
+    
+    def __call__(self, tags: Any) -> List[str]:
+        if not tags:
+            return []
+        if isinstance(tags, str):
+            return list(self._normalize(tags))
+        if isinstance(tags, list) and all(tag.__class__ is str for tag in tags):
+            return list(self._normalize(tuple(tags)))
+        self.uncached += 1
+        return [sys.intern(tag) for tag in normalize_tags(tags)]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hits, misses, size and hit rate."""
+        info = self._normalize.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': self.maxsize,
+            'uncached': self.uncached,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+        }
+    
+    def clear(self) -> None:
+        """Drop all cached results and reset the counters."""
+        self._normalize.cache_clear()
+        self.uncached = 0
+
+# Shared tag cache, available to rule specs as the 'cached_tags' coercion
+tag_cache = TagCache()
+
+def to_int(value: Any) -> int:
+    """Convert a value to int, accepting decimal strings such as '15.0'."""
+    return int(float(value))
+
+# Named coercions usable in rule specs. Type conversions come from the
+# shared registry in core.validators and raise CoercionError (a ValueError)
+# on bad input; 'int' truncates decimal strings, as stock counts require.
+COERCIONS: Dict[str, Callable[[Any], Any]] = {
+    'str': default_registry.converter_for(str),
+    'float': default_registry.converter_for(float),
+    'int': to_int,
+    'bool': default_registry.converter_for(bool),
+    'decimal': default_registry.converter_for(Decimal),
+    'datetime': default_registry.converter_for(datetime),
+    'money': default_registry.converter_for(Money),
+    'tags': normalize_tags,
+    'cached_tags': tag_cache,
+}
+
+# Rule spec for normalize_product. Each output field lists candidate
+# dot-separated paths in fallback order; the first truthy value found is
+# coerced, and the default is used if nothing is found or coercion fails.
+PRODUCT_RULES: Dict[str, Dict[str, Any]] = {
+    'name': {
+        'paths': ['name', 'product.name'],
+        'default': '',
+    },
+    'price': {
+        'paths': ['details.price', 'product.details.price', 'pricing.amount'],
+        'coerce': 'float',
+        'default': 0.0,
+    },
+    'stock': {
+        'paths': ['details.stock', 'product.details.stock', 'inventory'],
+        'coerce': 'int',
+        'default': 0,
+    },
+    'tags': {
+        'paths': ['tags', 'product.tags', 'categories'],
+        'coerce': 'tags',
+        'default': [],
+    },
+}
+
+RULE_KEYS = frozenset(('paths', 'coerce', 'default'))
+
+class ShapePlanCache:
+    """
+    LRU cache of per-shape plans.
+    
+    A record's shape is its set of top-level keys (None for non-dicts).
+    Plans are built by the given callable the first time a shape is seen
+    and reused for every later record of that shape.
+    
+    Safe to share between threads without a lock: a shape evicted by
+    another thread mid-lookup is simply rebuilt, and the counters may
+    undercount slightly under contention.
+    """
+    
+    def __init__(self, build: Callable[[Optional[frozenset]], Any], maxsize: int = 256):
+        self.build = build
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._plans: OrderedDict = OrderedDict()
+    
+    def plan_for(self, record: Any) -> Any:
+        """Return the plan for the record's shape, building it if needed."""
+        shape = frozenset(record) if isinstance(record, dict) else None
+        plans = self._plans
+        # pop and reinsert rather than move_to_end, which raises if another
+        # thread evicts the shape in between
+        plan = plans.pop(shape, None)
+        if plan is not None:
+            self.hits += 1
+            plans[shape] = plan
+            return plan
         
-        # Extract and convert price
-        price_str = (
-            extract_value(product, 'details', 'price') or
-            extract_value(product, 'product', 'details', 'price') or
-            extract_value(product, 'pricing', 'amount') or
-            '0.0'
+        self.misses += 1
+        plan = self.build(shape)
+        plans[shape] = plan
+        while len(plans) > self.maxsize:
+            try:
+                plans.popitem(last=False)
+            except KeyError:
+                # Emptied by other threads evicting at the same time
+                break
+        return plan
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current cache size."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._plans),
+            'maxsize': self.maxsize,
+        }
+    
+    def clear(self) -> None:
+        """Drop all cached plans and reset the counters."""
+        self._plans.clear()
+        self.hits = 0
+        self.misses = 0
+
+class CompiledRules:
+    """
+    A rule spec compiled into a single-pass extractor.
+    
+    Every candidate path of every field is merged into one prefix tree, and
+    each tree node gets a slot. Extracting a record looks up each node once,
+    parents before children, so shared parents such as `product.details`
+    are resolved a single time no matter how many fields read below them.
+    Per-shape plans (see ShapePlanCache) drop the nodes whose top-level key
+    is absent, so a record only pays for the paths its source can have.
+    
+    Attributes:
+        paths: Key path of each slot; slot 0 is the record itself
+        fields: (output, candidate_slots, coerce, default, copy_default) per field
+        plans: The per-shape plan cache
+    """
+    
+    def __init__(self, rules: Dict[str, Dict[str, Any]], maxsize: int = 256):
+        self.paths: List[Tuple[str, ...]] = [()]
+        self._slots: Dict[Tuple[str, ...], int] = {(): 0}
+        self.fields = tuple(
+            self._compile_field(output, rule) for output, rule in rules.items()
         )
-        try:
-            price = float(price_str)
-        except (ValueError, TypeError):
-            price = 0.0
-            
-        # Extract and convert stock
-        stock_str = (
-            extract_value(product, 'details', 'stock') or
-            extract_value(product, 'product', 'details', 'stock') or
-            extract_value(product, 'inventory') or
-            '0'
+        self.plans = ShapePlanCache(self._build_plan, maxsize)
+        self._instrumented: Optional[Tuple[Instrumentation, 'CompiledRules']] = None
+    
+    def _slot_for(self, keys: Tuple[str, ...]) -> int:
+        """Return the slot for a key path, adding it and its prefixes if new."""
+        for depth in range(1, len(keys) + 1):
+            prefix = keys[:depth]
+            if prefix not in self._slots:
+                self._slots[prefix] = len(self.paths)
+                self.paths.append(prefix)
+        return self._slots[keys]
+    
+    def _compile_field(self, output: str, rule: Dict[str, Any]) -> tuple:
+        """Validate one field rule and resolve its paths to slots."""
+        if not isinstance(rule, dict):
+            raise ValueError(f"Invalid rule for field '{output}': Expected dict")
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Invalid rule for field '{output}': Unknown keys {sorted(unknown)}")
+        
+        paths = rule.get('paths', [])
+        if isinstance(paths, str):
+            paths = [paths]
+        slots = []
+        for path in paths:
+            if not isinstance(path, str) or not path or '' in path.split('.'):
+                raise ValueError(f"Invalid path for field '{output}': {path!r}")
+            slots.append(self._slot_for(tuple(path.split('.'))))
+        
+        coerce = rule.get('coerce')
+        if isinstance(coerce, str):
+            if coerce not in COERCIONS:
+                raise ValueError(f"Unknown coercion for field '{output}': {coerce}")
+            coerce = COERCIONS[coerce]
+        elif coerce is not None and not callable(coerce):
+            raise ValueError(f"Invalid coercion for field '{output}': Expected name or callable")
+        
+        default = rule.get('default')
+        copy_default = isinstance(default, (list, dict, set))
+        return (output, tuple(slots), coerce, default, copy_default)
+    
+    def _build_plan(self, shape: Optional[frozenset]) -> tuple:
+        """Build the lookup steps and candidate slots possible for a shape."""
+        def possible(slot: int) -> bool:
+            return shape is not None and self.paths[slot][0] in shape
+        
+        steps = tuple(
+            (slot, self._slots[path[:-1]], path[-1])
+            for slot, path in enumerate(self.paths)
+            if slot and possible(slot)
         )
-        try:
-            stock = int(float(stock_str))
-        except (ValueError, TypeError):
-            stock = 0
-            
-        # Extract and normalize tags
-        tags = (
-            extract_value(product, 'tags') or
-            extract_value(product, 'product', 'tags') or
-            extract_value(product, 'categories')
+        fields = tuple(
+            (output, tuple(slot for slot in slots if possible(slot)), coerce, default, copy_default)
+            for output, slots, coerce, default, copy_default in self.fields
         )
-        normalized_tags = normalize_tags(tags)
+        return (len(self.paths), steps, fields)
+    
+    def extract(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and coerce every field of one record."""
+        size, steps, fields = self.plans.plan_for(record)
+        
+        # Missing paths stay None, which is falsy like any other empty value
+        values = [None] * size
+        values[0] = record
+        for slot, parent, key in steps:
+            current = values[parent]
+            if isinstance(current, dict):
+                values[slot] = current.get(key)
+        
+        result = {}
+        for output, slots, coerce, default, copy_default in fields:
+            for slot in slots:
+                value = values[slot]
+                if value:
+                    if coerce is not None:
+                        try:
+                            value = coerce(value)
+                        except (ValueError, TypeError):
+                            value = copy(default) if copy_default else default
+                    break
+            else:
+                value = copy(default) if copy_default else default
+            result[output] = value
+        return result
+    
+    def __call__(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        # Looked up per call (not aliased) so instrumented copies, which wrap
+        # extract on the instance, are instrumented when called directly too
+        return self.extract(record)
+    
+    def instrumented(self, instrumentation: Instrumentation) -> 'CompiledRules':
+        """
+        Return a copy of these rules that records per-field metrics.
+        
+        Each field's coercion is wrapped to count calls, failures (raised
+        errors, which still fall back to the default) and time; whole records
+        are counted under instrumentation.records. The copy has its own plan
+        cache and is reused for repeated calls with the same instrumentation.
+        """
+        cached = self._instrumented
+        if cached is not None and cached[0] is instrumentation:
+            return cached[1]
         
-        # Create normalized product entry
-        normalized.append({
-            'name': name,
-            'price': price,
-            'stock': stock,
-            'tags': normalized_tags
-        })
-    
-    return normalized
+        rules = copy(self)
+        rules._instrumented = None
+        rules.fields = tuple(
+            (output, slots, coerce if coerce is None else instrumentation.wrap(output, coerce), default, copy_default)
+            for output, slots, coerce, default, copy_default in self.fields
+        )
+        rules.plans = ShapePlanCache(rules._build_plan, self.plans.maxsize)
+        rules.extract = instrumentation.wrap_records(rules.extract)
+        self._instrumented = (instrumentation, rules)
+        return rules
+
+def compile_rules(rules: Dict[str, Dict[str, Any]], maxsize: int = 256) -> CompiledRules:
+    """
+    Compile a declarative field rule spec into a reusable extractor.
+    
+    Args:
+        rules: Mapping of output field name to a rule dict with keys:
+            - paths: candidate dot-separated paths, in fallback order
+            - coerce: optional coercion name (see COERCIONS) or callable
+            - default: value used when no path yields a truthy value or the
+              coercion raises ValueError/TypeError (copied if mutable)
+        maxsize: Maximum number of per-shape plans to cache
+    
+    Raises:
+        ValueError: If the rule spec is malformed
+    """
+    return CompiledRules(rules, maxsize)
+
+# Compiled preset behind normalize_product
+product_rules = compile_rules(PRODUCT_RULES)
+
+# Per-shape plan cache of the product preset, exposed for its hit/miss stats
+shape_plans = product_rules.plans
+
+class Product(NamedTuple):
+    """A normalized product stored as a tuple instead of a dict."""
+    name: str
+    price: float
+    stock: int
+    tags: List[str]
+
+class ProductRow(Mapping):
+    """Read-only, dict-like view of one row of a ProductTable."""
+    
+    __slots__ = ('_table', '_index')
+    
+    def __init__(self, table: 'ProductTable', index: int):
+        self._table = table
+        self._index = index
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'name':
+            return self._table.names[self._index]
+        if key == 'price':
+            return self._table.prices[self._index]
+        if key == 'stock':
+            return self._table.stock[self._index]
+        if key == 'tags':
+            return self._table.tags(self._index)
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(Product._fields)
+    
+    def __len__(self) -> int:
+        return len(Product._fields)
+    
+    def __repr__(self) -> str:
+        return f"ProductRow({dict(self)!r})"
+
+class ProductTable:
+    """
+    Struct-of-arrays storage for normalized products.
+    
+    Instead of one dict per product, each field is a column: names in a
+    list, prices in an array('d') and stock in an array('q'). Tags are
+    stored once each in a shared pool; every product's tags are a run of
+    pool ids in tag_ids, delimited by tag_offsets. Large catalogs take a
+    fraction of the memory of a list of dicts, and numeric columns can be
+    scanned directly (e.g. sum(table.prices)).
+    
+    Indexing or iterating yields ProductRow views that behave like the
+    normalized product dicts.
+    """
+    
+    def __init__(self, products: Iterable[Mapping[str, Any]] = ()):
+        self.names: List[str] = []
+        self.prices = array('d')
+        self.stock = array('q')
+        self.tag_pool: List[str] = []
+        self.tag_ids = array('q')
+        self.tag_offsets = array('q', [0])
+        self._tag_index: Dict[str, int] = {}
+        self.extend(products)
+    
+    def append(self, product: Mapping[str, Any]) -> None:
+        """Add one normalized product."""
+        self.names.append(product['name'])
+        self.prices.append(product['price'])
+        self.stock.append(product['stock'])
+        for tag in product['tags']:
+            tag_id = self._tag_index.get(tag)
+            if tag_id is None:
+                tag_id = self._tag_index[tag] = len(self.tag_pool)
+                self.tag_pool.append(tag)
+            self.tag_ids.append(tag_id)
+        self.tag_offsets.append(len(self.tag_ids))
+    
+    def extend(self, products: Iterable[Mapping[str, Any]]) -> None:
+        """Add normalized products from any iterable."""
+        for product in products:
+            self.append(product)
+    
+    def tags(self, index: int) -> List[str]:
+        """Return the tags of the product at index."""
+        pool = self.tag_pool
+        start, end = self.tag_offsets[index], self.tag_offsets[index + 1]
+        return [pool[tag_id] for tag_id in self.tag_ids[start:end]]
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __getitem__(self, index: int) -> ProductRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ProductTable index out of range")
+        return ProductRow(self, index)
+    
+    def __iter__(self) -> Iterator[ProductRow]:
+        for index in range(len(self)):
+            yield ProductRow(self, index)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize every row as a normalized product dict."""
+        return [dict(row) for row in self]
+
+# Output types accepted by normalize_product_data
+OUTPUT_TYPES = ('dicts', 'tuples', 'table')
+
+# Product preset with tags normalized through tag_cache
+cached_tag_product_rules = compile_rules({
+    **PRODUCT_RULES,
+    'tags': {**PRODUCT_RULES['tags'], 'coerce': 'cached_tags'},
+})
+
+def normalize_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a single product record into the consistent output format."""
+    return product_rules.extract(product)
+
+def normalize_product_data(
+    products: List[Dict[str, Any]],
+    cache_tags: bool = False,
+    output: str = 'dicts',
+    instrumentation: Optional[Instrumentation] = None
+) -> Union[List[Dict[str, Any]], List[Product], ProductTable]:
+    """
+    Normalize product data from various sources into a consistent format.
+    
+    With cache_tags=True, repeated tag inputs are normalized once through
+    tag_cache and tag strings are interned, which saves time and memory on
+    large catalogs with recurring categories.
+    
+    The output argument selects the result type:
+        - 'dicts': a list of dicts (the default)
+        - 'tuples': a list of Product named tuples
+        - 'table': a column-oriented ProductTable
+    
+    If instrumentation is given, per-field coercion calls, failures and time
+    are recorded into it (see CompiledRules.instrumented).
+    """
+    if output not in OUTPUT_TYPES:
+        raise ValueError(f"Invalid output type: {output}")
+    rules = cached_tag_product_rules if cache_tags else product_rules
+    if instrumentation is not None:
+        rules = rules.instrumented(instrumentation)
+    extract = rules.extract
+    if output == 'tuples':
+        return [Product._make(extract(product).values()) for product in products]
+    if output == 'table':
+        return ProductTable(map(extract, products))
+    return [extract(product) for product in products]
+
+def iter_normalize_products(
+    products: Iterable[Dict[str, Any]],
+    instrumentation: Optional[Instrumentation] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily normalize products one at a time.
+    
+    Unlike normalize_product_data, neither the input nor the output is held
+    in memory as a whole, so this works on arbitrarily large streams.
+    Metrics are recorded into instrumentation, if given.
+    """
+    if instrumentation is not None:
+        return map(product_rules.instrumented(instrumentation).extract, products)
+    return map(normalize_product, products)
+
+async def normalize_stream(
+    products: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]],
+    batch_size: int = 500,
+    executor: Optional[Executor] = None,
+    cache_tags: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Normalize an async stream of products in micro-batches.
+    
+    Products are normalized batch_size at a time (see
+    core.transformers.map_batches) and control returns to the event loop
+    between batches, so scrapers keep fetching while earlier pages are
+    normalized. With an executor, batches run in its threads or processes
+    while the next batch is read.
+    
+    Args:
+        products: An async iterable (or plain iterable) of product dictionaries
+        batch_size: Number of products normalized per batch
+        executor: Optional thread or process pool to normalize batches in
+        cache_tags: As for normalize_product_data
+    
+    Yields:
+        Normalized products, in input order
+    """
+    normalize_batch = partial(normalize_product_data, cache_tags=cache_tags)
+    async for batch in map_batches(products, normalize_batch, batch_size, executor):
+        for product in batch:
+            yield product
+
+def iter_normalize_changed_products(
+    products: Iterable[Dict[str, Any]],
+    index: ChangeIndex
+) -> Iterator[Tuple[Any, Optional[Dict[str, Any]]]]:
+    """
+    Normalize only the products that changed since the previous run.
+    
+    Products are keyed by index.key and compared with the content hashes
+    stored in the index (see core.changes.ChangeIndex), so unchanged
+    products are never normalized. The index is updated once the stream is
+    exhausted.
+    
+    Yields:
+        (id, normalized product) for new and changed products, then
+        (id, None) for each id that disappeared since the previous run
+    """
+    for key, product in index.changes(products):
+        yield key, None if product is None else normalize_product(product)
+
+# Distinct products a ProductDeduplicator holds back for merging by default
+DEDUPE_WINDOW = 10_000
+# Share of a full window above which a token is too common to sign with by
+# default, and the count below which no token is common, so that small
+# windows do not drop every repeated word
+DEDUPE_COMMON_TOKEN_SHARE = 0.05
+DEDUPE_MIN_COMMON_COUNT = 16
+# Default LSHIndex.max_bucket of a ProductDeduplicator
+DEDUPE_MAX_BUCKET = 256
+
+def dedupe_key(product: Dict[str, Any]) -> int:
+    """
+    Return the exact-duplicate key of a normalized product.
+    
+    The key is a 64-bit hash of the name (ignoring case and runs of
+    whitespace) and the price, so a set of seen keys costs a small int per
+    product instead of the product itself.
+    """
+    name = ' '.join(str(product.get('name', '')).casefold().split())
+    digest = blake2b(f"{name}\x1f{product.get('price', 0.0)!r}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def merge_products(kept: Dict[str, Any], duplicate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a duplicate listing into the product kept for it.
+    
+    Stock is summed and tags are combined in order of first appearance; the
+    kept product's name and price win. kept is updated in place and returned.
+    """
+    kept['stock'] = kept.get('stock', 0) + duplicate.get('stock', 0)
+    tags = kept.setdefault('tags', [])
+    for tag in duplicate.get('tags', ()):
+        if tag not in tags:
+            tags.append(tag)
+    return kept
+
+class ProductDeduplicator:
+    """
+    Streaming removal of duplicate normalized products.
+    
+    Exact duplicates share a dedupe_key (name and price). Near duplicates,
+    looked for when threshold is set, have a Jaccard similarity of at least
+    threshold between their tokens: the words and numbers of the name plus
+    one token per tag. Candidates come from a MinHash LSH index (see
+    core.similarity) and are verified on their tokens, so each product is
+    compared with a few likely matches rather than the whole window. Each
+    duplicate is merged with merge into the first product of its group.
+    
+    Catalogs repeat some tokens ("product", a brand, a tag) across much of
+    the window; signed with them, unrelated products collide in the same
+    LSH buckets and each lookup scans the window. So tokens held by more
+    than max_token_share of a full window become common for the rest of the
+    run and are left out of signatures (products holding them are re-signed
+    once), though not out of the Jaccard check; a product with only common
+    tokens is signed with all of them. Buckets still larger than max_bucket
+    are skipped, and candidates whose token count alone rules out the
+    threshold are not compared. Near duplicates that share only common
+    tokens can be missed, and those just above the threshold are found
+    somewhat less often than the banding's 95%.
+    
+    The window most recent distinct products are held back so that later
+    duplicates can still be merged into them; products are emitted, in
+    first-seen order, once they leave the window or the input ends. Memory
+    is bounded by the window plus one exact key per emitted product: an
+    exact duplicate of an emitted product is dropped (counted as late), and
+    near duplicates are only found within the window.
+    
+    Exact keys of emitted products are kept across dedupe() calls, so one
+    deduplicator can be run over several sources in turn.
+    
+    Attributes:
+        threshold: Near-duplicate similarity threshold, or None for exact
+            duplicates only
+        window: Maximum number of products held back
+        merge: Function merging a duplicate into the kept product and
+            returning the merged product
+        max_token_share: Share of the window above which a token is common,
+            or None to sign with every token
+        max_bucket: Largest LSH bucket looked at, or None for no limit
+        seen: Products read
+        emitted: Products emitted
+        exact: Exact duplicates merged
+        near: Near duplicates merged
+        late: Exact duplicates of already emitted products, dropped
+    """
+    
+    def __init__(
+        self,
+        threshold: Optional[float] = 0.8,
+        window: int = DEDUPE_WINDOW,
+        merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]] = merge_products,
+        num_perm: int = DEFAULT_NUM_PERM,
+        max_token_share: Optional[float] = DEDUPE_COMMON_TOKEN_SHARE,
+        max_bucket: Optional[int] = DEDUPE_MAX_BUCKET
+    ):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if threshold is not None:
+            # Fail here rather than on first use
+            lsh_bands(num_perm, threshold)
+        self.threshold = threshold
+        self.window = window
+        self.merge = merge
+        self.max_token_share = max_token_share
+        self.max_bucket = max_bucket
+        self._hasher = MinHasher(num_perm)
+        self._emitted: Set[int] = set()
+        self.seen = self.emitted = self.exact = self.near = self.late = 0
+    
+    @staticmethod
+    def tokens(product: Dict[str, Any]) -> Set[str]:
+        """Return the tokens compared for near duplicates: name words and '#tag' per tag."""
+        tokens = tokenize(str(product.get('name', '')))
+        tokens.update('#' + str(tag).casefold() for tag in product.get('tags', ()))
+        return tokens
+    
+    def dedupe(self, products: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the products of a stream with duplicates merged away.
+        
+        Input products are not modified; products that absorb duplicates
+        are copies.
+        """
+        merge = self.merge
+        emitted = self._emitted
+        signature_of = self._hasher.signature
+        index = None
+        if self.threshold is not None:
+            index = LSHIndex(self._hasher.num_perm, self.threshold, self.max_bucket)
+        # Slot (input position) -> [kept product, exact keys merged into it, tokens],
+        # oldest first; an OrderedDict pops from the front in constant time
+        pending: OrderedDict = OrderedDict()
+        # Exact key -> slot of the pending product it belongs to
+        slots: Dict[int, int] = {}
+        # Token -> number of pending products holding it, and the tokens
+        # left out of signatures
+        counts: Dict[str, int] = {}
+        common: Set[str] = set()
+        common_count = float('inf')
+        if self.max_token_share is not None:
+            common_count = max(DEDUPE_MIN_COMMON_COUNT, self.max_token_share * self.window)
+        
+        for slot, product in enumerate(products):
+            self.seen += 1
+            key = dedupe_key(product)
+            target = slots.get(key)
+            if target is not None:
+                self.exact += 1
+            elif key in emitted:
+                self.late += 1
+                continue
+            else:
+                tokens = signature = None
+                if index is not None:
+                    tokens = self.tokens(product)
+                    # Products without a name or tags are only deduplicated exactly
+                    if tokens:
+                        signature = signature_of((tokens - common) or tokens)
+                        target = self._nearest(index, signature, tokens, pending)
+                slots[key] = slot if target is None else target
+                if target is None:
+                    kept = dict(product)
+                    if 'tags' in kept:
+                        kept['tags'] = list(kept['tags'])
+                    pending[slot] = [kept, [key], tokens]
+                    if signature is not None:
+                        index.add(slot, signature)
+                        newly_common = []
+                        for token in tokens:
+                            count = counts[token] = counts.get(token, 0) + 1
+                            if count > common_count and token not in common:
+                                newly_common.append(token)
+                        if newly_common:
+                            common.update(newly_common)
+                            self._resign(index, pending, newly_common, common)
+                    if len(pending) > self.window:
+                        yield self._emit(pending, slots, index, counts)
+                    continue
+                self.near += 1
+                pending[target][1].append(key)
+            entry = pending[target]
+            entry[0] = merge(entry[0], product)
+        
+        while pending:
+            yield self._emit(pending, slots, index, counts)
+    
+    def _resign(self, index: LSHIndex, pending: OrderedDict, tokens: List[str], common: Set[str]) -> None:
+        """Re-index the pending products holding tokens that just became common."""
+        signature_of = self._hasher.signature
+        for slot, (_, _, held) in pending.items():
+            if held and not held.isdisjoint(tokens):
+                index.remove(slot)
+                index.add(slot, signature_of((held - common) or held))
+    
+    def _nearest(
+        self,
+        index: LSHIndex,
+        signature: Tuple[int, ...],
+        tokens: Set[str],
+        pending: OrderedDict
+    ) -> Optional[int]:
+        """Most similar pending slot at or above the threshold, the earliest on ties."""
+        best, best_similarity = None, self.threshold
+        size = len(tokens)
+        for candidate in index.query(signature):
+            other = pending[candidate][2]
+            # Jaccard is at most the ratio of the set sizes
+            if best_similarity * max(size, len(other)) > min(size, len(other)):
+                continue
+            similarity = jaccard(tokens, other)
+            if similarity > best_similarity or (
+                similarity == best_similarity and (best is None or candidate < best)
+            ):
+                best, best_similarity = candidate, similarity
+        return best
+    
+    def _emit(
+        self,
+        pending: OrderedDict,
+        slots: Dict[int, int],
+        index: Optional[LSHIndex],
+        counts: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Release the oldest pending product, remembering its exact keys."""
+        slot, (product, keys, tokens) = pending.popitem(last=False)
+        for key in keys:
+            del slots[key]
+            self._emitted.add(key)
+        if index is not None and slot in index:
+            index.remove(slot)
+            for token in tokens:
+                count = counts[token] - 1
+                if count:
+                    counts[token] = count
+                else:
+                    del counts[token]
+        self.emitted += 1
+        return product
+    
+    def stats(self) -> Dict[str, int]:
+        """Return the product and duplicate counters."""
+        return {
+            'seen': self.seen,
+            'emitted': self.emitted,
+            'exact': self.exact,
+            'near': self.near,
+            'late': self.late,
+        }
+
+def dedupe_products(
+    products: Iterable[Dict[str, Any]],
+    threshold: Optional[float] = 0.8,
+    window: int = DEDUPE_WINDOW,
+    merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]] = merge_products
+) -> List[Dict[str, Any]]:
+    """
+    Remove exact and near-duplicate normalized products, merging their stock and tags.
+    
+    See ProductDeduplicator for how duplicates are matched and merged.
+    """
+    return list(ProductDeduplicator(threshold, window, merge).dedupe(products))
+
+# Below this many products, pickling chunks to worker processes costs more
+# than normalizing them in-process, so the parallel entry points stay serial.
+PARALLEL_THRESHOLD = 10_000
+
+def _normalize_chunk(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalize one chunk of products inside a worker process."""
+    return [normalize_product(product) for product in products]
+
+def _chunks(products: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split an iterable into lists of at most chunk_size items."""
+    iterator = iter(products)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_normalize_products_parallel(
+    products: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    ordered: bool = True,
+    serial_threshold: int = PARALLEL_THRESHOLD
+) -> Iterator[Dict[str, Any]]:
+    """
+    Normalize a stream of products across a pool of worker processes.
+    
+    Input is split into chunks of chunk_size products. At most two chunks
+    per worker are in flight at a time, so memory stays bounded for
+    arbitrarily long streams.
+    
+    Args:
+        products: Any iterable of product dictionaries
+        workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Number of products sent to a worker at a time
+        ordered: Yield products in input order; if False, yield each chunk
+            as soon as it finishes
+        serial_threshold: Streams shorter than this are normalized in-process
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    
+    # Peek at the head of the stream to decide whether a pool is worth it
+    iterator = iter(products)
+    head = list(islice(iterator, serial_threshold))
+    if workers == 1 or len(head) < serial_threshold:
+        for product in chain(head, iterator):
+            yield normalize_product(product)
+        return
+    
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque() if ordered else set()
+        for chunk in _chunks(chain(head, iterator), chunk_size):
+            future = executor.submit(_normalize_chunk, chunk)
+            if ordered:
+                pending.append(future)
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            else:
+                pending.add(future)
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for finished in done:
+                        yield from finished.result()
+        
+        if ordered:
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            for finished in as_completed(pending):
+                yield from finished.result()
+
+def normalize_product_data_parallel(
+    products: List[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    serial_threshold: int = PARALLEL_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Parallel version of normalize_product_data.
+    
+    Returns exactly what normalize_product_data returns, in input order.
+    Batches smaller than serial_threshold are normalized serially.
+    """
+    return list(iter_normalize_products_parallel(
+        products,
+        workers=workers,
+        chunk_size=chunk_size,
+        serial_threshold=serial_threshold
+    ))
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Decode JSON-lines input one record at a time, skipping blank lines.
+    
+    Raises:
+        ValueError: If a line is not valid JSON
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+def write_ndjson(records: Iterable[Dict[str, Any]], output: TextIO) -> int:
+    """Encode records as JSON lines to an open text stream, returning the count."""
+    count = 0
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False))
+        output.write('\n')
+        count += 1
+    return count
+
+def normalize_ndjson_file(
+    input_path: str = '-',
+    output_path: str = '-',
+    changes_path: Optional[str] = None,
+    id_path: str = 'id'
+) -> int:
+    """
+    Normalize an NDJSON product dump record by record.
+    
+    Reads one product per line and writes one normalized product per line,
+    so memory use stays constant regardless of file size.
+    
+    With changes_path, only products that changed since the previous run
+    against the same change index are written, as {"id": ..., "product":
+    {...}} lines, followed by {"id": ..., "deleted": true} lines for
+    products that disappeared.
+    
+    Args:
+        input_path: Path of the NDJSON input file, or '-' for stdin
+        output_path: Path of the NDJSON output file, or '-' for stdout
+        changes_path: Optional SQLite change index path (see ChangeIndex)
+        id_path: Dot-separated path of each product's id, with changes_path
+    
+    Returns:
+        Number of records written
+    """
+    with ExitStack() as stack:
+        if input_path == '-':
+            source = sys.stdin
+        else:
+            source = stack.enter_context(open(input_path, encoding='utf-8'))
+        if output_path == '-':
+            output = sys.stdout
+        else:
+            output = stack.enter_context(open(output_path, 'w', encoding='utf-8'))
+        if changes_path is None:
+            return write_ndjson(iter_normalize_products(read_ndjson(source)), output)
+        index = stack.enter_context(ChangeIndex(changes_path, key=id_path))
+        changes = iter_normalize_changed_products(read_ndjson(source), index)
+        return write_ndjson(
+            ({'id': key, 'deleted': True} if product is None else {'id': key, 'product': product}
+             for key, product in changes),
+            output
+        )
+
+def normalize_ndjson_rows(input_path: str, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Normalize rows start to stop (exclusive) of an NDJSON dump.
+    
+    The dump is memory-mapped and only the requested rows are decoded (see
+    core.ndjson.MappedNDJSON), so parallel workers can each normalize one
+    range from MappedNDJSON.partition(), and an interrupted run can resume
+    from a checkpointed row.
+    """
+    with MappedNDJSON(input_path) as dump:
+        return normalize_product_data(list(dump.records(start, stop)))
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: normalize an NDJSON file (or stdin) to NDJSON."""
+    parser = argparse.ArgumentParser(description="Normalize NDJSON product data.")
+    parser.add_argument('input', nargs='?', default='-', help="input NDJSON file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="output NDJSON file ('-' for stdout)")
+    parser.add_argument('--changes', metavar='INDEX', help="only write products changed since the last run "
+                        "with this SQLite change index, plus deletions")
+    parser.add_argument('--id-path', default='id', help="dot-separated product id path for --changes")
+    args = parser.parse_args(argv)
+    normalize_ndjson_file(args.input, args.output, args.changes, args.id_path)
+
+if __name__ == '__main__':
+    main()
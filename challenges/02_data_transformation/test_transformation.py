@@ -1,6 +1,27 @@
+import asyncio
+import json
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+
 import pytest
+import solution
+from core.changes import ChangeIndex
+from core.ndjson import MappedNDJSON
 from challenge import normalize_product_data as challenge_normalize
 from solution import normalize_product_data as solution_normalize
+from solution import iter_normalize_products, normalize_ndjson_file, normalize_ndjson_rows, normalize_stream, read_ndjson
+from solution import iter_normalize_products_parallel, normalize_product_data_parallel
+from solution import iter_normalize_changed_products
+from solution import ProductDeduplicator, dedupe_key, dedupe_products, merge_products
+from solution import ShapePlanCache, normalize_product, shape_plans
+from solution import PRODUCT_RULES, compile_rules
+from solution import TagCache, tag_cache
+from solution import Product, ProductTable
+from core.instrumentation import Instrumentation
+from core.similarity import LSHIndex, jaccard
+from core.validators import Money
 
 # Note
 # Fixtures are a way to provide reusable test data or setup:
@@ -149,3 +170,383 @@ def test_multiple_products(normalize_fn):
     ]
     
     assert normalize_fn(input_data) == expected
+
+
+def test_iter_normalize_products_is_lazy(basic_product, basic_product_expected):
+    def products():
+        yield from basic_product
+        raise AssertionError("input consumed past the first record")
+
+    stream = iter_normalize_products(products())
+    assert next(stream) == basic_product_expected[0]
+
+def test_normalize_ndjson_file(tmp_path, basic_product, basic_product_expected):
+    source = tmp_path / "products.ndjson"
+    target = tmp_path / "normalized.ndjson"
+    source.write_text(json.dumps(basic_product[0]) + "\n\n" + json.dumps({"name": "Bare"}) + "\n")
+
+    assert normalize_ndjson_file(str(source), str(target)) == 2
+
+    lines = target.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == basic_product_expected + [
+        {"name": "Bare", "price": 0.0, "stock": 0, "tags": []}
+    ]
+
+def test_normalize_ndjson_rows(tmp_path, many_products):
+    dump = tmp_path / "products.ndjson"
+    dump.write_text("".join(json.dumps(product) + "\n" for product in many_products), encoding="utf-8")
+    expected = solution_normalize(many_products)
+
+    with MappedNDJSON(str(dump)) as mapped:
+        ranges = mapped.partition(3)
+    with ProcessPoolExecutor(3) as executor:
+        parts = list(executor.map(normalize_ndjson_rows, [str(dump)] * 3, *zip(*ranges)))
+
+    assert len(ranges) == 3
+    assert [product for part in parts for product in part] == expected
+    assert normalize_ndjson_rows(str(dump), start=240) == expected[240:]
+
+def test_iter_normalize_changed_products():
+    index = ChangeIndex(key="sku")
+    products = [{"sku": i, "name": f"Item {i}", "pricing": {"amount": str(i)}} for i in range(3)]
+    list(iter_normalize_changed_products(products, index))
+
+    products[1]["pricing"]["amount"] = "9.5"
+    changes = list(iter_normalize_changed_products(products[:2], index))
+
+    assert changes == [(1, normalize_product(products[1])), (2, None)]
+    assert changes[0][1]["price"] == 9.5
+
+def test_normalize_ndjson_file_changes(tmp_path):
+    source = tmp_path / "products.ndjson"
+    output = tmp_path / "changes.ndjson"
+    index = str(tmp_path / "index.sqlite")
+    source.write_text('{"id": "a", "name": "A"}\n{"id": "b", "name": "B"}\n', encoding="utf-8")
+    assert normalize_ndjson_file(str(source), str(output), changes_path=index) == 2
+
+    source.write_text('{"id": "a", "name": "A2"}\n', encoding="utf-8")
+    assert normalize_ndjson_file(str(source), str(output), changes_path=index) == 2
+    lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+
+    assert lines == [
+        {"id": "a", "product": {"name": "A2", "price": 0.0, "stock": 0, "tags": []}},
+        {"id": "b", "deleted": True},
+    ]
+
+def test_read_ndjson_reports_bad_lines():
+    with pytest.raises(ValueError, match="line 2"):
+        list(read_ndjson(['{"name": "ok"}', '{broken']))
+
+@pytest.fixture
+def many_products():
+    return [
+        {"product": {"name": f"Item {i}", "details": {"price": str(i), "stock": str(i % 7)}, "tags": ["x"]}}
+        if i % 2 else
+        {"name": f"Item {i}", "pricing": {"amount": f"{i}.5"}, "inventory": str(i), "categories": "a,b"}
+        for i in range(250)
+    ]
+
+def test_parallel_matches_serial(many_products):
+    expected = solution_normalize(many_products)
+
+    assert normalize_product_data_parallel(
+        many_products, workers=2, chunk_size=16, serial_threshold=0
+    ) == expected
+
+def test_parallel_unordered_stream(many_products):
+    results = list(iter_normalize_products_parallel(
+        iter(many_products), workers=2, chunk_size=16, ordered=False, serial_threshold=0
+    ))
+
+    assert sorted(results, key=lambda p: p["name"]) == sorted(
+        solution_normalize(many_products), key=lambda p: p["name"]
+    )
+
+def test_parallel_small_batches_stay_serial(many_products, monkeypatch):
+    import solution
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("small batch should not start a process pool")
+
+    monkeypatch.setattr(solution, "ProcessPoolExecutor", no_pool)
+    assert normalize_product_data_parallel(many_products, workers=4) == solution_normalize(many_products)
+
+def test_shape_plans_prune_absent_sources():
+    rules = compile_rules(PRODUCT_RULES)
+    _, steps, fields = rules.plans.plan_for({"product": {}})
+
+    assert {rules.paths[slot] for slot, _, _ in steps} == {
+        ("product",), ("product", "name"), ("product", "details"),
+        ("product", "details", "price"), ("product", "details", "stock"), ("product", "tags"),
+    }
+    assert [[rules.paths[slot] for slot in slots] for _, slots, _, _, _ in fields] == [
+        [("product", "name")],
+        [("product", "details", "price")],
+        [("product", "details", "stock")],
+        [("product", "tags")],
+    ]
+
+def test_shape_plan_cache_counters(many_products):
+    shape_plans.clear()
+    for product in many_products:
+        normalize_product(product)
+
+    stats = shape_plans.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == len(many_products) - 2
+
+def test_shape_plan_cache_is_bounded():
+    cache = ShapePlanCache(lambda shape: shape, maxsize=2)
+    for shape in ({"a": 1}, {"b": 1}, {"c": 1}, {"a": 2}):
+        cache.plan_for(shape)
+
+    assert cache.stats() == {"hits": 0, "misses": 4, "size": 2, "maxsize": 2}
+
+def test_shape_plan_cache_shared_by_threads():
+    cache = ShapePlanCache(lambda shape: shape, maxsize=8)
+    # More shapes than the cache holds, so lookups race with evictions
+    shapes = [{f"k{i}": 1, f"k{i + 1}": 1} for i in range(12)]
+
+    def plan_all(seed):
+        records = random.Random(seed).choices(shapes, k=100_000)
+        return all(cache.plan_for(record) == frozenset(record) for record in records)
+
+    # Switch threads as often as possible to interleave lookups
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(6) as executor:
+            results = list(executor.map(plan_all, range(6)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert all(results)
+    assert cache.stats()["size"] <= 8
+
+def test_compile_rules_shares_prefixes():
+    rules = compile_rules({
+        "city": {"paths": ["user.location.city"]},
+        "state": {"paths": ["user.location.state", "state"], "default": "??"},
+    })
+
+    assert rules.paths == [
+        (), ("user",), ("user", "location"), ("user", "location", "city"),
+        ("user", "location", "state"), ("state",),
+    ]
+    assert rules({"user": {"location": {"city": "SF"}}}) == {"city": "SF", "state": "??"}
+
+def test_compile_rules_coercion_and_defaults():
+    rules = compile_rules({
+        "qty": {"paths": ["a.qty", "qty"], "coerce": "int", "default": -1},
+        "labels": {"paths": ["labels"], "coerce": lambda v: v.split("|"), "default": []},
+    })
+
+    assert rules({"qty": "3.0", "labels": "x|y"}) == {"qty": 3, "labels": ["x", "y"]}
+    assert rules({"a": {"qty": "n/a"}, "qty": "4"}) == {"qty": -1, "labels": []}
+
+    first, second = rules({}), rules({})
+    first["labels"].append("mutated")
+    assert second["labels"] == []
+
+def test_compile_rules_shared_coercions():
+    rules = compile_rules({
+        "price": {"paths": ["price"], "coerce": "money"},
+        "on_sale": {"paths": ["sale"], "coerce": "bool", "default": False},
+    })
+
+    assert rules({"price": "$1,299.99", "sale": "yes"}) == {
+        "price": Money(Decimal("1299.99"), "USD"),
+        "on_sale": True,
+    }
+    assert rules({"price": "about ten", "sale": "maybe"}) == {"price": None, "on_sale": False}
+
+@pytest.mark.parametrize("rules", [
+    {"name": "not a dict"},
+    {"name": {"paths": ["a..b"]}},
+    {"name": {"paths": ["a"], "coerce": "bogus"}},
+    {"name": {"paths": ["a"], "fallback": 1}},
+])
+def test_compile_rules_rejects_malformed_specs(rules):
+    with pytest.raises(ValueError):
+        compile_rules(rules)
+
+def test_tag_cache_matches_normalize_tags():
+    cache = TagCache()
+    inputs = ["home, lighting", ["a", "b"], "", None, [1, "x"], "home, lighting", ["a", "b"]]
+
+    assert [cache(tags) for tags in inputs] == [
+        ["home", "lighting"], ["a", "b"], [], [], ["1", "x"], ["home", "lighting"], ["a", "b"]
+    ]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["uncached"]) == (2, 2, 1)
+
+def test_tag_cache_interns_and_copies():
+    cache = TagCache()
+    first = cache("".join(["elec", "tronics"]) + ",audio")
+    second = cache("electronics,audio")
+    other = cache(["audio"])
+
+    assert first == second and first is not second
+    assert first[1] is other[0]
+
+def test_normalize_product_data_with_cached_tags(many_products):
+    tag_cache.clear()
+
+    assert solution_normalize(many_products, cache_tags=True) == solution_normalize(many_products)
+    assert tag_cache.stats()["hits"] == len(many_products) - 2
+
+def test_tuple_output(many_products):
+    products = solution_normalize(many_products, output="tuples")
+
+    assert all(isinstance(product, Product) for product in products)
+    assert [product._asdict() for product in products] == solution_normalize(many_products)
+
+def test_table_output(many_products):
+    expected = solution_normalize(many_products)
+    table = solution_normalize(many_products, output="table")
+
+    assert isinstance(table, ProductTable)
+    assert len(table) == len(expected)
+    assert table.to_dicts() == expected
+    assert table[-1] == expected[-1]
+    assert dict(table[3]) == expected[3]
+    assert sum(table.prices) == sum(product["price"] for product in expected)
+    assert sorted(table.tag_pool) == ["a", "b", "x"]
+
+def test_table_rows_are_views():
+    table = ProductTable([{"name": "Lamp", "price": 1.5, "stock": 2, "tags": ["home"]}])
+    row = table[0]
+
+    table.prices[0] = 3.0
+    assert row["price"] == 3.0
+    assert list(row) == ["name", "price", "stock", "tags"]
+    with pytest.raises(KeyError):
+        row["currency"]
+    with pytest.raises(IndexError):
+        table[1]
+
+def test_invalid_output_type(basic_product):
+    with pytest.raises(ValueError):
+        solution_normalize(basic_product, output="frames")
+
+def test_instrumented_normalization(many_products):
+    metrics = Instrumentation("data_transformation")
+    broken = {"name": "Broken", "pricing": {"amount": "N/A"}, "inventory": "3"}
+
+    results = solution_normalize(many_products + [broken], instrumentation=metrics)
+
+    assert results == solution_normalize(many_products + [broken])
+    assert metrics.records.calls == len(many_products) + 1
+    assert metrics.fields["price"].calls == len(many_products) + 1
+    assert metrics.fields["price"].failures == 1
+    assert "name" not in metrics.fields
+    assert list(iter_normalize_products([broken], instrumentation=metrics)) == [results[-1]]
+    assert metrics.fields["price"].failures == 2
+
+def test_calling_instrumented_rules_records_metrics():
+    metrics = Instrumentation("data_transformation")
+    rules = compile_rules(PRODUCT_RULES)
+    product = {"name": "Desk Lamp", "details": {"price": "49.99", "stock": "2"}}
+
+    assert rules.instrumented(metrics)(product) == rules(product)
+    assert metrics.records.calls == 1
+    assert metrics.fields["price"].calls == 1
+
+async def aiter_products(products):
+    for product in products:
+        await asyncio.sleep(0)
+        yield product
+
+async def collect_stream(products, **kwargs):
+    return [product async for product in normalize_stream(aiter_products(products), **kwargs)]
+
+def test_normalize_stream(many_products):
+    expected = solution_normalize(many_products)
+
+    assert asyncio.run(collect_stream(many_products, batch_size=64)) == expected
+    with ThreadPoolExecutor(2) as executor:
+        assert asyncio.run(collect_stream(many_products, batch_size=64, executor=executor)) == expected
+    with ProcessPoolExecutor(2) as executor:
+        assert asyncio.run(collect_stream(many_products, batch_size=100, executor=executor, cache_tags=True)) == expected
+
+def listing(name, price=10.0, stock=1, tags=()):
+    return {"name": name, "price": price, "stock": stock, "tags": list(tags)}
+
+def test_dedupe_exact_duplicates_merge_stock_and_tags():
+    products = [
+        listing("Laptop Pro", 1299.99, 5, ["electronics"]),
+        listing("Desk Lamp", 49.99, 2),
+        listing("  laptop   PRO ", 1299.99, 3, ["computers", "electronics"]),
+    ]
+
+    assert dedupe_products(products, threshold=None) == [
+        listing("Laptop Pro", 1299.99, 8, ["electronics", "computers"]),
+        listing("Desk Lamp", 49.99, 2),
+    ]
+    assert products[0] == listing("Laptop Pro", 1299.99, 5, ["electronics"])
+    assert dedupe_key(products[0]) == dedupe_key(products[2])
+    assert dedupe_key(products[0]) != dedupe_key(listing("Laptop Pro", 1299.0))
+
+def test_dedupe_near_duplicates():
+    products = [
+        listing("Apple iPhone 15 Pro Max 256GB Black", 1199.0, 4, ["phones"]),
+        listing("Laptop Pro 15", 1299.0, 2, ["computers"]),
+        listing("Apple iPhone 15 Pro Max - 256 GB", 1189.0, 6, ["phones"]),
+        listing("Laptop Pro 16", 1299.0, 3, ["computers"]),
+        listing("Sony WH1000XM5 headphones", 399.0, 1, ["audio"]),
+        listing("Sony WH-1000XM5 Headphones", 379.0, 1, ["audio"]),
+    ]
+
+    assert [(product["name"], product["stock"]) for product in dedupe_products(products)] == [
+        ("Apple iPhone 15 Pro Max 256GB Black", 10),
+        ("Laptop Pro 15", 2),
+        ("Laptop Pro 16", 3),
+        ("Sony WH1000XM5 headphones", 2),
+    ]
+    assert len(dedupe_products(products, threshold=0.95)) == 5
+    assert len(dedupe_products(products, threshold=None)) == 6
+
+def test_dedupe_window_bounds_pending_products():
+    deduplicator = ProductDeduplicator(window=2)
+    products = [listing(f"Item {i}", i) for i in range(5)] + [listing("Item 0", 0), listing("Item 4", 4, 2)]
+    result = list(deduplicator.dedupe(products))
+
+    assert [product["name"] for product in result] == [f"Item {i}" for i in range(5)]
+    assert result[4]["stock"] == 3
+    assert deduplicator.stats() == {"seen": 7, "emitted": 5, "exact": 1, "near": 0, "late": 1}
+
+def test_dedupe_scales_with_common_tokens(monkeypatch):
+    # Every name shares "product" and one of two tags, which would put most
+    # of the window in the same LSH buckets
+    products = [listing(f"Product {i}", float(i % 500), tags=[("electronics", "home")[i % 2]]) for i in range(20_000)]
+    products += [listing(f"product {i} -", float(i % 500), tags=[("electronics", "home")[i % 2]]) for i in range(19_800, 20_000)]
+    # Count the work per product instead of timing it: LSH candidates
+    # returned and token sets compared must stay bounded, not grow with
+    # the window
+    candidates = []
+    comparisons = []
+    query = LSHIndex.query
+
+    def counting_query(index, signature):
+        found = query(index, signature)
+        candidates.append(len(found))
+        return found
+
+    monkeypatch.setattr(LSHIndex, "query", counting_query)
+    monkeypatch.setattr(solution, "jaccard", lambda first, second: comparisons.append(1) or jaccard(first, second))
+    deduplicator = ProductDeduplicator()
+
+    result = list(deduplicator.dedupe(products))
+
+    assert len(result) == 20_000 and deduplicator.near == 200
+    assert max(candidates) <= deduplicator.max_bucket * LSHIndex(threshold=deduplicator.threshold).bands
+    assert sum(candidates) < 2 * len(products)
+    assert len(comparisons) < 2 * len(products)
+
+def test_dedupe_custom_merge():
+    def keep_lowest_price(kept, duplicate):
+        return duplicate if duplicate["price"] < kept["price"] else kept
+
+    products = [listing("Desk Lamp Classic", 49.99), listing("Desk Lamp Classic", 49.99), listing("desk lamp  classic", 39.99)]
+    assert dedupe_products(products, merge=keep_lowest_price) == [listing("desk lamp  classic", 39.99)]
+    assert merge_products(listing("A", stock=1), listing("A", stock=2, tags=["x"])) == listing("A", stock=3, tags=["x"])
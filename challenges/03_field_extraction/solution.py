@@ -1,18 +1,199 @@
-from typing import Any, Dict, Tuple, Callable
+import os
+import re
+import sys
+from collections import Counter
+from copy import copy
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Callable, Union
 
-def get_nested_value(data: Dict[str, Any], path: str) -> Any:
-    """Helper function to get value from nested dictionary using dot notation path."""
+try:
+    import core
+except ImportError:
+    # Running as a script from this directory: make the repository root importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from core.cache import PlanCache
+from core.instrumentation import Instrumentation
+from core.projection import Projection, build_projection, loads_projected
+from core.validators import default_registry
+
+# Maximum number of parsed paths kept by parse_path
+PATH_CACHE_SIZE = 1024
+
+class _Wildcard:
+    """Path step matching every item of a list (or value of a dict)."""
+    
+    def __repr__(self):
+        return '[*]'
+
+WILDCARD = _Wildcard()
+
+_SEGMENT = re.compile(r'([^\[\]]*)((?:\[[^\[\]]*\])*)')
+_SELECTOR = re.compile(r'\[([^\[\]]*)\]')
+
+def _parse_selector(selector: str, path: str) -> Any:
+    """Parse the inside of a [...] selector into an index, slice or WILDCARD."""
+    selector = selector.strip()
+    try:
+        if selector == '*':
+            return WILDCARD
+        if ':' in selector:
+            bounds = selector.split(':')
+            if len(bounds) > 3:
+                raise ValueError(selector)
+            return slice(*(int(bound) if bound.strip() else None for bound in bounds))
+        return int(selector)
+    except ValueError:
+        raise ValueError(f"Invalid path format: {path}") from None
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def parse_path(path: str) -> Tuple[Any, ...]:
+    """
+    Parse a path expression into a tuple of steps.
+    
+    Paths are dot-separated keys, each optionally followed by selectors:
+        - [n]: list index (negative indices count from the end)
+        - [*]: every list item, or every value of a dict
+        - [start:stop:step]: a slice of a list
+    For example "offers[0].price", "variants[*].sku" or "items[1:3].name".
+    
+    Steps are str (dict key), int (list index), slice or WILDCARD. Results
+    are cached by path string, so each distinct path is parsed once.
+    
+    Raises:
+        ValueError: If the path is malformed
+    """
     if not path or '..' in path:
         raise ValueError(f"Invalid path format: {path}")
+    if '[' not in path and ']' not in path:
+        return tuple(path.split('.'))
     
+    steps: List[Any] = []
+    for segment in path.split('.'):
+        match = _SEGMENT.fullmatch(segment)
+        if match is None:
+            raise ValueError(f"Invalid path format: {path}")
+        name, selectors = match.groups()
+        if name or not selectors:
+            steps.append(name)
+        steps.extend(_parse_selector(selector, path) for selector in _SELECTOR.findall(selectors))
+    return tuple(steps)
+
+def _split_fan_out(steps: Tuple[Any, ...]) -> Tuple[Tuple[Any, ...], Optional[Tuple[Any, ...]]]:
+    """Split steps into the single-valued prefix and the rest from the first wildcard or slice."""
+    for position, step in enumerate(steps):
+        if step is WILDCARD or step.__class__ is slice:
+            return steps[:position], steps[position:]
+    return steps, None
+
+def _step(current: Any, key: Any) -> Any:
+    """Apply a single-valued step (dict key or list index), returning None if missing."""
+    if isinstance(current, dict):
+        return current.get(key)
+    if key.__class__ is int and isinstance(current, (list, tuple)):
+        if -len(current) <= key < len(current):
+            return current[key]
+    return None
+
+def _fan_out(value: Any, steps: Tuple[Any, ...]) -> List[Any]:
+    """Apply steps that may match several values, returning every match in order."""
+    matches = [value]
+    for step in steps:
+        found = []
+        for current in matches:
+            if step is WILDCARD:
+                if isinstance(current, dict):
+                    found.extend(current.values())
+                elif isinstance(current, (list, tuple)):
+                    found.extend(current)
+            elif step.__class__ is slice:
+                if isinstance(current, (list, tuple)):
+                    found.extend(current[step])
+            elif isinstance(current, dict):
+                if step in current:
+                    found.append(current[step])
+            elif step.__class__ is int and isinstance(current, (list, tuple)):
+                if -len(current) <= step < len(current):
+                    found.append(current[step])
+        matches = found
+    return matches
+
+def get_nested_value(data: Dict[str, Any], path: str) -> Any:
+    """
+    Helper function to get value from nested data using a path expression.
+    
+    See parse_path for the syntax. Paths with a wildcard or slice return the
+    list of matched values; otherwise a missing path returns None.
+    """
+    prefix, rest = _split_fan_out(parse_path(path))
     current = data
-    for key in path.split('.'):
-        if isinstance(current, dict) and key in current:
-            current = current[key]
-        else:
+    for key in prefix:
+        current = _step(current, key)
+        if current is None:
             return None
+    if rest is not None:
+        return _fan_out(current, rest)
     return current
 
+class MemoizedTransform:
+    """
+    A pure transform wrapped with a bounded LRU cache of its results.
+    
+    Scraped data repeats the same values (categories, cities, price strings)
+    across many records; a memoized transform computes each distinct value
+    once. Results are keyed by value and type, so 1, 1.0 and True are cached
+    separately. Unhashable values (dicts, lists) bypass the cache. Cached
+    results are shared between calls, so only memoize transforms that return
+    immutable values, and exceptions are never cached. Type transforms go
+    through resolve_transform first, so memoize(bool) converts "false" to
+    False just as a bare bool does.
+    """
+    
+    def __init__(self, transform: Callable, maxsize: int = 4096):
+        if not callable(transform):
+            raise ValueError("Expected callable transform")
+        self.transform = resolve_transform(transform)
+        self.maxsize = maxsize
+        self.uncached = 0
+        self._cached = lru_cache(maxsize=maxsize, typed=True)(self.transform)
+    
+    def __call__(self, value: Any) -> Any:
+        try:
+            return self._cached(value)
+        except TypeError:
+            if getattr(value, '__hash__', None) is not None:
+                raise
+            # Unhashable values can't be cache keys
+            self.uncached += 1
+            return self.transform(value)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache hits, misses, size and hit rate."""
+        info = self._cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': self.maxsize,
+            'uncached': self.uncached,
+            'hit_rate': info.hits / lookups if lookups else 0.0,
+        }
+    
+    def clear(self) -> None:
+        """Drop all cached results and reset the counters."""
+        self._cached.cache_clear()
+        self.uncached = 0
+
+def memoize(transform: Callable, maxsize: int = 4096) -> MemoizedTransform:
+    """
+    Opt a pure transform into result memoization for use in a mapping.
+    
+    Example:
+        mapping = {"city": ("user.location.city", memoize(str.title))}
+    """
+    return MemoizedTransform(transform, maxsize)
+
 def validate_mapping(mapping: Dict[str, Tuple[str, Callable]]) -> None:
     """Validate mapping format and raise ValueError if invalid."""
     for key, value in mapping.items():
@@ -24,10 +205,275 @@ def validate_mapping(mapping: Dict[str, Tuple[str, Callable]]) -> None:
         if not callable(transform):
             raise ValueError(f"Invalid transform for key '{key}': Expected callable")
 
-def extract_fields(data: Dict[str, Any], mapping: Dict[str, Tuple[str, Callable]]) -> Dict[str, Any]:
+def resolve_transform(transform: Callable) -> Callable:
+    """
+    Route type transforms through the shared coercion registry.
+    
+    Types with registered coercions (int, float, str, bool, list, Decimal,
+    datetime, Enum types, ...) convert exactly as in the other challenges,
+    e.g. bool turns "false" into False and list splits "a,b" on commas.
+    Failed conversions raise CoercionError, a ValueError. Any other callable
+    is returned unchanged.
+    """
+    if isinstance(transform, type) and default_registry.supports(transform):
+        return default_registry.converter_for(transform)
+    return transform
+
+@dataclass
+class FieldStats:
+    """
+    Extraction counters for a single output field.
+    
+    Attributes:
+        missing: Records where the path was missing or held None
+        failed: Records where the transform raised
+        errors: Transform exception counts keyed by exception type name
+    """
+    missing: int = 0
+    failed: int = 0
+    errors: Counter = field(default_factory=Counter)
+
+class ExtractionStats:
+    """
+    Per-output-field counters accumulated across batch extractions.
+    
+    Pass the same instance to several extract_many/iter_extract_many calls
+    to monitor extraction quality over a long run.
+    """
+    
+    def __init__(self):
+        self.records = 0
+        self.fields: Dict[str, FieldStats] = {}
+    
+    def field(self, output_field: str) -> FieldStats:
+        """Return the counters for an output field, creating them if needed."""
+        stats = self.fields.get(output_field)
+        if stats is None:
+            stats = self.fields[output_field] = FieldStats()
+        return stats
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as plain, JSON-serializable data."""
+        return {
+            'records': self.records,
+            'fields': {
+                output_field: {
+                    'missing': stats.missing,
+                    'failed': stats.failed,
+                    'errors': dict(stats.errors),
+                }
+                for output_field, stats in self.fields.items()
+            },
+        }
+
+class CompiledMapping:
+    """
+    A field mapping validated and compiled once for repeated extraction.
+    
+    Paths are parsed once (see parse_path) and merged into a prefix trie,
+    with one slot per trie node. Extracting a record walks the trie once,
+    parents before children, so fields that share a prefix (e.g.
+    "user.location.city" and "user.location.state") look up "user" and
+    "user.location" a single time. Keys and list indices live in the trie;
+    steps from the first wildcard or slice onwards are applied per field.
+    
+    Attributes:
+        mapping: A snapshot of the mapping this extractor was compiled from
+        paths: Step path of each trie slot; slot 0 is the record itself
+        steps: (slot, parent_slot, key) lookups in trie order
+        fields: (output_field, slot, fan_out_steps, transform) for each
+            mapped field; fan_out_steps is None for single-valued paths
+        projection: The parts of a JSON document the fields read, for
+            extract_json (see core.projection)
+    """
+    
+    def __init__(self, mapping: Dict[str, Tuple[str, Callable]]):
+        validate_mapping(mapping)
+        self.mapping = dict(mapping)
+        self.paths: List[Tuple[Any, ...]] = [()]
+        self._slots: Dict[Tuple[Any, ...], int] = {(): 0}
+        
+        fields = []
+        for output_field, (path, transform) in mapping.items():
+            prefix, rest = _split_fan_out(parse_path(path))
+            fields.append((output_field, self._slot_for(prefix), rest, resolve_transform(transform)))
+        self.fields: Tuple[Tuple[str, int, Optional[Tuple[Any, ...]], Callable], ...] = tuple(fields)
+        self.steps: Tuple[Tuple[int, int, Any], ...] = tuple(
+            (slot, self._slots[path[:-1]], path[-1])
+            for slot, path in enumerate(self.paths)
+            if slot
+        )
+        self.projection: Projection = build_projection(self.paths[slot] for _, slot, _, _ in self.fields)
+        self._instrumented: Optional[Tuple[Instrumentation, 'CompiledMapping']] = None
+    
+    def _slot_for(self, keys: Tuple[Any, ...]) -> int:
+        """Return the trie slot for a key path, adding it and its prefixes if new."""
+        for depth in range(1, len(keys) + 1):
+            prefix = keys[:depth]
+            if prefix not in self._slots:
+                self._slots[prefix] = len(self.paths)
+                self.paths.append(prefix)
+        return self._slots[keys]
+    
+    def extract(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract and transform all mapped fields from one record."""
+        # Missing paths stay None, which is also how missing fields are reported
+        values = [None] * len(self.paths)
+        values[0] = data
+        for slot, parent, key in self.steps:
+            current = values[parent]
+            if isinstance(current, dict):
+                values[slot] = current.get(key)
+            elif key.__class__ is int and isinstance(current, (list, tuple)):
+                if -len(current) <= key < len(current):
+                    values[slot] = current[key]
+        
+        result = {}
+        for output_field, slot, rest, transform in self.fields:
+            value = values[slot]
+            if value is not None:
+                if rest is not None:
+                    value = _fan_out(value, rest)
+                try:
+                    value = transform(value)
+                except Exception:
+                    value = None
+            result[output_field] = value
+        return result
+    
+    def __call__(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Looked up per call (not aliased) so instrumented copies, which wrap
+        # extract on the instance, are instrumented when called directly too
+        return self.extract(data)
+    
+    def extract_json(self, document: Union[str, bytes]) -> Dict[str, Any]:
+        """
+        Extract fields from an undecoded JSON document.
+        
+        Only the parts of the document the mapped paths can reach are
+        decoded (see core.projection.loads_projected); large unrequested
+        values are skipped. Small documents are decoded in full.
+        
+        Raises:
+            json.JSONDecodeError: If the document is not valid JSON
+        """
+        return self.extract(loads_projected(document, self.projection))
+    
+    def instrumented(self, instrumentation: Instrumentation) -> 'CompiledMapping':
+        """
+        Return a copy of this extractor that records per-field metrics.
+        
+        Each field's transform is wrapped to count calls, failures and time;
+        whole records are counted under instrumentation.records. Missing
+        paths skip the transform and are not counted. The copy is reused for
+        repeated calls with the same instrumentation.
+        """
+        cached = self._instrumented
+        if cached is not None and cached[0] is instrumentation:
+            return cached[1]
+        
+        extractor = copy(self)
+        extractor._instrumented = None
+        extractor.fields = tuple(
+            (output_field, slot, rest, instrumentation.wrap(output_field, transform))
+            for output_field, slot, rest, transform in self.fields
+        )
+        extractor.extract = instrumentation.wrap_records(extractor.extract)
+        self._instrumented = (instrumentation, extractor)
+        return extractor
+    
+    def iter_extract(
+        self,
+        records: Iterable[Dict[str, Any]],
+        stats: Optional[ExtractionStats] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily extract fields from each record, in input order.
+        
+        If stats is given, missing paths, transform failures and exception
+        types are counted per output field as records are consumed.
+        """
+        if stats is None:
+            return map(self.extract, records)
+        return self._iter_extract_counted(records, stats)
+    
+    def _iter_extract_counted(
+        self,
+        records: Iterable[Dict[str, Any]],
+        stats: ExtractionStats
+    ) -> Iterator[Dict[str, Any]]:
+        """Version of iter_extract that updates stats for every record."""
+        fields = tuple(
+            (output_field, slot, rest, transform, stats.field(output_field))
+            for output_field, slot, rest, transform in self.fields
+        )
+        size = len(self.paths)
+        steps = self.steps
+        for data in records:
+            values = [None] * size
+            values[0] = data
+            for slot, parent, key in steps:
+                current = values[parent]
+                if isinstance(current, dict):
+                    values[slot] = current.get(key)
+                elif key.__class__ is int and isinstance(current, (list, tuple)):
+                    if -len(current) <= key < len(current):
+                        values[slot] = current[key]
+            
+            result = {}
+            for output_field, slot, rest, transform, field_stats in fields:
+                value = values[slot]
+                if value is None:
+                    field_stats.missing += 1
+                else:
+                    if rest is not None:
+                        value = _fan_out(value, rest)
+                    try:
+                        value = transform(value)
+                    except Exception as e:
+                        field_stats.failed += 1
+                        field_stats.errors[type(e).__name__] += 1
+                        value = None
+                result[output_field] = value
+            stats.records += 1
+            yield result
+
+def compile_mapping(mapping: Dict[str, Tuple[str, Callable]]) -> CompiledMapping:
+    """
+    Validate and compile a mapping into a reusable extractor.
+    
+    Raises:
+        ValueError: If path format is invalid or mapping is malformed
+    """
+    return CompiledMapping(mapping)
+
+# Maximum number of compiled mappings cached for extract_fields
+MAX_CACHED_MAPPINGS = 128
+
+# Compiled mappings shared by every thread, keyed by mapping content, so
+# equivalent mappings (even with freshly created lambdas) compile once
+mapping_cache: PlanCache[CompiledMapping] = PlanCache(CompiledMapping, maxsize=MAX_CACHED_MAPPINGS)
+
+def _compiled(mapping: Dict[str, Tuple[str, Callable]]) -> CompiledMapping:
+    """
+    Return the cached extractor for a mapping, compiling it on first use.
+    
+    See core.cache.PlanCache: a mapping mutated in place is recompiled.
+    """
+    return mapping_cache.get(mapping)
+
+def extract_fields(
+    data: Dict[str, Any],
+    mapping: Dict[str, Tuple[str, Callable]],
+    instrumentation: Optional[Instrumentation] = None
+) -> Dict[str, Any]:
     """
     Extract and transform fields from nested data structure based on mapping rules.
     
+    The mapping is compiled (see compile_mapping) on first use and cached
+    process-wide in mapping_cache, so repeated calls with an equivalent
+    mapping, from any thread, skip validation and path parsing.
+    
     Args:
         data: A nested dictionary containing the source data
         mapping: A dictionary where:
@@ -35,6 +481,8 @@ def extract_fields(data: Dict[str, Any], mapping: Dict[str, Tuple[str, Callable]
             - value: tuple of (path, transform_function)
                 - path: dot notation string indicating nested location (e.g., "user.name")
                 - transform_function: callable to transform the extracted value
+        instrumentation: Optional Instrumentation to record per-field
+            transform calls, failures and time into
     
     Returns:
         Dictionary with extracted and transformed values
@@ -42,31 +490,70 @@ def extract_fields(data: Dict[str, Any], mapping: Dict[str, Tuple[str, Callable]
     Raises:
         ValueError: If path format is invalid or mapping is malformed
     """
-    # Validate mapping format
-    validate_mapping(mapping)
+    compiled = _compiled(mapping)
+    if instrumentation is not None:
+        compiled = compiled.instrumented(instrumentation)
+    return compiled.extract(data)
+
+def extract_fields_json(
+    document: Union[str, bytes],
+    mapping: Dict[str, Tuple[str, Callable]],
+    instrumentation: Optional[Instrumentation] = None
+) -> Dict[str, Any]:
+    """
+    Extract fields from a raw JSON document (str or UTF-8 bytes).
     
-    result = {}
+    Equivalent to extract_fields(json.loads(document), mapping), but only
+    the parts of the document that the mapping's paths reach are decoded.
     
-    # Process each field in the mapping
-    for output_field, (path, transform) in mapping.items():
-        try:
-            # Extract value using path
-            value = get_nested_value(data, path)
-            
-            # Apply transformation if value exists
-            if value is not None:
-                try:
-                    result[output_field] = transform(value)
-                except Exception:
-                    result[output_field] = None
-            else:
-                result[output_field] = None
-                
-        except ValueError as e:
-            # Re-raise path format errors
-            raise e
-        except Exception:
-            # Handle any other errors by setting field to None
-            result[output_field] = None
-    
-    return result
+    Raises:
+        ValueError: If path format is invalid or mapping is malformed, or
+            the document is not valid JSON (json.JSONDecodeError)
+    """
+    compiled = _compiled(mapping)
+    if instrumentation is not None:
+        compiled = compiled.instrumented(instrumentation)
+    return compiled.extract_json(document)
+
+def iter_extract_many(
+    records: Iterable[Dict[str, Any]],
+    mapping: Dict[str, Tuple[str, Callable]],
+    stats: Optional[ExtractionStats] = None,
+    instrumentation: Optional[Instrumentation] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily extract fields from a stream of records.
+    
+    The mapping is validated and compiled once, up front.
+    
+    Args:
+        records: Any iterable of source dictionaries
+        mapping: Field mapping, as for extract_fields
+        stats: Optional ExtractionStats to accumulate per-field counters into
+        instrumentation: Optional Instrumentation to record per-field
+            transform calls, failures and time into
+    
+    Returns:
+        An iterator of extracted dictionaries, in input order
+    
+    Raises:
+        ValueError: If path format is invalid or mapping is malformed
+    """
+    compiled = _compiled(mapping)
+    if instrumentation is not None:
+        compiled = compiled.instrumented(instrumentation)
+    return compiled.iter_extract(records, stats)
+
+def extract_many(
+    records: Iterable[Dict[str, Any]],
+    mapping: Dict[str, Tuple[str, Callable]],
+    stats: Optional[ExtractionStats] = None,
+    instrumentation: Optional[Instrumentation] = None
+) -> List[Dict[str, Any]]:
+    """
+    Extract fields from a batch of records; list form of iter_extract_many.
+    
+    Raises:
+        ValueError: If path format is invalid or mapping is malformed
+    """
+    return list(iter_extract_many(records, mapping, stats, instrumentation))
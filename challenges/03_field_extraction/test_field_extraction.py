@@ -1,6 +1,14 @@
+import json
+
 import pytest
 from challenge import extract_fields as challenge_extract
 from solution import extract_fields as solution_extract
+from solution import compile_mapping, mapping_cache
+from solution import ExtractionStats, extract_many, iter_extract_many
+from solution import WILDCARD, get_nested_value, parse_path
+from solution import memoize
+from solution import extract_fields_json
+from core.instrumentation import Instrumentation
 
 @pytest.fixture
 def sample_data():
@@ -138,3 +146,217 @@ def test_invalid_mapping_format(extract_fn):
     for mapping in invalid_mappings:
         with pytest.raises(ValueError):
             extract_fn(data, mapping)
+
+
+def test_compiled_mapping_matches_extract_fields(sample_data, basic_mapping):
+    extractor = compile_mapping(basic_mapping)
+
+    assert extractor.extract(sample_data) == solution_extract(sample_data, basic_mapping)
+    assert extractor({"user": "not a dict"})["name"] is None
+
+def test_compiled_mapping_shares_prefixes(basic_mapping):
+    extractor = compile_mapping(basic_mapping)
+
+    assert extractor.paths == [
+        (),
+        ("user",), ("user", "name"), ("user", "location"), ("user", "location", "city"),
+        ("metrics",), ("metrics", "visits"), ("metrics", "engagement"), ("metrics", "last_active"),
+    ]
+
+def test_compiled_mapping_validates_once():
+    with pytest.raises(ValueError):
+        compile_mapping({"invalid": ("key..double.dot", str)})
+    with pytest.raises(ValueError):
+        compile_mapping({"bad": ("path", "not_callable")})
+
+def test_extract_fields_recompiles_changed_mapping(sample_data):
+    mapping = {"value": ("user.name", str)}
+    assert solution_extract(sample_data, mapping) == {"value": "John Doe"}
+
+    mapping["value"] = ("user.location.city", str)
+    assert solution_extract(sample_data, mapping) == {"value": "San Francisco"}
+
+def test_equivalent_mappings_share_a_compiled_mapping(sample_data):
+    def mapping():
+        return {"name": ("user.name", lambda name: name.upper()), "visits": ("metrics.visits", int)}
+
+    assert mapping_cache.get(mapping()) is mapping_cache.get(mapping())
+    assert solution_extract(sample_data, mapping()) == {"name": "JOHN DOE", "visits": 1234}
+
+def test_extract_many_matches_extract_fields(sample_data, basic_mapping):
+    records = [sample_data, {}, {"user": {"name": "Jane"}}]
+
+    assert extract_many(records, basic_mapping) == [
+        solution_extract(record, basic_mapping) for record in records
+    ]
+
+def test_extract_many_counts_failures(sample_data):
+    mapping = {
+        "visits": ("metrics.visits", int),
+        "city": ("user.location.city", str),
+        "likes": ("metrics.engagement", lambda x: int(x["likes"])),
+    }
+    records = [
+        sample_data,
+        {"metrics": {"visits": "many", "engagement": {}}},
+        {"metrics": {"visits": None, "engagement": {"likes": "x"}}},
+    ]
+    stats = ExtractionStats()
+
+    results = extract_many(records, mapping, stats)
+
+    assert [r["visits"] for r in results] == [1234, None, None]
+    assert stats.as_dict() == {
+        "records": 3,
+        "fields": {
+            "visits": {"missing": 1, "failed": 1, "errors": {"CoercionError": 1}},
+            "city": {"missing": 2, "failed": 0, "errors": {}},
+            "likes": {"missing": 0, "failed": 2, "errors": {"KeyError": 1, "ValueError": 1}},
+        },
+    }
+
+def test_iter_extract_many_is_lazy_and_validates_eagerly(sample_data, basic_mapping):
+    with pytest.raises(ValueError):
+        iter_extract_many([], {"bad": ("a..b", str)})
+
+    def records():
+        yield sample_data
+        raise AssertionError("consumed past the first record")
+
+    assert next(iter_extract_many(records(), basic_mapping))["name"] == "John Doe"
+
+@pytest.fixture
+def listing():
+    return {
+        "offers": [{"price": "10.5", "seller": "a"}, {"price": "9.0"}, {"price": "12"}],
+        "variants": [{"sku": "S1"}, {"color": "red"}, {"sku": "S3"}],
+        "attributes": {"size": "M", "fit": "slim"},
+    }
+
+def test_parse_path_steps():
+    assert parse_path("user.name") == ("user", "name")
+    assert parse_path("offers[0].price") == ("offers", 0, "price")
+    assert parse_path("variants[*].sku") == ("variants", WILDCARD, "sku")
+    assert parse_path("items[1:3][-1]") == ("items", slice(1, 3), -1)
+    assert parse_path("[0].id") == (0, "id")
+
+@pytest.mark.parametrize("path", ["", "a..b", "a[", "a[x]", "a]b", "a[1:2:3:4]"])
+def test_parse_path_rejects_malformed(path):
+    with pytest.raises(ValueError):
+        parse_path(path)
+
+def test_get_nested_value_with_selectors(listing):
+    assert get_nested_value(listing, "offers[0].price") == "10.5"
+    assert get_nested_value(listing, "offers[-1].price") == "12"
+    assert get_nested_value(listing, "offers[5].price") is None
+    assert get_nested_value(listing, "variants[*].sku") == ["S1", "S3"]
+    assert get_nested_value(listing, "offers[1:].price") == ["9.0", "12"]
+    assert get_nested_value(listing, "attributes[*]") == ["M", "slim"]
+    assert get_nested_value(listing, "missing[*].sku") is None
+
+def test_extract_fields_with_selectors(listing):
+    mapping = {
+        "first_price": ("offers[0].price", float),
+        "seller": ("offers[0].seller", str),
+        "skus": ("variants[*].sku", list),
+        "min_price": ("offers[*].price", lambda prices: min(map(float, prices))),
+        "second_sku": ("variants[1].sku", str),
+    }
+
+    assert solution_extract(listing, mapping) == {
+        "first_price": 10.5,
+        "seller": "a",
+        "skus": ["S1", "S3"],
+        "min_price": 9.0,
+        "second_sku": None,
+    }
+    assert compile_mapping(mapping).paths == [
+        (), ("offers",), ("offers", 0), ("offers", 0, "price"),
+        ("offers", 0, "seller"), ("variants",), ("variants", 1), ("variants", 1, "sku"),
+    ]
+
+def test_memoized_transform_caches_repeated_values():
+    calls = []
+
+    def title(value):
+        calls.append(value)
+        return value.title()
+
+    cached = memoize(title, maxsize=2)
+    records = [{"city": city} for city in ["paris", "rome", "paris", "paris", "oslo", "paris"]]
+
+    results = extract_many(records, {"city": ("city", cached)})
+
+    assert [r["city"] for r in results] == ["Paris", "Rome", "Paris", "Paris", "Oslo", "Paris"]
+    assert calls == ["paris", "rome", "oslo"]
+    stats = cached.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (3, 3, 2)
+    assert stats["hit_rate"] == 0.5
+
+def test_memoized_transform_types_and_unhashables():
+    cached = memoize(str)
+
+    assert [cached(1), cached(True), cached(1.0)] == ["1", "True", "1.0"]
+    assert cached([1, 2]) == "[1, 2]"
+    assert cached.stats()["uncached"] == 1
+
+    failing = memoize(int)
+    assert solution_extract({"n": "x"}, {"n": ("n", failing)}) == {"n": None}
+
+def test_memoized_types_use_shared_coercions():
+    data = {"active": "false", "tags": "a, b"}
+    mapping = {"active": ("active", bool), "tags": ("tags", list)}
+    memoized = {field: (path, memoize(transform)) for field, (path, transform) in mapping.items()}
+
+    assert solution_extract(data, memoized) == solution_extract(data, mapping) == {"active": False, "tags": ["a", "b"]}
+
+def test_type_transforms_use_shared_coercions():
+    mapping = {
+        "active": ("flags.active", bool),
+        "tags": ("tags", list),
+        "visits": ("visits", int),
+    }
+    data = {"flags": {"active": "false"}, "tags": "a, b", "visits": "12"}
+
+    assert solution_extract(data, mapping) == {"active": False, "tags": ["a", "b"], "visits": 12}
+    assert solution_extract({"visits": "12.5"}, mapping)["visits"] is None
+
+def test_instrumented_extraction(sample_data, basic_mapping):
+    metrics = Instrumentation("field_extraction")
+    records = [sample_data, {"metrics": {"visits": "many"}}]
+
+    results = [solution_extract(record, basic_mapping, instrumentation=metrics) for record in records]
+
+    assert results == [solution_extract(record, basic_mapping) for record in records]
+    assert metrics.records.calls == 2
+    assert (metrics.fields["visit_count"].calls, metrics.fields["visit_count"].failures) == (2, 1)
+    assert metrics.fields["name"].calls == 1
+    assert metrics.fields["name"].seconds > 0
+    assert compile_mapping(basic_mapping).instrumented(metrics) is not None
+    assert extract_many(records, basic_mapping, instrumentation=metrics) == results
+    assert metrics.records.calls == 4
+
+def test_calling_instrumented_copy_records_metrics(sample_data, basic_mapping):
+    metrics = Instrumentation("field_extraction")
+    extractor = compile_mapping(basic_mapping).instrumented(metrics)
+
+    assert extractor(sample_data) == solution_extract(sample_data, basic_mapping)
+    assert metrics.records.calls == 1
+    assert metrics.fields["name"].calls == 1
+
+def test_extract_fields_json(sample_data, basic_mapping, listing):
+    selectors = {
+        "first_price": ("offers[0].price", float),
+        "skus": ("variants[*].sku", list),
+        "size": ("attributes.size", str),
+    }
+    padded = dict(sample_data, html="<div class='listing'>" * 2000, reviews=[{"text": "ok"}] * 100)
+
+    for data, mapping in [(sample_data, basic_mapping), (padded, basic_mapping), (listing, selectors)]:
+        document = json.dumps(data)
+        assert extract_fields_json(document, mapping) == solution_extract(data, mapping)
+        assert extract_fields_json(document.encode(), mapping) == solution_extract(data, mapping)
+    assert compile_mapping(selectors).projection == {"offers": None, "variants": None, "attributes": {"size": None}}
+
+    with pytest.raises(ValueError):
+        extract_fields_json(json.dumps(padded)[:-1], basic_mapping)
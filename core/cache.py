@@ -0,0 +1,413 @@
+"""
+Process-wide caches of compiled plans (schemas, mappings) shared by threads.
+
+Scraper workers in a thread pool typically rebuild the same schema or
+mapping dict (with fresh lambdas) for every page. PlanCache keys compiled
+plans by fingerprint(), a canonical hashable form of the spec in which
+functions compare by their code, defaults and closure values rather than
+by identity, so equivalent specs from any thread share one compiled plan:
+
+    mapping_cache = PlanCache(CompiledMapping, maxsize=128)
+    compiled = mapping_cache.get(mapping)
+
+Hits take no lock. A spec object passed again is matched by identity and
+an == against a deep copy taken on its second hit, so in-place changes
+(nested ones included) are caught; a spec rebuilt for every call is
+fingerprinted, which for flat dicts of types, atoms and simple lambdas is
+a single loop costing a fraction of a compile. Specs holding containers a
+copy cannot track (say, a dict in a lambda's closure) are always
+fingerprinted.
+Misses take a lock only to register the compile, which runs outside it;
+threads asking for a plan that is being compiled wait for that compile
+instead of repeating it. Eviction approximates LRU with a second-chance
+(clock) scan, so hits only set a flag.
+"""
+import threading
+from types import FunctionType
+from typing import Any, Callable, Dict, Generic, Hashable, NamedTuple, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+class _Identity:
+    """Fingerprint of a value that can only be compared by identity."""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self, value: Any):
+        # Holding the value keeps its id from being reused while cached
+        self.value = value
+    
+    def __hash__(self) -> int:
+        return id(self.value)
+    
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Identity) and other.value is self.value
+
+# Leaf types fingerprinted and snapshotted as themselves
+_ATOMS = frozenset((str, int, float, bool, bytes, complex, type(None)))
+
+def _leaf(value: Any) -> Optional[Hashable]:
+    """
+    Fingerprint a value that needs no recursion, or return None.
+    
+    Covers atoms, types and functions without defaults whose closure holds
+    only atoms, which make up most schemas and mappings.
+    """
+    cls = value.__class__
+    if cls in _ATOMS:
+        # Tag with the type so that 1, 1.0 and True stay distinct
+        return (cls, value)
+    if cls is type:
+        return value
+    if cls is FunctionType and value.__defaults__ is None and value.__kwdefaults__ is None:
+        closure = value.__closure__
+        if closure is None:
+            return (FunctionType, value.__code__, value.__module__, None, None, ())
+        cells = []
+        for cell in closure:
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                return None
+            if contents.__class__ not in _ATOMS:
+                return None
+            cells.append((contents.__class__, contents))
+        return (FunctionType, value.__code__, value.__module__, None, None, tuple(cells))
+    return None
+
+def _flat_fingerprint(spec: dict) -> Optional[Hashable]:
+    """
+    Fingerprint a dict of leaves and tuples of leaves without recursing.
+    
+    Returns the same key as _fingerprint, or None for other dicts. A
+    mapping literal rebuilt for every call takes this path, so it is kept
+    free of per-value function calls where possible.
+    """
+    items = []
+    append = items.append
+    for key, value in spec.items():
+        key_class = key.__class__
+        if key_class not in _ATOMS:
+            return None
+        if value.__class__ is tuple:
+            parts = []
+            for item in value:
+                cls = item.__class__
+                if cls in _ATOMS:
+                    parts.append((cls, item))
+                elif cls is type:
+                    parts.append(item)
+                else:
+                    leaf = _leaf(item)
+                    if leaf is None:
+                        return None
+                    parts.append(leaf)
+            append(((key_class, key), (tuple, tuple(parts))))
+        else:
+            leaf = _leaf(value)
+            if leaf is None:
+                return None
+            append(((key_class, key), leaf))
+    return (dict, tuple(items))
+
+def _fingerprint(value: Any, active: set) -> Hashable:
+    leaf = _leaf(value)
+    if leaf is not None:
+        return leaf
+    if isinstance(value, type):
+        return value
+    marker = id(value)
+    if marker in active:
+        # Self-referencing structure (e.g. a recursive closure)
+        return _Identity(value)
+    active.add(marker)
+    try:
+        if isinstance(value, dict):
+            return (dict, tuple([(_fingerprint(k, active), _fingerprint(v, active)) for k, v in value.items()]))
+        if isinstance(value, (list, tuple)):
+            return (value.__class__, tuple([_fingerprint(item, active) for item in value]))
+        if isinstance(value, FunctionType):
+            cells = []
+            for cell in value.__closure__ or ():
+                try:
+                    cells.append(_captured(cell.cell_contents, active))
+                except ValueError:
+                    # Empty cell
+                    cells.append(None)
+            defaults, kwdefaults = value.__defaults__, value.__kwdefaults__
+            if defaults is not None:
+                defaults = (tuple, tuple([_captured(item, active) for item in defaults]))
+            if kwdefaults is not None:
+                kwdefaults = (dict, tuple([(_fingerprint(k, active), _captured(v, active)) for k, v in kwdefaults.items()]))
+            return (FunctionType, value.__code__, value.__module__, defaults, kwdefaults, tuple(cells))
+        args = getattr(value, '__args__', None)
+        origin = getattr(value, '__origin__', None)
+        if origin is not None and isinstance(args, tuple):
+            # typing forms such as List[{'price': float}] may hold unhashable args
+            return ('typing', _fingerprint(origin, active), tuple(_fingerprint(arg, active) for arg in args))
+        try:
+            hash(value)
+        except TypeError:
+            return _Identity(value)
+        return (value.__class__, value)
+    finally:
+        active.discard(marker)
+
+def _captured(value: Any, active: set) -> Hashable:
+    """
+    Fingerprint a value captured by a function (closure cell or default).
+    
+    The cached plan keeps the function of the first spec compiled, so a
+    captured list or dict is keyed by identity: two lambdas over different
+    lists that happen to be equal must not share a plan, as the lists may
+    diverge later.
+    """
+    if _immutable(value, set()):
+        return _fingerprint(value, active)
+    return _Identity(value)
+
+def fingerprint(spec: Any) -> Hashable:
+    """
+    Return a canonical, hashable key for a schema or mapping spec.
+    
+    Dicts (in insertion order), lists, tuples and typing forms are compared
+    by content. Functions are compared by code object, module, defaults and
+    closure values, so the same lambda created twice has one fingerprint
+    while lambdas from different source lines do not; captured values that
+    can change in place (lists, dicts) compare by identity. Other hashable values
+    compare by value and type; unhashable values compare by identity.
+    """
+    if spec.__class__ is dict:
+        key = _flat_fingerprint(spec)
+        if key is not None:
+            return key
+    return _fingerprint(spec, set())
+
+class _Unsafe(Exception):
+    """Raised by _snapshot for specs whose changes a snapshot cannot detect."""
+
+def _immutable(value: Any, active: set) -> bool:
+    """Whether value holds no dict or list that could change in place."""
+    cls = value.__class__
+    if cls in _ATOMS or cls is type:
+        return True
+    if cls is dict or cls is list or id(value) in active:
+        return False
+    if cls is tuple:
+        inner = value
+    elif cls is FunctionType:
+        inner = [*(value.__defaults__ or ()), *(value.__kwdefaults__ or {}).values()]
+        for cell in value.__closure__ or ():
+            try:
+                inner.append(cell.cell_contents)
+            except ValueError:
+                pass
+    elif getattr(value, '__origin__', None) is not None and isinstance(getattr(value, '__args__', None), tuple):
+        inner = value.__args__
+    else:
+        # Hashable objects compare by value; the rest are fingerprinted by identity
+        return True
+    active.add(id(value))
+    try:
+        return all(_immutable(item, active) for item in inner)
+    finally:
+        active.discard(id(value))
+
+def _snapshot(value: Any) -> Any:
+    """
+    Copy the dicts and lists of a spec, so == against it detects in-place changes.
+    
+    Raises:
+        _Unsafe: If the spec holds containers a copy cannot track: inside a
+            function's closure or defaults, inside a typing form such as
+            List[{'price': float}], or in a cycle
+    """
+    cls = value.__class__
+    if cls is dict:
+        return {key: _snapshot(item) for key, item in value.items()}
+    if cls is list or cls is tuple:
+        return cls([_snapshot(item) for item in value])
+    if not _immutable(value, set()):
+        raise _Unsafe
+    return value
+
+class CacheStats(NamedTuple):
+    """
+    Counters for a PlanCache.
+    
+    Hits are counted without a lock and may undercount slightly under
+    heavy contention; the other counters are exact.
+    """
+    hits: int
+    misses: int
+    waits: int
+    evictions: int
+    size: int
+    maxsize: int
+
+class _Entry:
+    __slots__ = ('key', 'plan', 'referenced')
+    
+    def __init__(self, key: Hashable, plan: Any):
+        self.key = key
+        self.plan = plan
+        self.referenced = False
+
+class _Pending:
+    """A compile in progress, awaited by threads that missed on the same key."""
+    
+    __slots__ = ('done', 'entry', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[_Entry] = None
+        self.error: Optional[BaseException] = None
+
+class PlanCache(Generic[T]):
+    """
+    A bounded, thread-safe cache of plans compiled from specs.
+    
+    Attributes:
+        compile: Function compiling a spec into a plan; the spec it receives
+            is the first one seen for each fingerprint
+        maxsize: Maximum number of plans kept
+    """
+    
+    def __init__(self, compile: Callable[[Any], T], maxsize: int = 128):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.compile = compile
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # Fingerprint -> entry, in insertion order for the clock scan
+        self._entries: Dict[Hashable, _Entry] = {}
+        # id(spec) -> (spec, snapshot of spec, entry): skips fingerprinting
+        # for spec objects passed again unchanged. Holding spec keeps its id
+        # from being reused. Written without the lock; a lost or stale
+        # write only costs a fingerprint later
+        self._by_id: Dict[int, Tuple[Any, Any, _Entry]] = {}
+        # id(spec) -> spec, for specs that hit by fingerprint once: only a
+        # spec object passed again earns a snapshot, so specs rebuilt for
+        # every call do not pay for one
+        self._seen_once: Dict[int, Any] = {}
+        self._pending: Dict[Hashable, _Pending] = {}
+        self._hits = self._misses = self._waits = self._evictions = 0
+    
+    def get(self, spec: Any) -> T:
+        """
+        Return the plan for spec, compiling it on first use.
+        
+        Exceptions raised by compile propagate to every thread waiting for
+        that compile, and nothing is cached.
+        """
+        seen = self._by_id.get(id(spec))
+        if seen is not None and seen[1] == spec:
+            entry = seen[2]
+        else:
+            key = fingerprint(spec)
+            entry = self._entries.get(key)
+            if entry is None:
+                return self._compile(key, spec).plan
+            if self._seen_once.pop(id(spec), None) is spec:
+                self._remember(spec, entry)
+            else:
+                self._note(spec)
+        entry.referenced = True
+        self._hits += 1
+        return entry.plan
+    
+    def _compile(self, key: Hashable, spec: Any) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+                self._misses += 1
+            else:
+                self._waits += 1
+        
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.entry
+        
+        try:
+            entry = _Entry(key, self.compile(spec))
+        except BaseException as e:
+            pending.error = e
+            with self._lock:
+                del self._pending[key]
+            pending.done.set()
+            raise
+        with self._lock:
+            self._evict(self.maxsize - 1)
+            self._entries[key] = entry
+            del self._pending[key]
+        self._remember(spec, entry)
+        pending.entry = entry
+        pending.done.set()
+        return entry
+    
+    def _note(self, spec: Any) -> None:
+        seen_once = self._seen_once
+        if len(seen_once) >= self.maxsize * 2:
+            seen_once.clear()
+        seen_once[id(spec)] = spec
+    
+    def _remember(self, spec: Any, entry: _Entry) -> None:
+        """Register spec's id for the identity fast path in get(), without locking."""
+        try:
+            # A deep copy of the containers, so nested in-place edits stop matching
+            snapshot = _snapshot(spec)
+        except (_Unsafe, RecursionError):
+            return
+        by_id = self._by_id
+        if len(by_id) >= self.maxsize * 2:
+            # Specs rebuilt per call leave one stale id each; start over
+            # rather than evicting one at a time
+            by_id.clear()
+        by_id[id(spec)] = (spec, snapshot, entry)
+    
+    def _evict(self, limit: int) -> None:
+        """Evict entries (caller holds the lock) until at most limit remain."""
+        entries = self._entries
+        while len(entries) > limit:
+            key = next(iter(entries))
+            entry = entries.pop(key)
+            if entry.referenced:
+                # Second chance: recently used entries go to the back once
+                entry.referenced = False
+                entries[key] = entry
+            else:
+                self._evictions += 1
+                # Drop identity shortcuts to the evicted plan
+                self._by_id = {spec_id: seen for spec_id, seen in self._by_id.items() if seen[2] is not entry}
+    
+    def resize(self, maxsize: int) -> None:
+        """Change the size limit, evicting entries if it shrinks."""
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict(maxsize)
+    
+    def clear(self) -> None:
+        """Drop every cached plan and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._by_id.clear()
+            self._seen_once.clear()
+            self._hits = self._misses = self._waits = self._evictions = 0
+    
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses, self._waits, self._evictions, len(self._entries), self.maxsize)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, spec: Any) -> bool:
+        return fingerprint(spec) in self._entries
@@ -0,0 +1,148 @@
+"""
+Change detection for recurring scrapes.
+
+ChangeIndex remembers a content hash per record id in a SQLite file, so a
+daily re-scrape can skip the records that did not change since the last
+run and report the ids that disappeared:
+
+    index = ChangeIndex('catalog.sqlite', key='product.sku')
+    for key, record in index.changes(scraped_records):
+        if record is None:
+            ...  # key disappeared since the last run (tombstone)
+        else:
+            ...  # new or changed record
+
+The work done per run is a hash and an indexed lookup per record; only new
+and changed records are handed on to normalization.
+"""
+import json
+import sqlite3
+from hashlib import blake2b
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+from core.transformers import lookup, split_path
+
+# Keys looked up per SQLite query; well below SQLite's bound-parameter limit
+_LOOKUP_BATCH = 500
+
+# Accepted id types. bool and float are excluded on purpose: SQLite and
+# dicts treat True, 1.0 and 1 as the same key, so one would overwrite the other
+_KEY_TYPES = frozenset((str, int))
+
+# Canonical encoding hashed by content_hash; one shared encoder avoids
+# json.dumps building a new one per call
+_encode = json.JSONEncoder(sort_keys=True, separators=(',', ':'), default=str).encode
+
+def content_hash(record: Any) -> bytes:
+    """
+    Hash a record's content, independently of dict key order.
+    
+    Values that JSON cannot encode (Decimal, datetime, ...) are hashed by
+    their str().
+    """
+    return blake2b(_encode(record).encode(), digest_size=16).digest()
+
+class ChangeIndex:
+    """
+    Content hashes of the records seen in the previous run, keyed by record id.
+    
+    Attributes:
+        path: SQLite database path (':memory:' keeps the index in memory)
+        key: Dot-separated path of the record id, e.g. 'id' or 'product.sku'
+    """
+    
+    def __init__(self, path: str = ':memory:', key: str = 'id'):
+        """
+        Open (creating if needed) an index database.
+        
+        Raises:
+            ValueError: If key is not a valid path
+        """
+        self.path = path
+        self.key = key
+        self._key_path = split_path(key)
+        self._connection = sqlite3.connect(path)
+        # No declared type on key, so ids keep their type (int or str)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS records (key PRIMARY KEY, hash BLOB NOT NULL) WITHOUT ROWID'
+        )
+        self._connection.commit()
+    
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+    
+    def key_of(self, record: Any) -> Any:
+        """
+        Read a record's id.
+        
+        Raises:
+            ValueError: If the record has no id, or the id is not a string or integer
+        """
+        key = lookup(record, self._key_path)
+        if key.__class__ not in _KEY_TYPES:
+            raise ValueError(f"Record has no usable id at {self.key!r}: {key!r}")
+        return key
+    
+    def changes(self, records: Iterable[Any]) -> Iterator[Tuple[Any, Optional[Any]]]:
+        """
+        Yield (key, record) for new and changed records, then (key, None) per removed id.
+        
+        Records are compared with the index by content_hash. Removed ids
+        (tombstones) are the indexed ids absent from records, so they are
+        only known, and yielded, once records is exhausted. The index is
+        updated when the generator finishes; if it is closed early or
+        fails, the index is left as it was. A repeated id is compared with
+        its earlier occurrence in the same run.
+        """
+        connection = self._connection
+        iterator = iter(records)
+        completed = False
+        try:
+            connection.execute('CREATE TEMP TABLE IF NOT EXISTS seen (key PRIMARY KEY) WITHOUT ROWID')
+            connection.execute('DELETE FROM temp.seen')
+            while True:
+                batch = [
+                    (self.key_of(record), content_hash(record), record)
+                    for record in islice(iterator, _LOOKUP_BATCH)
+                ]
+                if not batch:
+                    break
+                keys = list({key: None for key, _, _ in batch})
+                placeholders = ','.join('?' * len(keys))
+                stored = dict(connection.execute(
+                    f'SELECT key, hash FROM records WHERE key IN ({placeholders})', keys
+                ))
+                connection.executemany('INSERT OR IGNORE INTO temp.seen VALUES (?)', [(key,) for key in keys])
+                updates = []
+                for key, digest, record in batch:
+                    if stored.get(key) != digest:
+                        stored[key] = digest
+                        updates.append((key, digest))
+                        yield key, record
+                connection.executemany('INSERT OR REPLACE INTO records VALUES (?, ?)', updates)
+            
+            removed = 'SELECT key FROM records WHERE key NOT IN (SELECT key FROM temp.seen)'
+            for (key,) in connection.execute(removed).fetchall():
+                yield key, None
+            connection.execute(f'DELETE FROM records WHERE key IN ({removed})')
+            completed = True
+        finally:
+            if completed:
+                connection.commit()
+            else:
+                connection.rollback()
+    
+    def clear(self) -> None:
+        """Forget every record, so the next run reports all records as new."""
+        self._connection.execute('DELETE FROM records')
+        self._connection.commit()
+    
+    def close(self) -> None:
+        self._connection.close()
+    
+    def __enter__(self) -> 'ChangeIndex':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,178 @@
+"""
+Opt-in per-field instrumentation for compiled extraction and validation plans.
+
+Instrumentation never adds checks to the uninstrumented hot paths. Instead,
+a compiled plan is copied with each per-field function (coercer, transform)
+wrapped by Instrumentation.wrap, and the instrumented copy is used only when
+instrumentation is requested:
+
+    metrics = Instrumentation('field_extraction')
+    extract_fields(record, mapping, instrumentation=metrics)
+    metrics.as_dict()
+    write_prometheus('/var/lib/node_exporter/scrape.prom', [metrics])
+
+Per field, calls, failures and cumulative seconds are recorded. Whole
+records are recorded the same way under Instrumentation.records, so the time
+not spent in field functions (path lookups, plan overhead) is
+records.seconds minus the sum over fields. Counters are not locked; give
+each thread its own Instrumentation if exact counts matter.
+"""
+import json
+import os
+import tempfile
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable
+
+# Marker for wrap() callers without a failure sentinel
+_NO_SENTINEL = object()
+
+class Metrics:
+    """Call, failure and timing counters for one field or for whole records."""
+    
+    __slots__ = ('calls', 'failures', 'seconds')
+    
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.seconds = 0.0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {'calls': self.calls, 'failures': self.failures, 'seconds': self.seconds}
+
+class Instrumentation:
+    """
+    Per-field counters for one component (e.g. 'schema_validation').
+    
+    Attributes:
+        name: Component name, exported as the Prometheus 'component' label
+        fields: Metrics per field name, in first-seen order
+        records: Metrics for whole records
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.fields: Dict[str, Metrics] = {}
+        self.records = Metrics()
+    
+    def field(self, name: str) -> Metrics:
+        """Return the metrics for a field, creating them on first use."""
+        metrics = self.fields.get(name)
+        if metrics is None:
+            metrics = self.fields[name] = Metrics()
+        return metrics
+    
+    def wrap(
+        self,
+        name: str,
+        function: Callable[[Any], Any],
+        failed: Any = _NO_SENTINEL
+    ) -> Callable[[Any], Any]:
+        """
+        Wrap a one-argument function to record its calls for a field.
+        
+        A call counts as failed if it raises (the exception propagates) or
+        returns the failed sentinel, if one is given.
+        """
+        return self._timed(self.field(name), function, failed)
+    
+    def wrap_records(self, function: Callable[..., Any], failed: Any = _NO_SENTINEL) -> Callable[..., Any]:
+        """Wrap a per-record function to record its calls under records."""
+        return self._timed(self.records, function, failed)
+    
+    @staticmethod
+    def _timed(metrics: Metrics, function: Callable[..., Any], failed: Any) -> Callable[..., Any]:
+        clock = perf_counter
+        
+        def instrumented(*args: Any) -> Any:
+            start = clock()
+            try:
+                result = function(*args)
+            except Exception:
+                metrics.failures += 1
+                raise
+            finally:
+                metrics.calls += 1
+                metrics.seconds += clock() - start
+            if result is failed:
+                metrics.failures += 1
+            return result
+        
+        return instrumented
+    
+    def reset(self) -> None:
+        """Zero every counter, keeping the field names."""
+        for metrics in (self.records, *self.fields.values()):
+            metrics.calls = metrics.failures = 0
+            metrics.seconds = 0.0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of all counters as plain data."""
+        return {
+            'name': self.name,
+            'records': self.records.as_dict(),
+            'fields': {name: metrics.as_dict() for name, metrics in self.fields.items()},
+        }
+    
+    def to_json(self, **kwargs: Any) -> str:
+        """Snapshot of all counters as a JSON string; kwargs go to json.dumps."""
+        return json.dumps(self.as_dict(), **kwargs)
+    
+    def to_prometheus(self, prefix: str = 'scraper') -> str:
+        """Snapshot in the Prometheus text exposition format."""
+        return prometheus_text([self], prefix)
+
+# Exported counters: (metric suffix, Metrics attribute, record help, field help)
+_PROMETHEUS_COUNTERS = (
+    ('calls_total', 'calls', 'Records processed.', 'Field function calls.'),
+    ('failures_total', 'failures', 'Records that failed.', 'Failed field function calls.'),
+    ('seconds_total', 'seconds', 'Time spent processing records, in seconds.',
+     'Time spent in field functions, in seconds.'),
+)
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def prometheus_text(instrumentations: Iterable[Instrumentation], prefix: str = 'scraper') -> str:
+    """
+    Render instrumentation counters in the Prometheus text exposition format.
+    
+    Emits {prefix}_record_{calls,failures,seconds}_total per component and
+    {prefix}_field_{calls,failures,seconds}_total per component and field.
+    """
+    instrumentations = list(instrumentations)
+    lines = []
+    for scope in ('record', 'field'):
+        for suffix, attribute, record_help, field_help in _PROMETHEUS_COUNTERS:
+            metric = f"{prefix}_{scope}_{suffix}"
+            lines.append(f"# HELP {metric} {record_help if scope == 'record' else field_help}")
+            lines.append(f"# TYPE {metric} counter")
+            for instrumentation in instrumentations:
+                component = _label(instrumentation.name)
+                if scope == 'record':
+                    value = getattr(instrumentation.records, attribute)
+                    lines.append(f'{metric}{{component="{component}"}} {value}')
+                    continue
+                for name, metrics in instrumentation.fields.items():
+                    value = getattr(metrics, attribute)
+                    lines.append(f'{metric}{{component="{component}",field="{_label(name)}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(path: str, instrumentations: Iterable[Instrumentation], prefix: str = 'scraper') -> None:
+    """
+    Write a Prometheus text-format snapshot file.
+    
+    The file is written to a temporary file and renamed into place, so a
+    collector (e.g. node_exporter's textfile collector) never reads a
+    partial snapshot.
+    """
+    text = prometheus_text(instrumentations, prefix)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.prom.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,230 @@
+"""
+Memory-mapped NDJSON (JSON lines) input with a persistent line index.
+
+MappedNDJSON maps a dump into memory and indexes the byte offset of every
+record line, so records are decoded only when read and any row can be read
+without decoding the rows before it:
+
+    with MappedNDJSON('products.ndjson') as dump:
+        len(dump)                    # number of records
+        dump[1000]                   # decode one record
+        for record in dump.records(start=5000):
+            ...
+
+The index is saved next to the dump ('products.ndjson.idx' by default) and
+reused while the dump's size and modification time are unchanged. Byte
+offsets double as checkpoints: store dump.offset(row) for the next
+unprocessed row and resume with dump.records(dump.row_at(checkpoint)).
+partition() splits the rows into ranges of similar byte size for parallel
+workers, each of which opens the dump itself and reads only its range.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from stat import S_IMODE
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Sidecar index layout: header, then one signed 64-bit start offset per
+# record followed by the end offset of the last record
+_INDEX_MAGIC = b'NDJIDX01'
+_INDEX_HEADER = struct.Struct('<8sqqq')
+_WHITESPACE = b' \t\r\n'
+
+def build_index(data: Any) -> array:
+    """
+    Index the record lines of NDJSON bytes.
+    
+    Returns an array of n + 1 byte offsets for n records: record i spans
+    offsets[i] to offsets[i + 1]. Blank lines are not records; they are
+    folded into the end of the preceding record, which JSON decoding ignores.
+    """
+    offsets = array('q')
+    size = len(data)
+    find = data.find
+    whitespace = _WHITESPACE
+    start = 0
+    while start < size:
+        end = find(b'\n', start)
+        if end < 0:
+            end = size
+        if end > start and (data[start] not in whitespace or not data[start:end].isspace()):
+            offsets.append(start)
+        start = end + 1
+    offsets.append(size)
+    return offsets
+
+def _read_index(index_path: str, stat: os.stat_result) -> Optional[array]:
+    """Load a sidecar index, or None if it is missing or stale."""
+    try:
+        with open(index_path, 'rb') as f:
+            header = f.read(_INDEX_HEADER.size)
+            if len(header) != _INDEX_HEADER.size:
+                return None
+            magic, size, mtime_ns, count = _INDEX_HEADER.unpack(header)
+            if magic != _INDEX_MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                return None
+            offsets = array('q')
+            offsets.fromfile(f, count)
+    except (OSError, EOFError):
+        return None
+    return offsets
+
+def _write_index(index_path: str, offsets: array, stat: os.stat_result) -> None:
+    """Save a sidecar index atomically, so readers never see a partial index."""
+    directory = os.path.dirname(os.path.abspath(index_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.idx.tmp')
+    try:
+        # mkstemp creates the file private (0600); give the index the dump's permissions
+        os.chmod(temp_path, S_IMODE(stat.st_mode))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets)))
+            offsets.tofile(f)
+        os.replace(temp_path, index_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+class MappedNDJSON:
+    """
+    Random access to the records of an NDJSON file through mmap.
+    
+    Attributes:
+        path: Path of the NDJSON file
+        index_path: Path of the sidecar index, or None if it is not persisted
+        offsets: Record byte offsets, as returned by build_index
+    """
+    
+    def __init__(self, path: str, index_path: Optional[str] = None, persist_index: bool = True):
+        """
+        Map a file and load or build its line index.
+        
+        Args:
+            path: Path of the NDJSON file
+            index_path: Sidecar index path (defaults to path + '.idx')
+            persist_index: Save a freshly built index to index_path (if it
+                can be written); if False, the index is neither read from
+                nor written to disk
+        """
+        self.path = path
+        self.index_path = (index_path or path + '.idx') if persist_index else None
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            # mmap cannot map an empty file
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b'')
+        
+        offsets = _read_index(self.index_path, stat) if self.index_path else None
+        if offsets is None:
+            offsets = build_index(self._map if self._map is not None else b'')
+            if self.index_path:
+                try:
+                    _write_index(self.index_path, offsets, stat)
+                except OSError:
+                    # A read-only or full directory only costs rebuilding the index next time
+                    pass
+        self.offsets = offsets
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def _row(self, row: int) -> int:
+        count = len(self.offsets) - 1
+        if row < 0:
+            row += count
+        if not 0 <= row < count:
+            raise IndexError(f"row {row} out of range for {count} records")
+        return row
+    
+    def raw(self, row: int) -> memoryview:
+        """
+        Return the undecoded bytes of a record as a zero-copy memoryview.
+        
+        The view pins the mapping: release it (or use it in a with block)
+        before close(), and copy it with bytes() to keep the data longer.
+        """
+        row = self._row(row)
+        return self._view[self.offsets[row]:self.offsets[row + 1]]
+    
+    def __getitem__(self, row: int) -> Any:
+        """
+        Decode one record.
+        
+        Raises:
+            IndexError: If row is out of range
+            ValueError: If the record is not valid JSON
+        """
+        return self._decode(self._row(row))
+    
+    def _decode(self, row: int) -> Any:
+        start = self.offsets[row]
+        try:
+            # json.loads needs bytes, so only this record is copied
+            return json.loads(self._map[start:self.offsets[row + 1]])
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid JSON in record {row} at byte {start}: {e}") from e
+    
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Any]:
+        """Decode records start to stop (exclusive) one at a time."""
+        count = len(self.offsets) - 1
+        stop = count if stop is None else min(stop, count)
+        decode = self._decode
+        for row in range(max(start, 0), stop):
+            yield decode(row)
+    
+    def __iter__(self) -> Iterator[Any]:
+        return self.records()
+    
+    def offset(self, row: int) -> int:
+        """Byte offset where a row starts; offset(len(self)) is the end of the last record."""
+        if not 0 <= row < len(self.offsets):
+            raise IndexError(f"row {row} out of range for {len(self)} records")
+        return self.offsets[row]
+    
+    def row_at(self, offset: int) -> int:
+        """
+        First row starting at or after a byte offset.
+        
+        Used to resume from a checkpoint saved with offset(); an offset in
+        the middle of a record resumes at the next record.
+        """
+        return bisect_left(self.offsets, offset, 0, len(self.offsets) - 1)
+    
+    def partition(self, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the rows into up to parts (start, stop) ranges of similar byte size.
+        
+        Empty ranges are dropped, so fewer ranges are returned for files
+        with fewer records than parts.
+        """
+        if parts < 1:
+            raise ValueError("parts must be at least 1")
+        offsets = self.offsets
+        count = len(offsets) - 1
+        first, total = offsets[0], offsets[-1] - offsets[0]
+        bounds = [0]
+        for part in range(1, parts):
+            bounds.append(max(bounds[-1], self.row_at(first + total * part // parts)))
+        bounds.append(count)
+        return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+    
+    def close(self) -> None:
+        """
+        Release the mapping.
+        
+        Raises:
+            BufferError: If views returned by raw() are still alive
+        """
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+    
+    def __enter__(self) -> 'MappedNDJSON':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,168 @@
+"""
+Projection-aware JSON decoding.
+
+Scraped documents often carry large values (rendered HTML, descriptions,
+tracking blobs) that an extraction never reads. loads_projected decodes
+only the keys named by a projection and skips the rest; skipped strings,
+the bulk of HTML-in-JSON documents, are never decoded or copied:
+
+    projection = build_projection([('product', 'name'), ('product', 'price')])
+    loads_projected(document_bytes, projection)
+    # {'product': {'name': ..., 'price': ...}}
+
+Requested values are decoded by the standard library's C decoder; only the
+objects on projected paths are walked in Python. Skipped arrays and objects
+are also decoded in C and dropped, since scanning them token by token in
+Python is slower than decoding them. Small documents, and projections that
+need the whole document, go straight to json.loads, which is faster there.
+"""
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
+
+# Documents shorter than this are decoded with json.loads: below it, walking
+# the structure in Python costs more than decoding everything in C
+MIN_PROJECTED_SIZE = 16 * 1024
+
+# A projection maps object keys to a nested projection, or to None to decode
+# the whole value; a None projection decodes the whole document
+Projection = Optional[Dict[str, Any]]
+
+# Quotes looked up with str.find before a string is handed to scanstring:
+# a find from Python costs about as much as scanning a few hundred
+# characters in C, so only strings with few escaped quotes gain from it
+_MAX_QUOTE_FINDS = 4
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SCALAR = re.compile(r'[^,\]}\s]+')
+_raw_decode = json.JSONDecoder().raw_decode
+
+def build_projection(paths: Iterable[Sequence[Any]]) -> Projection:
+    """
+    Build a projection from key paths.
+    
+    Each path is a sequence of steps; leading str steps are object keys and
+    the first other step (a list index, wildcard, ...) ends the projected
+    part, so the value reached there is decoded whole. An empty path, or a
+    path starting with a non-key step, needs the whole document and makes
+    the projection None.
+    """
+    root: Dict[str, Any] = {}
+    for path in paths:
+        keys = []
+        for step in path:
+            if step.__class__ is not str:
+                break
+            keys.append(step)
+        if not keys:
+            return None
+        node = root
+        for key in keys[:-1]:
+            child = node.get(key, ...)
+            if child is None:
+                break
+            if child is ...:
+                child = node[key] = {}
+            node = child
+        else:
+            node[keys[-1]] = None
+    return root
+
+def _error(message: str, document: str, position: int) -> json.JSONDecodeError:
+    return json.JSONDecodeError(message, document, position)
+
+def _skip(document: str, position: int) -> int:
+    """Return the end of the JSON value starting at position."""
+    char = document[position:position + 1]
+    if char == '"':
+        # Find the closing quote directly, stepping over quotes escaped by an
+        # odd run of backslashes; strings dense with escaped quotes go to the
+        # C string scanner, which is faster than many finds from Python
+        end = document.find('"', position + 1)
+        for _ in range(_MAX_QUOTE_FINDS):
+            if end < 0:
+                raise _error("Unterminated string", document, position)
+            backslash = end - 1
+            while document[backslash] == '\\':
+                backslash -= 1
+            if (end - backslash) % 2:
+                return end + 1
+            end = document.find('"', end + 1)
+        return scanstring(document, position + 1)[1]
+    if char == '{' or char == '[':
+        # Scanning containers in Python is several times slower than letting
+        # the C decoder build and drop them
+        return _raw_decode(document, position)[1]
+    match = _SCALAR.match(document, position)
+    if match is None:
+        raise _error("Expecting value", document, position)
+    return match.end()
+
+def _decode(document: str, position: int, projection: Projection) -> Any:
+    """Decode the value at position under a projection, returning (value, end)."""
+    if projection is None:
+        return _raw_decode(document, position)
+    if document[position:position + 1] != '{':
+        # Only objects have keys to project; anything else matches nothing
+        return None, _skip(document, position)
+    
+    result = {}
+    whitespace = _WHITESPACE.match
+    position = whitespace(document, position + 1).end()
+    if document[position:position + 1] == '}':
+        return result, position + 1
+    while True:
+        if document[position:position + 1] != '"':
+            raise _error("Expecting property name enclosed in double quotes", document, position)
+        key, position = scanstring(document, position + 1)
+        position = whitespace(document, position).end()
+        if document[position:position + 1] != ':':
+            raise _error("Expecting ':' delimiter", document, position)
+        position = whitespace(document, position + 1).end()
+        if key in projection:
+            result[key], position = _decode(document, position, projection[key])
+        else:
+            position = _skip(document, position)
+        position = whitespace(document, position).end()
+        char = document[position:position + 1]
+        if char == '}':
+            return result, position + 1
+        if char != ',':
+            raise _error("Expecting ',' delimiter", document, position)
+        position = whitespace(document, position + 1).end()
+
+def loads_projected(
+    document: Union[str, bytes, bytearray, memoryview],
+    projection: Projection,
+    min_size: int = MIN_PROJECTED_SIZE
+) -> Any:
+    """
+    Decode the parts of a JSON document selected by a projection.
+    
+    Objects on projected paths contain only the projected keys that are
+    present; a non-object where the projection expects an object decodes
+    as None. Skipped values are scanned for their end but not validated.
+    Documents shorter than min_size characters, and None projections, are
+    decoded in full with json.loads.
+    
+    Args:
+        document: JSON text, or UTF-8 encoded JSON bytes (with or without a BOM)
+        projection: As returned by build_projection
+        min_size: Smallest document decoded with the projection
+    
+    Raises:
+        json.JSONDecodeError: If the decoded parts of the document are malformed
+    """
+    if not isinstance(document, str):
+        # utf-8-sig drops a leading byte order mark, as json.loads does for bytes
+        document = str(document, 'utf-8-sig')
+    if projection is None or len(document) < min_size:
+        return json.loads(document)
+    
+    position = _WHITESPACE.match(document).end()
+    value, end = _decode(document, position, projection)
+    end = _WHITESPACE.match(document, end).end()
+    if end != len(document):
+        raise _error("Extra data", document, end)
+    return value
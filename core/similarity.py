@@ -0,0 +1,209 @@
+"""
+MinHash signatures and LSH banding for near-duplicate detection.
+
+Listings of one item scraped from several sources rarely match exactly
+("Sony WH-1000XM5 Headphones" vs "Sony WH1000XM5 headphones"). MinHash
+turns a set of tokens into a short signature whose agreement with another
+signature estimates the Jaccard similarity of the two sets, and LSHIndex
+buckets signatures by bands so that only likely matches are compared:
+
+    hasher = MinHasher()
+    index = LSHIndex(threshold=0.8)
+    for key, name in names:
+        tokens = tokenize(name)
+        for candidate in index.query(hasher.signature(tokens)):
+            ...  # verify, e.g. with jaccard(tokens, tokens_of[candidate])
+        index.add(key, hasher.signature(tokens))
+
+Product names are short, so signatures are built from word tokens
+(tokenize) rather than character n-grams, and catalogs reuse a limited
+vocabulary, so MinHasher caches the num_perm hash values of each token:
+a signature is then a column-wise min over a handful of cached vectors.
+One-permutation hashing, which hashes each token once, was not used: on
+sets this small its densified bins change wholesale when one token is
+added, and LSH misses most near duplicates. Token hashes are CRC-32 based
+and the hash functions are seeded, so signatures are deterministic across
+processes and runs.
+"""
+import re
+from functools import lru_cache
+from random import Random
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+from zlib import crc32
+
+DEFAULT_NUM_PERM = 64
+
+# Hash functions are (a * x + b) mod a Mersenne prime, a universal family
+_PRIME = (1 << 61) - 1
+# Runs of letters or digits, so '256GB' and '256 GB' give the same tokens
+_TOKEN = re.compile(r'[^\W\d_]+|\d+')
+
+Signature = Tuple[int, ...]
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Return the set of words and numbers in text, ignoring case and punctuation.
+    
+    Letters and digits are split apart, so 'WH-1000XM5' and 'wh1000xm5'
+    both give {'wh', '1000', 'xm', '5'}.
+    """
+    return set(_TOKEN.findall(text.casefold()))
+
+def jaccard(first: Set[Hashable], second: Set[Hashable]) -> float:
+    """Return the Jaccard similarity of two sets (1.0 for two empty sets)."""
+    if not first and not second:
+        return 1.0
+    common = len(first & second)
+    return common / (len(first) + len(second) - common)
+
+class MinHasher:
+    """
+    Computes MinHash signatures of token sets.
+    
+    Attributes:
+        num_perm: Signature length; longer signatures give more accurate estimates
+        seed: Seed of the hash functions; only signatures from the same
+            num_perm and seed are comparable
+        maxsize: Number of token hash vectors cached (about 40 * num_perm
+            bytes each)
+    """
+    
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1, maxsize: int = 4096):
+        if num_perm < 1:
+            raise ValueError("num_perm must be at least 1")
+        self.num_perm = num_perm
+        self.seed = seed
+        self.maxsize = maxsize
+        random = Random(seed)
+        self._functions = [(random.randrange(1, _PRIME), random.randrange(_PRIME)) for _ in range(num_perm)]
+        self._token_hashes = lru_cache(maxsize=maxsize)(self._hash_token)
+    
+    def _hash_token(self, token: str) -> Signature:
+        """Return the num_perm hash values of a token."""
+        value = crc32(token.encode())
+        # A tuple rather than an array('q'): the min over columns runs about
+        # half again faster without boxing the items
+        return tuple([(a * value + b) % _PRIME for a, b in self._functions])
+    
+    def signature(self, tokens: Iterable[str]) -> Signature:
+        """
+        Return the signature of a set of tokens.
+        
+        An empty token set has a signature of _PRIME values, which matches
+        only other empty sets.
+        """
+        vectors = [self._token_hashes(token) for token in tokens]
+        if not vectors:
+            return (_PRIME,) * self.num_perm
+        if len(vectors) == 1:
+            return vectors[0]
+        # Minimum over the tokens, one hash function per column
+        return tuple(map(min, *vectors))
+
+def estimate_similarity(first: Signature, second: Signature) -> float:
+    """Estimate the Jaccard similarity of two token sets from their signatures."""
+    if len(first) != len(second):
+        raise ValueError("Signatures have different lengths")
+    if not first:
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+def lsh_bands(num_perm: int, threshold: float, recall: float = 0.95) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) for an LSH index.
+    
+    Two signatures become candidates when all rows of at least one band
+    agree, which happens with probability 1 - (1 - s**rows)**bands for
+    similarity s. The most rows (so the fewest dissimilar candidates) are
+    chosen for which a pair exactly at threshold is still a candidate with
+    probability recall; more similar pairs are found more often.
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be in (0, 1]")
+    best = (num_perm, 1)
+    for rows in range(2, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands < recall:
+            break
+        best = (bands, rows)
+    return best
+
+class LSHIndex:
+    """
+    Signatures bucketed by band for finding likely near-duplicates.
+    
+    Attributes:
+        num_perm: Length of the signatures stored
+        threshold: Similarity the banding is tuned for (see lsh_bands)
+        max_bucket: Buckets holding more keys than this are skipped by
+            query, or None to never skip. A band value shared by that many
+            signatures comes from tokens common to most of the index, and
+            returning its bucket would make each query scan the index
+        bands: Number of bands per signature
+        rows: Signature values per band
+    """
+    
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, threshold: float = 0.8, max_bucket: Optional[int] = None):
+        self.num_perm = num_perm
+        self.threshold = threshold
+        self.max_bucket = max_bucket
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self._buckets: List[Dict[Signature, Set[Hashable]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[Hashable, Signature] = {}
+    
+    def _band_keys(self, signature: Signature) -> Iterator[Tuple[Dict[Signature, Set[Hashable]], Signature]]:
+        if len(signature) != self.num_perm:
+            raise ValueError(f"Expected a signature of length {self.num_perm}, got {len(signature)}")
+        rows = self.rows
+        for band, buckets in enumerate(self._buckets):
+            yield buckets, signature[band * rows:(band + 1) * rows]
+    
+    def add(self, key: Hashable, signature: Signature) -> None:
+        """
+        Index a signature under key.
+        
+        Raises:
+            KeyError: If key is already indexed
+        """
+        if key in self._signatures:
+            raise KeyError(key)
+        self._signatures[key] = signature
+        for buckets, band in self._band_keys(signature):
+            bucket = buckets.get(band)
+            if bucket is None:
+                buckets[band] = {key}
+            else:
+                bucket.add(key)
+    
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove a key from the index.
+        
+        Raises:
+            KeyError: If key is not indexed
+        """
+        signature = self._signatures.pop(key)
+        for buckets, band in self._band_keys(signature):
+            bucket = buckets[band]
+            bucket.discard(key)
+            if not bucket:
+                del buckets[band]
+    
+    def query(self, signature: Signature) -> Set[Hashable]:
+        """Return the keys sharing at least one band with signature, skipping oversized buckets."""
+        max_bucket = self.max_bucket
+        candidates: Set[Hashable] = set()
+        for buckets, band in self._band_keys(signature):
+            bucket = buckets.get(band)
+            if bucket and (max_bucket is None or len(bucket) <= max_bucket):
+                candidates |= bucket
+        return candidates
+    
+    def __getitem__(self, key: Hashable) -> Signature:
+        return self._signatures[key]
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
@@ -0,0 +1,345 @@
+"""
+Reusable data transformation utilities.
+
+The main entry point is Pipeline, a lazily evaluated chain of record
+transformations:
+
+    pipeline = (
+        Pipeline()
+        .extract({"name": ["name", "product.name"], "price": "pricing.amount"})
+        .coerce({"price": float}, defaults={"price": 0.0})
+        .filter(lambda record: record["price"] > 0)
+    )
+    for record in pipeline.run(records):
+        ...
+
+Builder methods return a new Pipeline, so a common prefix can be shared by
+several pipelines. Nothing runs until run() or collect() is called.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from copy import copy
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence,
+    Tuple, Union,
+)
+
+# Kinds of pipeline stage. Consecutive per-record stages (map, filter) are
+# fused into a single pass; stream stages see the whole record iterator.
+_MAP = 'map'
+_FILTER = 'filter'
+_STREAM = 'stream'
+
+@lru_cache(maxsize=1024)
+def split_path(path: str) -> Tuple[str, ...]:
+    """
+    Split a dot-separated path into lookup keys.
+    
+    Segments are kept as strings: an integer segment (e.g. the "0" in
+    "items.0.name") indexes into lists, but is still a string key for
+    dicts, since JSON object keys such as {"2024": ...} are always strings.
+    
+    Raises:
+        ValueError: If the path is empty or has an empty segment
+    """
+    if not isinstance(path, str) or not path:
+        raise ValueError(f"Invalid path: {path!r}")
+    keys = tuple(path.split('.'))
+    if '' in keys:
+        raise ValueError(f"Invalid path: {path!r}")
+    return keys
+
+@lru_cache(maxsize=1024)
+def _list_index(key: str) -> Optional[int]:
+    """Return a path segment as a list index, or None if it is not an integer."""
+    digits = key[1:] if key[:1] == '-' else key
+    return int(key) if digits.isdecimal() and digits.isascii() else None
+
+def lookup(data: Any, keys: Tuple[str, ...]) -> Any:
+    """
+    Follow keys from split_path through nested dicts and lists; None if absent.
+    
+    Keys are dict keys as-is and list indexes when they are integers
+    (negative ones count from the end). The per-record counterpart of
+    get_path for hot loops: split paths once and look them up for every
+    record.
+    """
+    current = data
+    for key in keys:
+        if isinstance(current, dict):
+            current = current.get(key)
+        elif isinstance(current, (list, tuple)):
+            index = _list_index(key)
+            if index is None or not -len(current) <= index < len(current):
+                return None
+            current = current[index]
+        else:
+            return None
+        if current is None:
+            return None
+    return current
+
+def get_path(data: Any, path: str, default: Any = None) -> Any:
+    """
+    Safely read a nested value by dot-separated path.
+    
+    Args:
+        data: Nested dicts and lists
+        path: Dot-separated path, e.g. "user.address.city" or "items.0.sku"
+        default: Returned when any part of the path is missing or None
+    
+    Returns:
+        The value at path, or default
+    
+    Raises:
+        ValueError: If path format is invalid
+    """
+    value = lookup(data, split_path(path))
+    return default if value is None else value
+
+class Pipeline:
+    """
+    A composable, lazily evaluated chain of record transformations.
+    
+    Stages are added with extract, coerce, map and filter (per-record) and
+    batch and limit (whole-stream). When run, each run of consecutive
+    per-record stages is fused into one generator that applies them all to
+    a record before moving to the next, rather than chaining one generator
+    per stage. Records are pulled through one at a time, so pipelines work
+    on unbounded streams; only collect() materializes a list.
+    """
+    
+    def __init__(self, stages: Tuple[Tuple[str, Any], ...] = ()):
+        self.stages = stages
+    
+    def _then(self, kind: str, function: Any) -> 'Pipeline':
+        return Pipeline(self.stages + ((kind, function),))
+    
+    def map(self, function: Callable[[Any], Any]) -> 'Pipeline':
+        """Replace each record with function(record)."""
+        return self._then(_MAP, function)
+    
+    def filter(self, predicate: Callable[[Any], Any]) -> 'Pipeline':
+        """Keep only the records for which predicate(record) is truthy."""
+        return self._then(_FILTER, predicate)
+    
+    def extract(
+        self,
+        fields: Mapping[str, Union[str, Sequence[str]]],
+        defaults: Optional[Mapping[str, Any]] = None,
+        fallback_on: str = 'none'
+    ) -> 'Pipeline':
+        """
+        Replace each record with a flat dict of values read by path.
+        
+        Args:
+            fields: Output field name to a dot-separated path, or to a list
+                of candidate paths tried in order
+            defaults: Values for fields none of whose paths has a value;
+                fields without a default are None
+            fallback_on: 'none' to try the next path when a value is None
+                (or missing), or 'falsy' to also skip '', 0, [] and other
+                falsy values, as a chain of `or` expressions does
+        
+        Raises:
+            ValueError: If a path format or fallback_on is invalid
+        """
+        if fallback_on not in ('none', 'falsy'):
+            raise ValueError(f"fallback_on must be 'none' or 'falsy', got {fallback_on!r}")
+        falsy = fallback_on == 'falsy'
+        defaults = defaults or {}
+        compiled = tuple(
+            (
+                output_field,
+                tuple(split_path(path) for path in ([paths] if isinstance(paths, str) else paths)),
+                defaults.get(output_field),
+            )
+            for output_field, paths in fields.items()
+        )
+        
+        def extract_record(record: Any) -> Dict[str, Any]:
+            result = {}
+            for output_field, candidates, default in compiled:
+                for keys in candidates:
+                    value = lookup(record, keys)
+                    if value if falsy else value is not None:
+                        break
+                else:
+                    # No path has a usable value (only falsy ones, in falsy mode)
+                    value = None
+                result[output_field] = copy(default) if value is None else value
+            return result
+        
+        return self.map(extract_record)
+    
+    def coerce(
+        self,
+        conversions: Mapping[str, Callable[[Any], Any]],
+        defaults: Optional[Mapping[str, Any]] = None
+    ) -> 'Pipeline':
+        """
+        Convert dict fields in place, falling back to defaults.
+        
+        Each field that is present and not None is passed through its
+        conversion. Fields that are None, and fields whose conversion
+        raises, are set to their default (None if no default is given);
+        missing fields are left missing.
+        """
+        defaults = defaults or {}
+        compiled = tuple(
+            (output_field, convert, defaults.get(output_field))
+            for output_field, convert in conversions.items()
+        )
+        
+        def coerce_record(record: Dict[str, Any]) -> Dict[str, Any]:
+            for output_field, convert, default in compiled:
+                if output_field not in record:
+                    continue
+                value = record[output_field]
+                if value is not None:
+                    try:
+                        record[output_field] = convert(value)
+                        continue
+                    except Exception:
+                        pass
+                record[output_field] = copy(default)
+            return record
+        
+        return self.map(coerce_record)
+    
+    def batch(self, size: int) -> 'Pipeline':
+        """Group records into lists of up to size records."""
+        if size < 1:
+            raise ValueError("batch size must be at least 1")
+        
+        def batches(records: Iterator[Any]) -> Iterator[List[Any]]:
+            while True:
+                chunk = list(islice(records, size))
+                if not chunk:
+                    return
+                yield chunk
+        
+        return self._then(_STREAM, batches)
+    
+    def limit(self, count: int) -> 'Pipeline':
+        """Stop after count records."""
+        return self._then(_STREAM, lambda records: islice(records, count))
+    
+    def _fused(self) -> Tuple[Tuple[str, Any], ...]:
+        """Group consecutive per-record stages into single fused steps."""
+        fused: List[Tuple[str, Any]] = []
+        steps: List[Tuple[bool, Callable]] = []
+        for kind, function in self.stages:
+            if kind == _STREAM:
+                if steps:
+                    fused.append((_MAP, tuple(steps)))
+                    steps = []
+                fused.append((_STREAM, function))
+            else:
+                steps.append((kind == _FILTER, function))
+        if steps:
+            fused.append((_MAP, tuple(steps)))
+        return tuple(fused)
+    
+    def run(self, records: Iterable[Any]) -> Iterator[Any]:
+        """Lazily apply the pipeline to records."""
+        stream: Iterator[Any] = iter(records)
+        for kind, function in self._fused():
+            if kind == _STREAM:
+                stream = iter(function(stream))
+            elif len(function) == 1 and not function[0][0]:
+                stream = map(function[0][1], stream)
+            else:
+                stream = _apply_steps(stream, function)
+        return stream
+    
+    __call__ = run
+    
+    def collect(self, records: Iterable[Any]) -> List[Any]:
+        """Apply the pipeline and return all results as a list."""
+        return list(self.run(records))
+    
+    def __repr__(self) -> str:
+        names = ', '.join(kind for kind, _ in self.stages)
+        return f"Pipeline([{names}])"
+
+def _apply_steps(records: Iterator[Any], steps: Tuple[Tuple[bool, Callable], ...]) -> Iterator[Any]:
+    """Apply fused (is_filter, function) steps to each record in one pass."""
+    for record in records:
+        for is_filter, function in steps:
+            if is_filter:
+                if not function(record):
+                    break
+            else:
+                record = function(record)
+        else:
+            yield record
+
+async def _batches(records: Union[AsyncIterable[Any], Iterable[Any]], size: int) -> AsyncIterator[List[Any]]:
+    """Group an async or plain iterable into lists of up to size records."""
+    batch: List[Any] = []
+    if hasattr(records, '__aiter__'):
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for record in records:
+            batch.append(record)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+async def map_batches(
+    records: Union[AsyncIterable[Any], Iterable[Any]],
+    function: Callable[[List[Any]], Any],
+    batch_size: int = 500,
+    executor: Optional[Executor] = None,
+    max_pending: int = 2
+) -> AsyncIterator[Any]:
+    """
+    Apply a batch function to micro-batches of a record stream, from asyncio.
+    
+    Records are pulled from records (an async iterator such as an aiohttp
+    response reader, or any plain iterable) into lists of batch_size, and
+    function(batch) is yielded for each batch, in input order.
+    
+    Without an executor each batch runs on the event loop, which is given
+    control back between batches so other tasks (e.g. network reads) are
+    not stalled for longer than one batch. With an executor, batches run in
+    its threads or processes while the next batches are read; at most
+    max_pending batches are in flight. For process pools, function and the
+    records must be picklable.
+    
+    Raises:
+        ValueError: If batch_size or max_pending is less than 1
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+    
+    if executor is None:
+        async for batch in _batches(records, batch_size):
+            yield function(batch)
+            await asyncio.sleep(0)
+        return
+    
+    loop = asyncio.get_running_loop()
+    pending: deque = deque()
+    try:
+        async for batch in _batches(records, batch_size):
+            pending.append(loop.run_in_executor(executor, function, batch))
+            if len(pending) >= max_pending:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
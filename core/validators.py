@@ -0,0 +1,338 @@
+"""
+Common validation patterns.
+
+The core of this module is CoercerRegistry, a table of coercion functions
+keyed by (source type, target type). Looking up how to convert a value is a
+single dict access on (type(value), target), resolved through the source
+type's MRO the first time a pair is seen and cached afterwards, instead of a
+chain of isinstance checks per value.
+
+default_registry holds the coercions shared by the challenge solutions:
+
+    from core.validators import default_registry
+    
+    default_registry.coerce("15", int)          # 15
+    default_registry.coerce("1,299.99", Money)  # Money(Decimal('1299.99'), None)
+    
+    @default_registry.register(str, Version)
+    def parse_version(value):
+        return Version(*map(int, value.split(".")))
+"""
+import sys
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type, Union
+
+# Returned by coercers (and CoercerRegistry.coercer_for) when a value cannot
+# be converted, so hot loops can reject values without raising
+INVALID = object()
+
+# Exceptions that coercers may raise to signal an unconvertible value.
+# ArithmeticError covers decimal.InvalidOperation and float overflow.
+COERCION_FAILURES = (ValueError, TypeError, ArithmeticError)
+
+NoneType = type(None)
+
+class CoercionError(ValueError):
+    """
+    Raised when a value cannot be coerced to a target type.
+    
+    Attributes:
+        value: The value that failed to convert
+        target_type: The type it was being converted to
+    """
+    
+    def __init__(self, value: Any, target_type: Type):
+        super().__init__(f"Cannot convert {value!r} to {target_type.__name__}")
+        self.value = value
+        self.target_type = target_type
+
+def _identity(value: Any) -> Any:
+    return value
+
+def _unsupported(value: Any) -> Any:
+    return INVALID
+
+class CoercerRegistry:
+    """
+    Coercion functions keyed by (source type, target type).
+    
+    A coercer takes a value and returns it converted, or signals failure by
+    raising ValueError, TypeError or ArithmeticError or by returning
+    INVALID. Values whose type is exactly the target are returned as-is;
+    otherwise, for a (source, target) pair the registry uses, in order:
+        1. a coercer registered for exactly (source, target)
+        2. no conversion at all if source is a subclass of target
+        3. a coercer registered for a base class of source, in MRO order
+           (coercers registered for object apply to any source except None)
+        4. for Enum targets, enum_coercer(target)
+    Resolved pairs are cached per target type; registering a coercer clears
+    the cache.
+    """
+    
+    def __init__(self):
+        self._coercers: Dict[Tuple[type, type], Callable[[Any], Any]] = {}
+        self._tables: Dict[type, Dict[type, Callable[[Any], Any]]] = {}
+    
+    def register(
+        self,
+        source: Union[type, Tuple[type, ...]],
+        target: type,
+        coercer: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        Register a coercer from source type(s) to target.
+        
+        Can be called directly or used as a decorator when coercer is
+        omitted. Registering for object makes the coercer a fallback for
+        every source type without a more specific entry.
+        """
+        if coercer is None:
+            def decorator(function: Callable[[Any], Any]) -> Callable[[Any], Any]:
+                self.register(source, target, function)
+                return function
+            return decorator
+        
+        for source_type in (source if isinstance(source, tuple) else (source,)):
+            self._coercers[(source_type, target)] = coercer
+        for table in self._tables.values():
+            table.clear()
+        return coercer
+    
+    def _resolve(self, source: type, target: type) -> Callable[[Any], Any]:
+        """Find the coercer for a pair, without the cache."""
+        coercers = self._coercers
+        coercer = coercers.get((source, target))
+        if coercer is not None and source is not target:
+            return coercer
+        if issubclass(source, target):
+            return _identity
+        for base in (source.__mro__[1:] if source is not NoneType else ()):
+            coercer = coercers.get((base, target))
+            if coercer is not None:
+                return coercer
+        if isinstance(target, type) and issubclass(target, Enum) and source is not NoneType:
+            return enum_coercer(target)
+        return _unsupported
+    
+    def _table(self, target: type) -> Dict[type, Callable[[Any], Any]]:
+        table = self._tables.get(target)
+        if table is None:
+            table = self._tables[target] = {}
+        return table
+    
+    def lookup(self, source: type, target: type) -> Optional[Callable[[Any], Any]]:
+        """Return the coercer used for a (source, target) pair, or None."""
+        table = self._table(target)
+        coercer = table.get(source)
+        if coercer is None:
+            coercer = table[source] = self._resolve(source, target)
+        return None if coercer is _unsupported else coercer
+    
+    def coercer_for(self, target: type) -> Callable[[Any], Any]:
+        """
+        Return a function converting any value to target, or returning INVALID.
+        
+        The function dispatches on the value's exact type through a per-target
+        table, so it is suited to hot loops such as batch validation.
+        """
+        table = self._table(target)
+        resolve = self._resolve
+        identity = _identity
+        failures = COERCION_FAILURES
+        
+        def coerce(value: Any) -> Any:
+            if value.__class__ is target:
+                return value
+            try:
+                convert = table[value.__class__]
+            except KeyError:
+                convert = table[value.__class__] = resolve(value.__class__, target)
+            if convert is identity:
+                return value
+            try:
+                return convert(value)
+            except failures:
+                return INVALID
+        
+        return coerce
+    
+    def converter_for(self, target: type) -> Callable[[Any], Any]:
+        """
+        Return a function converting any value to target, or raising CoercionError.
+        
+        Same dispatch as coercer_for, for callers that expect conversions to
+        raise on bad input (CoercionError is a ValueError).
+        """
+        coerce = self.coercer_for(target)
+        
+        def convert(value: Any) -> Any:
+            converted = coerce(value)
+            if converted is INVALID:
+                raise CoercionError(value, target)
+            return converted
+        
+        return convert
+    
+    def supports(self, target: type) -> bool:
+        """Whether any coercer targets this type (Enum types always qualify)."""
+        if isinstance(target, type) and issubclass(target, Enum):
+            return True
+        return any(registered is target for _, registered in self._coercers)
+    
+    def coerce(self, value: Any, target: type) -> Any:
+        """
+        Convert a single value to target.
+        
+        Raises:
+            CoercionError: If no coercer applies or the coercer rejects the value
+        """
+        coercer = self.lookup(value.__class__, target)
+        if coercer is not None:
+            try:
+                converted = coercer(value)
+            except COERCION_FAILURES:
+                converted = INVALID
+            if converted is not INVALID:
+                return converted
+        raise CoercionError(value, target)
+    
+    def copy(self) -> 'CoercerRegistry':
+        """Return an independent registry with the same coercers."""
+        registry = CoercerRegistry()
+        registry._coercers = dict(self._coercers)
+        return registry
+
+# Accepted string spellings for boolean coercion
+TRUE_STRINGS = frozenset(('true', '1', 'yes'))
+FALSE_STRINGS = frozenset(('false', '0', 'no'))
+
+def parse_bool(value: str) -> bool:
+    """Parse 'true'/'false', '1'/'0' or 'yes'/'no' in any case."""
+    value = value.lower()
+    if value in TRUE_STRINGS:
+        return True
+    if value in FALSE_STRINGS:
+        return False
+    raise ValueError(f"Cannot convert '{value}' to boolean")
+
+def split_list(value: str) -> list:
+    """Split a comma-separated string into stripped items ('' gives [])."""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(',')]
+
+def to_list(value: Any) -> list:
+    """Convert any iterable to a list."""
+    if not hasattr(value, '__iter__'):
+        raise TypeError(f"Cannot convert '{value}' to list")
+    return list(value)
+
+def parse_decimal(value: Any) -> Decimal:
+    """Convert a string or number to Decimal; floats go through repr to avoid binary noise."""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, str):
+        value = value.strip()
+    return Decimal(value)
+
+def parse_datetime(value: Any) -> datetime:
+    """
+    Convert an ISO 8601 string or a Unix timestamp to datetime.
+    
+    Timestamps are interpreted as UTC. A trailing 'Z' is accepted on all
+    supported Python versions.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if value.endswith(('Z', 'z')) and sys.version_info < (3, 11):
+            value = value[:-1] + '+00:00'
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+def parse_date(value: str) -> date:
+    """Convert an ISO 8601 date string ('2024-01-31') to date."""
+    return date.fromisoformat(value.strip())
+
+class Money(NamedTuple):
+    """A monetary amount with an optional ISO 4217 currency code."""
+    amount: Decimal
+    currency: Optional[str] = None
+
+# Currency symbols recognized by parse_money
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', '¥': 'JPY', '₹': 'INR'}
+
+def _parse_amount(text: str) -> Decimal:
+    """Parse an amount with either ',' or '.' as the decimal separator."""
+    if ',' in text and '.' in text:
+        # The later separator is the decimal point: 1,299.99 or 1.299,99
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        # A single comma followed by one or two digits is a decimal comma
+        whole, _, fraction = text.rpartition(',')
+        if text.count(',') == 1 and len(fraction) in (1, 2):
+            text = f"{whole}.{fraction}"
+        else:
+            text = text.replace(',', '')
+    return Decimal(text)
+
+def parse_money(value: Any) -> Money:
+    """
+    Convert a price string such as '$1,299.99', '49.50 USD' or '9,99 €' to Money.
+    
+    Numbers are converted to Money with no currency.
+    """
+    if not isinstance(value, str):
+        return Money(parse_decimal(value))
+    text = value.strip()
+    currency = None
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            currency = code
+            text = text.replace(symbol, '')
+            break
+    parts = text.split()
+    codes = [part for part in parts if part.isalpha()]
+    if len(codes) > 1 or (codes and currency is not None and codes[0].upper() != currency):
+        raise ValueError(f"Cannot convert '{value}' to Money")
+    if codes:
+        currency = codes[0].upper()
+    text = ''.join(part for part in parts if not part.isalpha())
+    sign = -1 if text.startswith('-') else 1
+    amount = _parse_amount(text.lstrip('+-'))
+    return Money(amount * sign, currency)
+
+def enum_coercer(enum_type: Type[Enum]) -> Callable[[Any], Enum]:
+    """Build a coercer accepting an enum member's value or its name (any case)."""
+    names = {name.lower(): member for name, member in enum_type.__members__.items()}
+    
+    def coerce(value: Any) -> Enum:
+        try:
+            return enum_type(value)
+        except ValueError:
+            if isinstance(value, str) and value.lower() in names:
+                return names[value.lower()]
+            raise
+    
+    return coerce
+
+def register_defaults(registry: CoercerRegistry) -> CoercerRegistry:
+    """Register the standard coercions used by default_registry."""
+    registry.register(object, int, int)
+    registry.register(object, float, float)
+    registry.register(object, str, str)
+    registry.register(str, bool, parse_bool)
+    registry.register(str, list, split_list)
+    registry.register(object, list, to_list)
+    registry.register((str, int, float), Decimal, parse_decimal)
+    registry.register((str, int, float), datetime, parse_datetime)
+    registry.register(str, date, parse_date)
+    registry.register((str, int, float, Decimal), Money, parse_money)
+    return registry
+
+# Process-wide registry shared by the challenge solutions
+default_registry = register_defaults(CoercerRegistry())
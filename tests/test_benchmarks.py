@@ -0,0 +1,64 @@
+import copy
+
+import pytest
+
+from benchmarks import generators
+from benchmarks.runner import compare, percentile, run
+
+def test_generators_are_deterministic():
+    assert generators.generate_products(50, seed=3) == generators.generate_products(50, seed=3)
+    assert generators.generate_schema_records(20, seed=1) != generators.generate_schema_records(20, seed=2)
+
+def test_error_rate_and_shape_mix():
+    products = generators.generate_products(200, error_rate=1.0, shape_mix={"flat": 1})
+
+    assert all(product["pricing"]["amount"] == "invalid" for product in products)
+    assert all(generators.generate_schema_records(10, error_rate=0.0)[i]["id"] == str(i) for i in range(10))
+    with pytest.raises(ValueError):
+        generators.generate_products(1, shape_mix={"xml": 1})
+
+def test_nested_depth():
+    record = generators.generate_extraction_records(1, depth=3)[0]
+    path, _ = generators.extraction_mapping(depth=3)["deep"]
+
+    assert path == "meta.child.child.child.source"
+    assert record["meta"]["child"]["child"]["child"]["source"] == "api"
+
+def test_run_report():
+    report = run(count=20, repeat=1)
+
+    assert set(report["results"]) == {
+        "schema_validation.validate",
+        "schema_validation.validate_many_flat",
+        "data_transformation.normalize_product_data",
+        "data_transformation.dedupe_products",
+        "field_extraction.extract_fields",
+        "field_extraction.extract_fields_json",
+    }
+    for result in report["results"].values():
+        assert result["records"] == 20
+        assert result["records_per_sec"] > 0
+        assert result["latency_us"]["p50"] <= result["latency_us"]["p99"] <= result["latency_us"]["max"]
+        assert result["peak_memory_bytes"] > 0
+    with pytest.raises(ValueError):
+        run(["bogus"], count=1)
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"records_per_sec": 1000.0, "latency_us": {"p50": 10.0}, "peak_memory_bytes": 100}}}
+    report = copy.deepcopy(baseline)
+    report["results"]["a"]["records_per_sec"] = 950.0
+    report["results"]["b"] = report["results"]["a"]
+
+    [comparison] = compare(report, baseline, tolerance=0.1)
+    assert comparison["regressions"] == []
+
+    report["results"]["a"]["records_per_sec"] = 800.0
+    report["results"]["a"]["peak_memory_bytes"] = 200
+    assert compare(report, baseline, tolerance=0.1)[0]["regressions"] == ["records_per_sec", "peak_memory_bytes"]
+
+def test_percentile():
+    values = [float(n) for n in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
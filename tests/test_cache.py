@@ -0,0 +1,156 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pytest
+
+from core.cache import PlanCache, _fingerprint, fingerprint
+
+def make_mapping(scale=1):
+    return {"price": ("pricing.amount", lambda value: float(value) * scale), "name": ("name", str)}
+
+def test_fingerprint_equivalent_specs():
+    assert fingerprint(make_mapping()) == fingerprint(make_mapping())
+    assert hash(fingerprint(make_mapping())) == hash(fingerprint(make_mapping()))
+    assert fingerprint(make_mapping(1)) != fingerprint(make_mapping(2))
+    assert fingerprint({"a": lambda v: v}) != fingerprint({"a": lambda v: v})
+    assert fingerprint({"a": 1}) != fingerprint({"a": True})
+    assert fingerprint({"a": 1, "b": 2}) != fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"items": List[{"price": float}]}) == fingerprint({"items": List[{"price": float}]})
+    assert fingerprint({"items": Optional[Dict[str, int]]}) != fingerprint({"items": Optional[Dict[str, float]]})
+
+def test_flat_fingerprint_matches_general():
+    offset = 3
+    for spec in (
+        make_mapping(),
+        make_mapping(2.5),
+        {"id": int, "name": str, "score": (float, None)},
+        {"a": (lambda v: v + offset, "b", 1)},
+        {1: True, "x": b"y"},
+    ):
+        assert fingerprint(spec) == _fingerprint(spec, set())
+
+def test_fingerprint_captured_containers_by_identity():
+    def make(allowed, extra=()):
+        return {"x": ("a", lambda value, seen=extra: value if value in allowed else None)}
+
+    first, second = ["q"], ["q"]
+    assert fingerprint(make(first)) == fingerprint(make(first))
+    assert fingerprint(make(first)) != fingerprint(make(second))
+    assert fingerprint(make(("q",))) == fingerprint(make(("q",)))
+    assert fingerprint(make(first, [])) != fingerprint(make(first, []))
+
+    cache = PlanCache(lambda spec: spec["x"][1])
+    cache.get(make(first))
+    first.clear()
+    assert cache.get(make(second))("q") == "q"
+
+def test_fingerprint_unhashables_and_cycles():
+    shared = bytearray(b"x")
+    assert fingerprint({"a": shared}) == fingerprint({"a": shared})
+    assert fingerprint({"a": shared}) != fingerprint({"a": bytearray(b"x")})
+
+    def recursive(n):
+        return n and recursive(n - 1)
+    cyclic = []
+    cyclic.append(cyclic)
+
+    assert fingerprint(recursive) == fingerprint(recursive)
+    assert fingerprint(cyclic) == fingerprint(cyclic)
+
+def test_get_compiles_once_and_counts():
+    compiled = []
+    cache = PlanCache(lambda spec: compiled.append(spec) or len(compiled), maxsize=4)
+    mapping = make_mapping()
+
+    assert cache.get(mapping) == 1
+    assert cache.get(mapping) == 1
+    assert cache.get(make_mapping()) == 1
+    assert make_mapping() in cache
+    assert cache.stats()[:5] == (2, 1, 0, 0, 1)
+
+    mapping["name"] = ("title", str)
+    assert cache.get(mapping) == 2
+    assert len(cache) == 2
+
+def test_nested_mutation_recompiles():
+    cache = PlanCache(lambda spec: sorted(spec["seller"]))
+    schema = {"name": str, "seller": {"name": str}}
+
+    assert cache.get(schema) == ["name"]
+    assert cache.get(schema) == ["name"]
+    assert cache.get(schema) == ["name"]
+    schema["seller"]["rating"] = float
+    assert cache.get(schema) == ["name", "rating"]
+
+class _NoLock:
+    def __enter__(self):
+        raise AssertionError("hit took the lock")
+
+    def __exit__(self, *exc_info):
+        pass
+
+def test_hits_take_no_lock():
+    cache = PlanCache(lambda spec: object())
+    mapping = make_mapping()
+    plan = cache.get(mapping)
+    cache._lock = _NoLock()
+
+    for _ in range(3):
+        assert cache.get(mapping) is plan
+        assert cache.get(make_mapping()) is plan
+    assert cache.stats().hits == 6
+
+def test_second_chance_eviction_and_resize():
+    cache = PlanCache(lambda spec: spec["n"], maxsize=2)
+    first = {"n": 1}
+    cache.get(first)
+    cache.get({"n": 2})
+    cache.get(first)
+    cache.get({"n": 3})
+
+    assert {"n": 1} in cache and {"n": 2} not in cache
+    assert cache.stats().evictions == 1
+    cache.resize(1)
+    assert len(cache) == 1
+    with pytest.raises(ValueError):
+        cache.resize(0)
+    cache.clear()
+    assert len(cache) == 0 and cache.stats().misses == 0
+
+def test_concurrent_first_compile():
+    calls = []
+    started = threading.Barrier(8)
+
+    def slow_compile(spec):
+        calls.append(spec)
+        time.sleep(0.05)
+        return object()
+
+    cache = PlanCache(slow_compile)
+
+    def worker(_):
+        started.wait()
+        return cache.get(make_mapping())
+
+    with ThreadPoolExecutor(8) as executor:
+        plans = list(executor.map(worker, range(8)))
+
+    assert len(calls) == 1
+    assert all(plan is plans[0] for plan in plans)
+    stats = cache.stats()
+    assert stats.misses == 1 and stats.misses + stats.waits + stats.hits == 8
+
+def test_compile_errors_are_not_cached():
+    attempts = []
+
+    def failing(spec):
+        attempts.append(spec)
+        raise ValueError("malformed")
+
+    cache = PlanCache(failing)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get({"a": 1})
+    assert len(attempts) == 2 and len(cache) == 0
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+
+from core.changes import ChangeIndex, content_hash
+
+def catalog(*prices):
+    return [{"id": i, "name": f"Item {i}", "price": price} for i, price in enumerate(prices)]
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": "1"})
+    assert content_hash({"price": Decimal("1.50")}) != content_hash({"price": Decimal("1.5")})
+
+def test_changes_emit_only_the_delta(tmp_path):
+    path = str(tmp_path / "index.sqlite")
+    with ChangeIndex(path) as index:
+        first = list(index.changes(catalog(1, 2, 3)))
+        assert [key for key, _ in first] == [0, 1, 2]
+        assert list(index.changes(catalog(1, 2, 3))) == []
+
+    with ChangeIndex(path) as index:
+        assert len(index) == 3
+        changes = list(index.changes(catalog(1, 5)[::-1] + [{"id": 3, "name": "New", "price": 1}]))
+        assert changes == [
+            (1, {"id": 1, "name": "Item 1", "price": 5}),
+            (3, {"id": 3, "name": "New", "price": 1}),
+            (2, None),
+        ]
+        assert len(index) == 3
+
+def test_nested_keys_and_large_runs():
+    index = ChangeIndex(key="product.sku")
+    records = [{"product": {"sku": f"SKU-{i}"}, "price": i} for i in range(1200)]
+
+    assert len(list(index.changes(records))) == 1200
+    records[700]["price"] = -1
+    changes = list(index.changes(records[500:]))
+
+    assert changes[0] == ("SKU-700", records[700])
+    assert sorted(changes[1:]) == sorted((f"SKU-{i}", None) for i in range(500))
+
+def test_key_of_numeric_keys_and_rejected_ids():
+    assert ChangeIndex(key="ids.1").key_of({"ids": {"1": "abc"}}) == "abc"
+    assert ChangeIndex(key="ids.1").key_of({"ids": ["x", "abc"]}) == "abc"
+
+    index = ChangeIndex()
+    for key in (1.0, True, None, ["a"]):
+        with pytest.raises(ValueError):
+            index.key_of({"id": key})
+
+def test_repeated_ids_in_one_run():
+    index = ChangeIndex()
+    records = [{"id": "a", "v": 1}, {"id": "a", "v": 1}, {"id": "a", "v": 2}]
+
+    assert [record["v"] for _, record in index.changes(records)] == [1, 2]
+    assert list(index.changes(records[2:])) == []
+
+def test_abandoned_run_leaves_index_unchanged():
+    index = ChangeIndex()
+    list(index.changes(catalog(1, 2)))
+
+    run = index.changes(catalog(3, 4))
+    next(run)
+    run.close()
+    assert [key for key, _ in index.changes(catalog(3, 4))] == [0, 1]
+
+    with pytest.raises(ValueError, match="no usable id"):
+        list(index.changes([{"id": 0, "price": 9}, {"name": "no id"}]))
+    assert list(index.changes(catalog(3, 4))) == []
+
+def test_clear():
+    index = ChangeIndex()
+    list(index.changes(catalog(1)))
+    index.clear()
+
+    assert len(index) == 0
+    assert len(list(index.changes(catalog(1)))) == 1
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from core.instrumentation import Instrumentation, prometheus_text, write_prometheus
+
+INVALID = object()
+
+@pytest.fixture
+def metrics():
+    metrics = Instrumentation("extraction")
+    to_int = metrics.wrap("visits", int)
+    checked = metrics.wrap("flag", lambda value: value or INVALID, INVALID)
+    for value in ("1", "2", "x"):
+        try:
+            to_int(value)
+        except ValueError:
+            pass
+    checked(True)
+    checked(False)
+    return metrics
+
+def test_wrap_counts_calls_and_failures(metrics):
+    assert (metrics.fields["visits"].calls, metrics.fields["visits"].failures) == (3, 1)
+    assert (metrics.fields["flag"].calls, metrics.fields["flag"].failures) == (2, 1)
+    assert metrics.fields["visits"].seconds > 0
+
+def test_wrap_records_and_reset(metrics):
+    validate = metrics.wrap_records(lambda record, index: record if index else None, None)
+
+    assert validate({"a": 1}, 1) == {"a": 1}
+    assert validate({"a": 1}, 0) is None
+    assert (metrics.records.calls, metrics.records.failures) == (2, 1)
+
+    metrics.reset()
+    assert metrics.records.calls == 0
+    assert metrics.fields["visits"].as_dict() == {"calls": 0, "failures": 0, "seconds": 0.0}
+
+def test_dict_and_json_export(metrics):
+    snapshot = metrics.as_dict()
+
+    assert snapshot["name"] == "extraction"
+    assert list(snapshot["fields"]) == ["visits", "flag"]
+    assert json.loads(metrics.to_json()) == snapshot
+
+def test_prometheus_export(metrics, tmp_path):
+    other = Instrumentation('validation "v2"')
+    other.field("a\\b")
+    text = prometheus_text([metrics, other], prefix="app")
+
+    assert "# TYPE app_field_calls_total counter" in text
+    assert 'app_field_calls_total{component="extraction",field="visits"} 3' in text
+    assert 'app_field_failures_total{component="extraction",field="flag"} 1' in text
+    assert 'app_record_calls_total{component="validation \\"v2\\""} 0' in text
+    assert 'field="a\\\\b"' in text
+    assert text.count("# HELP app_field_seconds_total") == 1
+
+    path = tmp_path / "metrics.prom"
+    write_prometheus(str(path), [metrics], prefix="app")
+    assert path.read_text() == metrics.to_prometheus(prefix="app")
+    assert [p.name for p in tmp_path.iterdir()] == ["metrics.prom"]
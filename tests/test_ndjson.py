@@ -0,0 +1,110 @@
+import json
+import os
+
+import pytest
+
+from core.ndjson import MappedNDJSON, build_index
+
+@pytest.fixture
+def dump(tmp_path):
+    path = tmp_path / "records.ndjson"
+    lines = [json.dumps({"id": i, "name": f"Item {i}" * (i % 5 + 1)}) for i in range(100)]
+    lines.insert(10, "")
+    lines.insert(20, "   ")
+    path.write_text("\n" + "\n".join(lines), encoding="utf-8")
+    return str(path)
+
+def test_build_index_skips_blank_lines():
+    data = b'\n{"a": 1}\r\n\n  \n{"a": 2}\n{"a": 3}'
+
+    assert build_index(data).tolist() == [1, 15, 24, len(data)]
+    assert build_index(b"").tolist() == [0]
+    assert build_index(b"\n \n").tolist() == [3]
+
+def test_random_access(dump):
+    with MappedNDJSON(dump) as records:
+        assert len(records) == 100
+        assert records[0]["id"] == 0
+        assert records[57]["id"] == 57
+        assert records[-1]["id"] == 99
+        assert [record["id"] for record in records.records(95)] == [95, 96, 97, 98, 99]
+        assert [record["id"] for record in records] == list(range(100))
+        with records.raw(3) as raw:
+            assert json.loads(bytes(raw)) == records[3]
+        with pytest.raises(IndexError):
+            records[100]
+
+def test_index_is_persisted_and_refreshed(dump):
+    with MappedNDJSON(dump) as records:
+        offsets = records.offsets
+    assert os.path.exists(dump + ".idx")
+
+    with open(dump + ".idx", "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write((12345).to_bytes(8, "little"))
+    with MappedNDJSON(dump) as records:
+        assert records.offsets[-1] == 12345
+
+    with open(dump, "a", encoding="utf-8") as f:
+        f.write('\n{"id": 100}\n')
+    with MappedNDJSON(dump) as records:
+        assert len(records) == 101
+        assert records.offsets[:100] == offsets[:100]
+        assert records[100] == {"id": 100}
+
+def test_index_not_persisted(tmp_path, dump):
+    with MappedNDJSON(dump, persist_index=False) as records:
+        assert len(records) == 100
+    assert not os.path.exists(dump + ".idx")
+
+    index_path = str(tmp_path / "custom.idx")
+    with MappedNDJSON(dump, index_path=index_path) as records:
+        assert records.index_path == index_path
+    assert os.path.exists(index_path)
+
+def test_index_permissions_and_unwritable_sidecar(tmp_path, dump):
+    os.chmod(dump, 0o644)
+    with MappedNDJSON(dump):
+        pass
+    assert os.stat(dump + ".idx").st_mode & 0o777 == 0o644
+
+    index_path = str(tmp_path / "missing" / "records.idx")
+    with MappedNDJSON(dump, index_path=index_path) as records:
+        assert len(records) == 100
+    assert not os.path.exists(index_path)
+
+def test_checkpoint_resume(dump):
+    with MappedNDJSON(dump) as records:
+        checkpoint = records.offset(40)
+        assert records.row_at(checkpoint) == 40
+        assert records.row_at(checkpoint + 1) == 41
+        assert records.row_at(records.offset(len(records))) == 100
+        assert next(records.records(records.row_at(checkpoint)))["id"] == 40
+
+def test_partition(dump):
+    with MappedNDJSON(dump) as records:
+        ranges = records.partition(4)
+        sizes = [records.offset(stop) - records.offset(start) for start, stop in ranges]
+
+        assert ranges[0][0] == 0 and ranges[-1][1] == 100
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        assert max(sizes) - min(sizes) < 200
+        assert [record["id"] for start, stop in ranges for record in records.records(start, stop)] == list(range(100))
+        assert len(records.partition(1000)) == 100
+        with pytest.raises(ValueError):
+            records.partition(0)
+
+def test_empty_file_and_bad_records(tmp_path):
+    empty = tmp_path / "empty.ndjson"
+    empty.write_bytes(b"")
+    with MappedNDJSON(str(empty)) as records:
+        assert len(records) == 0
+        assert list(records) == []
+        assert records.partition(3) == []
+
+    broken = tmp_path / "broken.ndjson"
+    broken.write_bytes(b'{"id": 1}\n{broken\n')
+    with MappedNDJSON(str(broken)) as records:
+        assert records[0] == {"id": 1}
+        with pytest.raises(ValueError, match="record 1 at byte 10"):
+            records[1]
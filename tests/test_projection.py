@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from core.projection import build_projection, loads_projected
+
+DOCUMENT = {
+    "product": {"name": 'Laptop "Pro" \\ 15', "price": 1299.99, "specs": {"cpu": "x", "ram": [8, 16]}, "html": '<p class="x">'},
+    "reviews": [{"text": "great", "meta": {"a": [1, 2]}}, {"text": 'say "hi"'}],
+    "seller": "not an object",
+    "empty": {},
+    "flags": [True, False, None],
+    "count": -1.5e3,
+}
+
+def test_build_projection():
+    assert build_projection([("a", "b"), ("a", "c", 0), ("d",)]) == {"a": {"b": None, "c": None}, "d": None}
+    assert build_projection([("a",), ("a", "b")]) == {"a": None}
+    assert build_projection([("a", "b"), ("a",)]) == {"a": None}
+    assert build_projection([("a",), (0, "b")]) is None
+    assert build_projection([]) == {}
+
+@pytest.mark.parametrize("separators", [(",", ":"), (", ", ": ")])
+def test_loads_projected(separators):
+    document = json.dumps(DOCUMENT, separators=separators, indent=None)
+    projection = build_projection([
+        ("product", "name"), ("product", "specs"), ("seller", "name"), ("empty", "x"), ("count",), ("missing", "x"),
+    ])
+
+    assert loads_projected(document, projection, min_size=0) == {
+        "product": {"name": DOCUMENT["product"]["name"], "specs": DOCUMENT["product"]["specs"]},
+        "seller": None,
+        "empty": {},
+        "count": -1500.0,
+    }
+    assert loads_projected(document.encode(), {}, min_size=0) == {}
+    assert loads_projected(json.dumps(DOCUMENT, indent=2), projection, min_size=0)["product"]["specs"]["ram"] == [8, 16]
+
+@pytest.mark.parametrize("text", [
+    'say "hi"',
+    "ends with \\",
+    'escaped \\" quote',
+    '\\\\"',
+    '<a title="x">' * 40,
+])
+def test_skipped_strings_with_escapes(text):
+    document = json.dumps({"skipped": text, "after": [text], "kept": 1})
+
+    assert loads_projected(document, {"kept": None}, min_size=0) == {"kept": 1}
+
+def test_bytes_with_byte_order_mark():
+    document = json.dumps(DOCUMENT).encode("utf-8-sig")
+    projection = build_projection([("product", "price")])
+
+    assert loads_projected(document, projection, min_size=0) == {"product": {"price": 1299.99}}
+    assert loads_projected(document, projection) == json.loads(document)
+
+def test_small_documents_and_full_projections_use_json_loads():
+    document = json.dumps(DOCUMENT)
+
+    assert loads_projected(document, build_projection([("count",)])) == DOCUMENT
+    assert loads_projected(document, None, min_size=0) == DOCUMENT
+
+@pytest.mark.parametrize("document", [
+    '{"product": {"name": "x", }}',
+    '{"product" {"name": "x"}}',
+    '{"a": "unterminated',
+    '{"a": 1} trailing',
+    '{"a": [1, 2}',
+    '',
+])
+def test_loads_projected_errors(document):
+    with pytest.raises(json.JSONDecodeError):
+        loads_projected(document, {"product": {"name": None}, "a": {"b": None}}, min_size=0)
@@ -0,0 +1,65 @@
+import pytest
+
+from core.similarity import LSHIndex, MinHasher, estimate_similarity, jaccard, lsh_bands, tokenize
+
+def test_tokenize_splits_words_and_numbers():
+    assert tokenize("Sony WH-1000XM5, 256GB") == {"sony", "wh", "1000", "xm", "5", "256", "gb"}
+    assert tokenize("256 gb") == tokenize("256GB")
+    assert tokenize("  ") == set()
+
+def test_jaccard():
+    assert jaccard({"a", "b"}, {"b", "c"}) == pytest.approx(1 / 3)
+    assert jaccard(set(), set()) == 1.0
+    assert jaccard({"a"}, set()) == 0.0
+
+def test_signatures_estimate_jaccard():
+    hasher = MinHasher(num_perm=256)
+    first = {f"w{i}" for i in range(40)}
+    second = {f"w{i}" for i in range(10, 50)}
+
+    assert hasher.signature(first) == MinHasher(num_perm=256).signature(sorted(first))
+    assert len(hasher.signature(first)) == 256
+    assert estimate_similarity(hasher.signature(first), hasher.signature(second)) == pytest.approx(0.6, abs=0.1)
+    assert estimate_similarity(hasher.signature(set()), hasher.signature(set())) == 1.0
+    assert estimate_similarity(hasher.signature({"a"}), hasher.signature(set())) == 0.0
+    with pytest.raises(ValueError):
+        estimate_similarity((1, 2), (1,))
+
+def test_lsh_bands_find_pairs_at_the_threshold():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = lsh_bands(64, threshold)
+        assert bands * rows <= 64
+        assert 1 - (1 - threshold ** rows) ** bands >= 0.95
+    assert lsh_bands(64, 1.0) == (1, 64)
+    with pytest.raises(ValueError):
+        lsh_bands(64, 0)
+
+def test_lsh_index_query_add_remove():
+    hasher = MinHasher()
+    index = LSHIndex(threshold=0.8)
+    names = ["Apple iPhone 15 Pro Max 256GB", "Desk Lamp Classic", "Sony WH-1000XM5 Headphones"]
+    for key, name in enumerate(names):
+        index.add(key, hasher.signature(tokenize(name)))
+
+    assert len(index) == 3 and 1 in index
+    assert index.query(hasher.signature(tokenize("apple iphone 15 pro max - 256 GB"))) == {0}
+    assert index.query(hasher.signature(tokenize("Garden Hose 20m"))) == set()
+    with pytest.raises(KeyError):
+        index.add(0, index[0])
+
+    index.remove(0)
+    assert 0 not in index
+    assert index.query(hasher.signature(tokenize(names[0]))) == set()
+    with pytest.raises(ValueError):
+        index.query((1, 2, 3))
+
+def test_lsh_index_skips_oversized_buckets():
+    hasher = MinHasher()
+    index = LSHIndex(threshold=0.8, max_bucket=2)
+    signature = hasher.signature(tokenize("Desk Lamp Classic"))
+    for key in range(3):
+        index.add(key, signature)
+
+    assert index.query(signature) == set()
+    index.remove(2)
+    assert index.query(signature) == {0, 1}
@@ -0,0 +1,210 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.runner import load_solution
+from core.transformers import Pipeline, get_path, lookup, map_batches, split_path
+
+def to_int(value):
+    return int(float(value))
+
+def split_tags(tags):
+    if isinstance(tags, str):
+        return [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return [str(tag) for tag in tags]
+
+@pytest.fixture
+def products():
+    return [
+        {
+            "product": {
+                "name": "Laptop Pro",
+                "details": {"price": "1299.99", "stock": "15"},
+                "tags": ["electronics", "computers"],
+            }
+        },
+        {
+            "name": "Desk Lamp",
+            "pricing": {"amount": "49.50", "currency": "USD"},
+            "inventory": "23",
+            "categories": "home,lighting",
+        },
+        {"name": "Broken", "pricing": {"amount": "N/A"}},
+    ]
+
+@pytest.fixture
+def product_pipeline():
+    """Pipeline equivalent of normalize_product_data in challenge 02."""
+    defaults = {"name": "", "price": 0.0, "stock": 0, "tags": []}
+    return (
+        Pipeline()
+        .extract(
+            {
+                "name": ["name", "product.name"],
+                "price": ["details.price", "product.details.price", "pricing.amount"],
+                "stock": ["details.stock", "product.details.stock", "inventory"],
+                "tags": ["tags", "product.tags", "categories"],
+            },
+            defaults=defaults,
+            fallback_on="falsy",
+        )
+        .coerce({"price": float, "stock": to_int, "tags": split_tags}, defaults=defaults)
+    )
+
+def test_get_path():
+    data = {"user": {"name": "Ada", "emails": ["a@x.io", "b@x.io"]}}
+
+    assert get_path(data, "user.name") == "Ada"
+    assert get_path(data, "user.emails.1") == "b@x.io"
+    assert get_path(data, "user.emails.-1") == "b@x.io"
+    assert get_path(data, "user.emails.5") is None
+    assert get_path(data, "user.missing.deeper", default="n/a") == "n/a"
+    assert split_path("items.0.sku") == ("items", "0", "sku")
+    assert lookup(data, split_path("user.emails.0")) == "a@x.io"
+    assert lookup(data, ("user", "missing")) is None
+
+def test_get_path_numeric_dict_keys():
+    data = {"scores": {"2024": 5, "-1": "last"}, "rows": [[1, 2], [3, 4]]}
+
+    assert get_path(data, "scores.2024") == 5
+    assert get_path(data, "scores.-1") == "last"
+    assert get_path(data, "scores.2023") is None
+    assert get_path(data, "rows.1.0") == 3
+    assert get_path(data, "rows.x") is None
+    assert get_path(data, "rows.--1") is None
+
+def test_get_path_invalid():
+    with pytest.raises(ValueError):
+        get_path({}, "a..b")
+    with pytest.raises(ValueError):
+        get_path({}, "")
+
+def test_product_pipeline(products, product_pipeline):
+    assert product_pipeline.collect(products) == [
+        {"name": "Laptop Pro", "price": 1299.99, "stock": 15, "tags": ["electronics", "computers"]},
+        {"name": "Desk Lamp", "price": 49.5, "stock": 23, "tags": ["home", "lighting"]},
+        {"name": "Broken", "price": 0.0, "stock": 0, "tags": []},
+    ]
+
+def test_product_pipeline_matches_solution_on_falsy_values(products, product_pipeline):
+    edge_cases = products + [
+        {"name": "", "product": {"name": "X"}},
+        {"name": None, "product": {"name": "X"}},
+        {"name": 0},
+        {"name": "A", "details": {"price": "", "stock": 0}, "pricing": {"amount": "5"}, "inventory": "7"},
+        {"name": "A", "details": {"price": "abc"}, "pricing": {"amount": "5"}},
+        {"name": "A", "tags": [], "categories": "a,b"},
+        {"name": "A", "tags": "", "product": {"tags": ["x"]}},
+    ]
+    normalize_product_data = load_solution("02_data_transformation").normalize_product_data
+
+    assert product_pipeline.collect(edge_cases) == normalize_product_data(edge_cases)
+
+def test_extract_fallback_on():
+    record = {"name": "", "product": {"name": "X"}, "stock": 0}
+    fields = {"name": ["name", "product.name"], "stock": ["stock"]}
+
+    assert Pipeline().extract(fields).collect([record]) == [{"name": "", "stock": 0}]
+    assert Pipeline().extract(fields, {"stock": -1}, fallback_on="falsy").collect([record]) == [{"name": "X", "stock": -1}]
+    with pytest.raises(ValueError):
+        Pipeline().extract(fields, fallback_on="empty")
+
+def test_extract_fields_pipeline():
+    """Pipeline equivalent of extract_fields in challenge 03."""
+    mapping = {
+        "name": ("user.name", str),
+        "visits": ("metrics.visits", int),
+        "missing": ("user.nonexistent", str),
+        "bad": ("user.name", int),
+    }
+    pipeline = (
+        Pipeline()
+        .extract({field: path for field, (path, _) in mapping.items()})
+        .coerce({field: transform for field, (_, transform) in mapping.items()})
+    )
+    data = {"user": {"name": "John Doe"}, "metrics": {"visits": "42"}}
+
+    assert pipeline.collect([data]) == [{"name": "John Doe", "visits": 42, "missing": None, "bad": None}]
+
+def test_pipeline_is_lazy(products, product_pipeline):
+    seen = []
+
+    def source():
+        for product in products:
+            seen.append(product)
+            yield product
+
+    results = product_pipeline.run(source())
+    assert seen == []
+    next(results)
+    assert len(seen) == 1
+
+def test_filter_map_and_stream_stages():
+    pipeline = Pipeline().filter(lambda n: n % 2).map(lambda n: n * 10).limit(4).batch(3)
+
+    assert pipeline.collect(range(100)) == [[10, 30, 50], [70]]
+    assert pipeline.collect([]) == []
+
+def test_stages_are_fused():
+    pipeline = Pipeline().map(str).filter(bool).map(len).batch(2).map(sum)
+
+    assert [kind for kind, _ in pipeline._fused()] == ["map", "stream", "map"]
+    assert pipeline.collect([1, 22, 333]) == [3, 3]
+
+def test_builders_return_new_pipelines():
+    base = Pipeline().map(lambda n: n + 1)
+    doubled = base.map(lambda n: n * 2)
+
+    assert base.collect([1]) == [2]
+    assert doubled.collect([1]) == [4]
+    with pytest.raises(ValueError):
+        base.batch(0)
+
+def test_extract_defaults_are_copied():
+    pipeline = Pipeline().extract({"tags": "tags"}, defaults={"tags": []})
+    first, second = pipeline.collect([{}, {}])
+
+    first["tags"].append("x")
+    assert second["tags"] == []
+
+async def collect_batches(records, function, **kwargs):
+    return [result async for result in map_batches(records, function, **kwargs)]
+
+async def arange(count):
+    for n in range(count):
+        await asyncio.sleep(0)
+        yield n
+
+def test_map_batches():
+    assert asyncio.run(collect_batches(arange(8), sum, batch_size=3)) == [3, 12, 13]
+    assert asyncio.run(collect_batches(range(8), len, batch_size=3)) == [3, 3, 2]
+    assert asyncio.run(collect_batches([], sum)) == []
+    with ThreadPoolExecutor(2) as executor:
+        assert asyncio.run(collect_batches(arange(100), sum, batch_size=7, executor=executor)) == [
+            sum(range(start, min(start + 7, 100))) for start in range(0, 100, 7)
+        ]
+
+def test_map_batches_yields_between_batches():
+    seen = []
+
+    async def main():
+        async def ticker():
+            while True:
+                seen.append("tick")
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        async for batch in map_batches(range(6), list, batch_size=2):
+            seen.append(tuple(batch))
+        task.cancel()
+
+    asyncio.run(main())
+    assert seen.index((2, 3)) > seen.index((0, 1)) + 1
+    assert seen.count("tick") >= 2
+
+def test_map_batches_rejects_bad_sizes():
+    with pytest.raises(ValueError):
+        asyncio.run(collect_batches(range(3), sum, batch_size=0))
+    with pytest.raises(ValueError):
+        asyncio.run(collect_batches(range(3), sum, max_pending=0))
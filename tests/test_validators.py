@@ -0,0 +1,113 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+
+import pytest
+
+from core.validators import (
+    INVALID, CoercerRegistry, CoercionError, Money, default_registry, enum_coercer,
+    parse_money, register_defaults,
+)
+
+class Color(Enum):
+    RED = "red"
+    GREEN = "green"
+
+@pytest.fixture
+def registry():
+    return register_defaults(CoercerRegistry())
+
+@pytest.mark.parametrize("value, target, expected", [
+    ("15", int, 15),
+    (3.9, int, 3),
+    (True, int, True),
+    ("98.6", float, 98.6),
+    (7, str, "7"),
+    ("Yes", bool, True),
+    ("0", bool, False),
+    ("a, b", list, ["a", "b"]),
+    ("", list, []),
+    (("a", "b"), list, ["a", "b"]),
+    (0.1, Decimal, Decimal("0.1")),
+    ("2024-01-31", date, date(2024, 1, 31)),
+    ("2024-01-31T08:00:00Z", datetime, datetime(2024, 1, 31, 8, tzinfo=timezone.utc)),
+    (0, datetime, datetime(1970, 1, 1, tzinfo=timezone.utc)),
+    ("green", Color, Color.GREEN),
+    ("RED", Color, Color.RED),
+])
+def test_default_coercions(registry, value, target, expected):
+    assert registry.coerce(value, target) == expected
+
+@pytest.mark.parametrize("value, target", [
+    (None, int),
+    (None, str),
+    ("12.5", int),
+    ("maybe", bool),
+    (1, bool),
+    ("n/a", Decimal),
+    ("a=1", dict),
+    ("purple", Color),
+])
+def test_rejected_coercions(registry, value, target):
+    with pytest.raises(CoercionError) as exc:
+        registry.coerce(value, target)
+    assert exc.value.value == value
+    assert exc.value.target_type is target
+    assert registry.coercer_for(target)(value) is INVALID
+
+@pytest.mark.parametrize("text, expected", [
+    ("$1,299.99", Money(Decimal("1299.99"), "USD")),
+    ("49.50 USD", Money(Decimal("49.50"), "USD")),
+    ("eur 1.299,99", Money(Decimal("1299.99"), "EUR")),
+    ("9,99 €", Money(Decimal("9.99"), "EUR")),
+    ("-£3", Money(Decimal("-3"), "GBP")),
+    ("12,000", Money(Decimal("12000"), None)),
+])
+def test_parse_money(text, expected):
+    assert parse_money(text) == expected
+
+def test_parse_money_rejects_conflicting_currencies():
+    with pytest.raises(ValueError):
+        parse_money("$5 EUR")
+
+def test_dispatch_follows_mro_and_caches(registry):
+    class Base:
+        pass
+
+    class Child(Base):
+        pass
+
+    registry.register(Base, str, lambda value: "base")
+
+    assert registry.lookup(Child, str)("ignored") == "base"
+    assert registry.lookup(bool, int)(True) is True
+    assert registry.lookup(type(None), str) is None
+    assert registry.lookup(dict, set) is None
+
+def test_registration_updates_existing_coercers(registry):
+    coerce = registry.coercer_for(Decimal)
+    assert coerce(b"1") is INVALID
+
+    @registry.register(bytes, Decimal)
+    def bytes_to_decimal(value):
+        return Decimal(value.decode())
+
+    assert coerce(b"1.5") == Decimal("1.5")
+    assert registry.supports(Decimal)
+    assert not registry.supports(complex)
+
+def test_registries_are_independent(registry):
+    copy = registry.copy()
+    copy.register(str, complex, complex)
+
+    assert copy.coerce("1+2j", complex) == 1 + 2j
+    with pytest.raises(CoercionError):
+        registry.coerce("1+2j", complex)
+
+def test_converter_and_enum_helpers():
+    convert = default_registry.converter_for(float)
+
+    assert convert("2.5") == 2.5
+    with pytest.raises(ValueError):
+        convert("two")
+    assert enum_coercer(Color)("Green") is Color.GREEN